@@ -1,3 +1,34 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import IrradianceSeries, Job, ResultDownload, Site
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'progress', 'created_at', 'updated_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('created_at', 'updated_at')
+
+
+@admin.register(Site)
+class SiteAdmin(admin.ModelAdmin):
+    list_display = ('name', 'latitude', 'longitude', 'created_at')
+    search_fields = ('name',)
+
+
+@admin.register(IrradianceSeries)
+class IrradianceSeriesAdmin(admin.ModelAdmin):
+    list_display = ('site', 'name', 'start_date', 'end_date', 'length', 'source')
+    list_filter = ('site',)
+    exclude = ('values',)
+    readonly_fields = ('start_date', 'end_date', 'length', 'created_at')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('values')
+
+
+@admin.register(ResultDownload)
+class ResultDownloadAdmin(admin.ModelAdmin):
+    list_display = ('token', 'created_at', 'expires_at')
+    exclude = ('table',)
+    readonly_fields = ('token', 'created_at', 'expires_at')
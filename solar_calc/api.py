@@ -0,0 +1,737 @@
+import csv
+import json
+
+import numpy as np
+from django.conf import settings
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+from .cache import get_or_compute_result, result_cache_key
+from .exports import EXPORT_FORMATS, export_response
+from .forms import RadiationForm
+from .inputs import (
+    DEFAULT_ALBEDO,
+    MONTHS,
+    InputError,
+    check_grid_size,
+    read_inputs,
+)
+from .jobs import fail_stale_jobs, job_status, register_job_kind, start_workers, submit_job
+from .models import IrradianceSeries, Job
+from .utils.hdkr_calc import (
+    RESULT_PRECISION,
+    ResultTable,
+    albedo_series,
+    albedo_tilt_sweep,
+    azimuth_grid,
+    date_index,
+    date_range,
+    decompose,
+    optimal_tilts,
+    orientation_grid,
+    summarize_radiation,
+    tilt_grid,
+    tilt_sweep,
+    transpose,
+)
+from .utils.grid_archive import open_archive
+from .utils.hdkr_hourly import compute_hourly_radiation, irradiance_to_mj, solar_time
+from .utils.ingest import parse_uploaded_series
+from .utils.parallel import compute_radiation_parallel
+
+# Sites per chunk when a batch runs as a background job (one progress step each)
+JOB_CHUNK_SITES = 500
+# Finest tilt / azimuth step (degrees) a request may ask for; the grid sizes
+# are capped by inputs.check_grid_size
+MIN_GRID_STEP = 0.01
+
+# --------------------------------------------------------------------------- #
+# HELPERS                                                                     #
+# --------------------------------------------------------------------------- #
+def _json_column(values, digits=None):
+    """Round an array for JSON output; NaN (e.g. polar night) becomes null."""
+    values = np.asarray(values, dtype=float)
+    if digits is not None:
+        values = np.round(values, digits)
+    if np.isnan(values).any():
+        return [None if np.isnan(v) else v for v in values.tolist()]
+    return values.tolist()
+
+
+def _float_list(raw, what):
+    """Parse a JSON list or a comma/semicolon separated string of numbers."""
+    if isinstance(raw, str):
+        raw = [x for x in raw.replace(';', ',').split(',') if x.strip()]
+    try:
+        return np.asarray([float(x) for x in raw])
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {what} values") from None
+
+
+def _flag(value, default=False):
+    """Interpret a JSON boolean or a form value such as 'true' / '0'."""
+    if value is None or value == '':
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() not in ('0', 'false', 'no', 'off')
+    return bool(value)
+
+
+def _grid_step(data, name, default, limit):
+    """Sweep step in degrees from a request field, within [MIN_GRID_STEP, limit]."""
+    try:
+        step = float(data.get(name) or default)
+    except ValueError:
+        raise InputError(f'{name} must be numeric', field=name) from None
+    if not MIN_GRID_STEP <= step <= limit:
+        raise InputError(f'{name} must be within [{MIN_GRID_STEP}, {limit}]', field=name)
+    return step
+
+
+def _load_manifest(request):
+    """Return ``(sites, options)`` from a JSON body or an uploaded manifest."""
+    if request.content_type == 'application/json':
+        try:
+            payload = json.loads(request.body)
+        except json.JSONDecodeError:
+            raise ValueError('Invalid JSON body') from None
+        options = payload if isinstance(payload, dict) else {}
+    else:
+        manifest = request.FILES.get('manifest')
+        if manifest is None:
+            raise ValueError("POST a JSON body or upload a 'manifest' file (.csv or .json)")
+        text = manifest.read().decode('utf-8-sig')
+        if manifest.name.lower().endswith('.json'):
+            try:
+                payload = json.loads(text)
+            except json.JSONDecodeError:
+                raise ValueError('Invalid JSON manifest') from None
+        else:
+            payload = list(csv.DictReader(text.splitlines()))
+        options = request.POST
+
+    sites = payload.get('sites') if isinstance(payload, dict) else payload
+    if not isinstance(sites, list) or not sites:
+        raise ValueError('The manifest must list at least one site')
+    for index, site in enumerate(sites):
+        if not isinstance(site, dict):
+            raise ValueError(f"Site {index + 1}: each site must be an object")
+    return sites, options
+
+
+# Series of every manifest entry with a 'grid' lookup method ('nearest' or
+# 'bilinear'), read from the configured grid archive in one vectorized lookup
+# per (method, start_date, end_date); stored in parsed_files under ('grid', index)
+def _prefetch_grid(sites, parsed_files):
+    groups = {}
+    for index, site in enumerate(sites):
+        if site.get('grid'):
+            key = (site['grid'], site.get('start_date') or None, site.get('end_date') or None)
+            groups.setdefault(key, []).append(index)
+    if not groups:
+        return
+    path = getattr(settings, 'SOLAR_CALC_GRID_ARCHIVE', None)
+    if not path:
+        raise ValueError('Grid lookups need a configured grid archive (SOLAR_CALC_GRID_ARCHIVE)')
+    archive = open_archive(path)
+    for (method, start, end), members in groups.items():
+        try:
+            lat = [float(sites[i]['latitude']) for i in members]
+            lon = [float(sites[i]['longitude']) for i in members]
+        except (KeyError, TypeError, ValueError):
+            raise ValueError('Grid sites need numeric latitude and longitude') from None
+        dates, H = archive.series(lat, lon, method=method, start=start, end=end)
+        for row, index in enumerate(members):
+            parsed_files['grid', index] = (dates, H[row])
+
+
+# Stored IrradianceSeries for a manifest entry, without its value blob
+def _stored_series(site_id, series_id):
+    try:
+        return IrradianceSeries.objects.select_related('site').defer('values').get(pk=int(series_id))
+    except (TypeError, ValueError):
+        raise ValueError(f"Site {site_id}: series_id must be an integer") from None
+    except IrradianceSeries.DoesNotExist:
+        raise ValueError(f"Site {site_id}: no stored series {series_id}") from None
+
+
+def _hourly_layout(site, site_id):
+    """``step_hours``/``longitude``/``utc_offset`` of a site given hourly records.
+
+    All three are None for daily sites.  Without ``longitude`` and
+    ``utc_offset`` the record times are taken as apparent solar time.
+    """
+    if site.get('step_hours') in (None, ''):
+        return {'step_hours': None, 'longitude': None, 'utc_offset': None}
+    try:
+        step_hours = float(site['step_hours'])
+        longitude = None if site.get('longitude') in (None, '') else float(site['longitude'])
+        utc_offset = None if site.get('utc_offset') in (None, '') else float(site['utc_offset'])
+    except (TypeError, ValueError):
+        raise ValueError(f"Site {site_id}: step_hours, longitude and utc_offset must be numeric") from None
+    per_day = 24 / step_hours if step_hours > 0 else 0
+    if not 1 <= per_day or abs(per_day - round(per_day)) > 1e-9:
+        raise ValueError(f"Site {site_id}: step_hours must divide 24 (e.g. 1, 0.5 or 0.25)")
+    if (longitude is None) != (utc_offset is None):
+        raise ValueError(f"Site {site_id}: give both longitude and utc_offset, or neither for solar time")
+    if longitude is not None and not (-180 <= longitude <= 180 and -12 <= utc_offset <= 14):
+        raise ValueError(f"Site {site_id}: longitude must be between -180 and 180 "
+                         f"and utc_offset between -12 and 14")
+    return {'step_hours': step_hours, 'longitude': longitude, 'utc_offset': utc_offset}
+
+
+def _site_inputs(index, site, files, parsed_files):
+    """Validate one manifest entry and resolve its GHI series (MJ/m²/day)."""
+    site_id = str(site.get('id') or site.get('site_id') or index + 1)
+    stored = _stored_series(site_id, site['series_id']) if site.get('series_id') else None
+    if stored is not None and site.get('latitude') in (None, ''):
+        site = dict(site, latitude=stored.site.latitude)
+    try:
+        lat = float(site['latitude'])
+        tilt = float(site['tilt'])
+        azimuth = None if site.get('azimuth') in (None, '') else float(site['azimuth'])
+        start_day = int(site.get('start_day') or 1)
+    except KeyError as e:
+        raise ValueError(f"Site {site_id}: missing {e.args[0]}") from None
+    except (TypeError, ValueError):
+        raise ValueError(f"Site {site_id}: latitude, tilt, azimuth and start_day must be numeric") from None
+    try:
+        start_date = np.datetime64(site['start_date'], 'D') if site.get('start_date') else None
+    except ValueError:
+        raise ValueError(f"Site {site_id}: start_date must be YYYY-MM-DD") from None
+    if not -90 <= lat <= 90:
+        raise ValueError(f"Site {site_id}: latitude must be between -90 and 90")
+    if azimuth is not None and not -180 <= azimuth <= 180:
+        raise ValueError(f"Site {site_id}: azimuth must be between -180 and 180")
+
+    hourly = _hourly_layout(site, site_id)
+    step_hours = hourly['step_hours']
+    if step_hours is not None and (stored is not None or site.get('grid') or site.get('ghi_file')
+                                   or not site.get('ghi')):
+        raise ValueError(f"Site {site_id}: step_hours needs inline 'ghi' records")
+
+    ghi_unit = site.get('ghi_unit') or 'MJ'
+    ghi_file = site.get('ghi_file')
+    dates = None
+    if stored is not None:
+        try:
+            end_date = np.datetime64(site['end_date'], 'D') if site.get('end_date') else None
+        except ValueError:
+            raise ValueError(f"Site {site_id}: end_date must be YYYY-MM-DD") from None
+        dates, ghi = stored.load(start_date, end_date)
+        if not len(ghi):
+            raise ValueError(f"Site {site_id}: series {stored.pk} has no data in the requested range")
+    elif site.get('grid'):
+        dates, ghi = parsed_files['grid', index]
+        if not len(ghi) or np.isnan(ghi).any():
+            raise ValueError(f"Site {site_id}: the grid archive has no complete series for this location and range")
+    elif ghi_file:
+        if ghi_file not in files:
+            raise ValueError(f"Site {site_id}: no uploaded file named '{ghi_file}'")
+        if (ghi_file, ghi_unit) not in parsed_files:
+            try:
+                parsed_files[ghi_file, ghi_unit] = parse_uploaded_series(files[ghi_file], ghi_unit)
+            except ValueError as e:
+                raise ValueError(f"Site {site_id}: {e}") from None
+        file_dates, ghi = parsed_files[ghi_file, ghi_unit]
+        if file_dates is not None and start_date is None:
+            dates = file_dates
+    elif step_hours is not None:
+        # Records of step_hours from 00:00 on the first day: MJ/m² per record,
+        # or the mean W/m² over each record
+        ghi = _float_list(site['ghi'], f"site {site_id} GHI")
+        if len(ghi) % round(24 / step_hours):
+            raise ValueError(f"Site {site_id}: {len(ghi)} records of {step_hours:g} h do not fill whole days")
+        if ghi_unit == 'W':
+            ghi = irradiance_to_mj(ghi, step_hours)
+    elif site.get('ghi'):
+        ghi = _float_list(site['ghi'], f"site {site_id} GHI")
+        if ghi_unit == 'W':
+            sun = _float_list(site.get('sunshine') or [], f"site {site_id} sunshine")
+            if len(sun) != len(ghi):
+                raise ValueError(f"Site {site_id}: GHI and sunshine count must match")
+            ghi = (ghi * sun * 3600) / 1e6
+    else:
+        raise ValueError(f"Site {site_id}: provide 'ghi' values, a 'ghi_file' reference, a 'series_id' or a 'grid' method")
+
+    # Day numbers: from the file's Date column or start_date (leap-aware, any
+    # length), else consecutive from start_day
+    n_days = len(ghi) if step_hours is None else len(ghi) // round(24 / step_hours)
+    if dates is None and start_date is not None:
+        dates = date_range(start_date, n_days)
+    days = date_index(dates)[1] if dates is not None else np.arange(start_day, start_day + n_days)
+
+    # Albedo: one value, 12 monthly values or one per day of the series
+    albedo = site.get('albedo')
+    try:
+        albedo = albedo_series(
+            [DEFAULT_ALBEDO] if albedo in (None, '') else
+            _float_list(albedo if isinstance(albedo, (list, str)) else [albedo], 'albedo'),
+            days, dates=dates)
+    except ValueError as e:
+        raise ValueError(f"Site {site_id}: {e}") from None
+    if not isinstance(albedo, float):
+        albedo = albedo.tolist()
+
+    return {'id': site_id, 'latitude': lat, 'tilt': tilt, 'azimuth': azimuth, 'albedo': albedo,
+            'start_day': start_day, 'dates': dates, 'days': days, 'ghi': ghi, **hourly}
+
+
+def _hourly_block(block, days):
+    """Daily columns for hourly sites sharing day numbers and ``step_hours``.
+
+    The records run through the hourly engine as one (sites × records) block
+    and are summed back to days (``hdkr_hourly.aggregate_daily``).
+    """
+    step_hours = block[0]['step_hours']
+    per_day = round(24 / step_hours)
+    record_day = np.repeat(days, per_day)
+    clock_hour = np.tile(step_hours * np.arange(per_day), len(days))
+    timed = np.array([site['longitude'] is not None for site in block])[:, None]
+    solar_hour = np.where(timed, solar_time(
+        record_day, clock_hour,
+        np.array([site['longitude'] or 0.0 for site in block])[:, None],
+        np.array([site['utc_offset'] or 0.0 for site in block])[:, None],
+    ), clock_hour)
+    albedo = np.stack([np.repeat(np.broadcast_to(np.asarray(site['albedo'], dtype=float), days.shape), per_day)
+                       for site in block])
+    _, daily = compute_hourly_radiation(
+        record_day, solar_hour, np.stack([site['ghi'] for site in block]),
+        np.array([site['latitude'] for site in block])[:, None],
+        np.array([site['tilt'] for site in block])[:, None],
+        albedo,
+        # The hourly geometry has no noon-ratio variant: no azimuth means south
+        np.array([site['azimuth'] or 0.0 for site in block])[:, None],
+        step_hours,
+    )
+    return daily
+
+
+def _site_blocks(sites):
+    """Run the engine once per group of sites sharing a day-number series.
+
+    Each group stacks its GHI series into a (sites × days) array with per-site
+    latitude, tilt, azimuth and albedo (a sites × days block when any site's albedo
+    varies by day); large groups are sharded across the process
+    pool in ``utils.parallel``.  Sites given hourly records are grouped by
+    ``step_hours`` too and run through the hourly engine.  Yields
+    ``(members, days, columns)``.
+    """
+    groups = {}
+    for index, site in enumerate(sites):
+        groups.setdefault((site['days'].tobytes(), site.get('step_hours')), []).append(index)
+
+    for members in groups.values():
+        block = [sites[i] for i in members]
+        if block[0].get('step_hours') is not None:
+            yield members, block[0]['days'], _hourly_block(block, block[0]['days'])
+            continue
+        albedo = [site['albedo'] for site in block]
+        if any(np.ndim(value) for value in albedo):
+            albedo = [np.broadcast_to(value, block[0]['days'].shape) for value in albedo]
+        columns = compute_radiation_parallel(
+            block[0]['days'],
+            np.stack([site['ghi'] for site in block]),
+            np.array([site['latitude'] for site in block]),
+            np.array([site['tilt'] for site in block]),
+            np.array(albedo, dtype=float),
+            np.array([np.nan if site['azimuth'] is None else site['azimuth'] for site in block]),
+            workers=getattr(settings, 'SOLAR_CALC_PARALLEL_WORKERS', None),
+        )
+        yield members, block[0]['days'], columns
+
+
+def compute_site_batch(sites, include_daily=True):
+    """Evaluate many sites as one broadcast block per distinct day-number series."""
+    results = [None] * len(sites)
+    for members, days, columns in _site_blocks(sites):
+        block = [sites[i] for i in members]
+        H = columns['Hd'] + columns['Hb']
+        summary = {
+            'mean_H': H.mean(axis=-1),
+            'mean_It': columns['It'].mean(axis=-1),
+            'total_It': columns['It'].sum(axis=-1),
+            'max_It': columns['It'].max(axis=-1),
+        }
+        for row, (index, site) in enumerate(zip(members, block)):
+            entry = {key: site[key] for key in ('id', 'latitude', 'tilt', 'azimuth', 'albedo', 'start_day')}
+            if site.get('step_hours') is not None:
+                entry['step_hours'] = site['step_hours']
+            entry['days'] = len(days)
+            entry['summary'] = {key: _json_column(values[row:row + 1], 3)[0]
+                                for key, values in summary.items()}
+            if include_daily:
+                entry['daily'] = {'day': days.tolist()}
+                if site['dates'] is not None:
+                    entry['daily']['date'] = site['dates'].astype(str).tolist()
+                entry['daily'].update({key: _json_column(columns[key][row], digits)
+                                       for key, digits in RESULT_PRECISION.items()})
+            results[index] = entry
+    return results
+
+
+def site_batch_table(sites):
+    """Long-format table (one row per site and day) for the binary exports.
+
+    Rows follow the manifest order: ``site`` is the index column, then
+    ``day`` (plus ``date`` when any site is dated) and the result columns,
+    rounded like the JSON output.
+    """
+    parts = [None] * len(sites)
+    for members, days, columns in _site_blocks(sites):
+        for row, index in enumerate(members):
+            parts[index] = {key: columns[key][row] for key in RESULT_PRECISION}
+
+    table = {'day': np.concatenate([site['days'] for site in sites])}
+    if any(site['dates'] is not None for site in sites):
+        table['date'] = np.concatenate([
+            np.full(len(site['days']), '') if site['dates'] is None else site['dates'].astype(str)
+            for site in sites
+        ])
+    for key, digits in RESULT_PRECISION.items():
+        table[key] = np.round(np.concatenate([part[key] for part in parts]), digits)
+    site_ids = np.repeat([site['id'] for site in sites], [len(site['days']) for site in sites])
+    return ResultTable('site', site_ids, table)
+
+
+# Same long table rebuilt from stored batch-job entries (include_daily only)
+def _entries_table(entries):
+    if any('daily' not in entry for entry in entries):
+        raise ValueError('Binary exports need daily rows; submit the job with include_daily')
+    daily = [entry['daily'] for entry in entries]
+    table = {'day': np.concatenate([d['day'] for d in daily])}
+    if any('date' in d for d in daily):
+        table['date'] = np.concatenate([d.get('date', [''] * len(d['day'])) for d in daily])
+    for key in RESULT_PRECISION:
+        table[key] = np.concatenate([np.asarray(d[key], dtype=float) for d in daily])
+    site_ids = np.repeat([entry['id'] for entry in entries], [len(d['day']) for d in daily])
+    return ResultTable('site', site_ids, table)
+
+
+def _export_format(request, options=None):
+    """Requested output format: 'json' (default) or a registered export."""
+    fmt = request.GET.get('format') or (options or {}).get('format') or 'json'
+    if fmt != 'json' and fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format '{fmt}'; choose json or one of: {', '.join(EXPORT_FORMATS)}")
+    return fmt
+
+# --------------------------------------------------------------------------- #
+# MULTI-SITE BATCH ENDPOINT                                                   #
+# --------------------------------------------------------------------------- #
+@csrf_exempt
+@require_POST
+def batch(request):
+    """Compute HDKR results for every site in a manifest in one request.
+
+    Accepts a JSON body ``{"sites": [...], "include_daily": true}`` or a
+    multipart upload with a ``manifest`` CSV/JSON file.  Each site gives
+    ``latitude``, ``tilt``, optional ``azimuth`` (0 = south, east negative;
+    omitted keeps the south-facing noon-ratio model),
+    ``albedo`` (one value, 12 monthly values or one per day), ``start_day``/``start_date``/``ghi_unit`` and either inline ``ghi`` values, ``ghi_file``, the name of
+    another uploaded file field holding the series (a Date column in that file
+    dates the series), ``series_id``, a stored IrradianceSeries read from
+    ``start_date`` to ``end_date`` (latitude defaults to its site's), or
+    ``grid`` ('nearest' or 'bilinear') with ``longitude`` to read the series
+    from the gridded archive over the same date range.  With ``step_hours``
+    the inline ``ghi`` holds sub-daily records (MJ/m² per record, or mean
+    W/m² with ``ghi_unit`` W) from 00:00 on the first day, in local standard
+    time when ``longitude`` and ``utc_offset`` are given, else solar time;
+    they run through the hourly engine and are reported per day.  ``format``
+    (query string or manifest option) streams the daily rows of every site as
+    one long csv/npz/xlsx/arrow/parquet table instead of JSON.
+    """
+    try:
+        sites, options = _load_manifest(request)
+        fmt = _export_format(request, options)
+        parsed_files = {}
+        _prefetch_grid(sites, parsed_files)
+        inputs = [_site_inputs(i, site, request.FILES, parsed_files) for i, site in enumerate(sites)]
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    if fmt != 'json':
+        return export_response(site_batch_table(inputs), fmt, filename='solar_batch_results')
+    include_daily = _flag(options.get('include_daily'), default=True)
+    return JsonResponse({'sites': compute_site_batch(inputs, include_daily=include_daily)})
+
+
+# --------------------------------------------------------------------------- #
+# SINGLE-SITE JSON API (no figure rendering)                                  #
+# --------------------------------------------------------------------------- #
+def _form_data(payload):
+    """Flatten a JSON request into the field layout RadiationForm expects.
+
+    Lists become comma-separated strings, booleans become checkbox values and
+    ``monthly_ghi`` / ``monthly_sunshine`` (12 values) fill the per-month fields.
+    """
+    data = {}
+    for key, value in payload.items():
+        if key in ('monthly_ghi', 'monthly_sunshine'):
+            suffix = key.split('_', 1)[1]
+            for month, month_value in zip(MONTHS, value or []):
+                data[f'month_{month}_{suffix}'] = str(month_value)
+        elif isinstance(value, bool):
+            data[key] = 'on' if value else ''
+        elif isinstance(value, list):
+            data[key] = ','.join(str(v) for v in value)
+        else:
+            data[key] = '' if value is None else str(value)
+    return data
+
+
+def _read_api_request(request):
+    """Return ``(data, files)`` from a JSON body or a form/multipart POST."""
+    if request.content_type == 'application/json':
+        try:
+            payload = json.loads(request.body)
+        except json.JSONDecodeError:
+            raise InputError('Invalid JSON body') from None
+        if not isinstance(payload, dict):
+            raise InputError('The JSON body must be an object')
+        return _form_data(payload), {}
+    return request.POST, request.FILES
+
+
+def _optima_payload(optima):
+    return {
+        'monthly': {
+            'month': optima['monthly']['month'].tolist(),
+            'optimal_tilt': _json_column(optima['monthly']['optimal_tilt'], 3),
+            'It': _json_column(optima['monthly']['It'], 3),
+        },
+        'seasonal': {
+            'season': optima['seasonal']['season'],
+            'optimal_tilt': _json_column(optima['seasonal']['optimal_tilt'], 3),
+            'It': _json_column(optima['seasonal']['It'], 3),
+        },
+        'annual': {key: _json_column([value], 3)[0] for key, value in optima['annual'].items()},
+    }
+
+
+def compute_results(inputs, tilt_step=1.0, azimuth_step=5.0, report_progress=None):
+    """Columnar JSON payload for normalized calculator inputs.
+
+    Mirrors what ``views.compute_outputs`` shows for the same mode, as plain
+    arrays: the per-row ``columns``, plus ``tilt_analysis``,
+    ``optimal_tilt``, ``albedo_sensitivity`` and ``orientation_analysis``
+    when those analyses apply.  ``report_progress(fraction)`` is called
+    between stages (jobs use it as their heartbeat).
+    """
+    report_progress = report_progress or (lambda fraction: None)
+    series = inputs['series']
+    lat, tilt, albedo = inputs['lat'], inputs['tilt'], inputs['albedo']
+    azimuth = inputs.get('azimuth')
+    kind = series['kind']
+
+    decomposition = decompose(series['days'], series['ghi'], lat)
+    columns = transpose(decomposition, tilt, albedo, azimuth)
+    payload = {
+        'mode': inputs['mode'],
+        'label': series['label'],
+        'latitude': lat,
+        'tilt': tilt,
+        'azimuth': azimuth,
+        'albedo': albedo,
+        'year': inputs['year'],
+        'columns': {series['index_key']: list(series['labels'])},
+    }
+    payload['columns'].update(
+        {key: _json_column(columns[key], digits) for key, digits in RESULT_PRECISION.items()})
+    report_progress(0.2)
+
+    if inputs['tilt_analysis'] and kind != '12_month':
+        sweep = tilt_sweep(None, None, None, tilts=tilt_grid(tilt_step), albedo=albedo,
+                           decomposition=decomposition, surface_azimuth_deg=azimuth)
+        payload['tilt_analysis'] = {
+            'tilt': _json_column(sweep['tilt'], 3),
+            'Hd': _json_column(sweep['Hd'], 3),
+            'Hb': _json_column(sweep['Hb'], 3),
+            'It': _json_column(sweep['It'], 3),
+            'optimal_tilt': float(sweep['optimal_tilt']),
+            'max_It': _json_column([sweep['max_It']], 3)[0],
+        }
+    report_progress(0.4)
+
+    if kind == '12_month' or (kind == '365_days' and inputs['yearly_optimal_tilt']):
+        year = inputs['year'] if kind == '365_days' else None
+        payload['optimal_tilt'] = _optima_payload(
+            optimal_tilts(None, None, None, albedo=albedo, year=year, dates=series.get('dates'),
+                          decomposition=decomposition, surface_azimuth_deg=azimuth))
+    report_progress(0.6)
+
+    if inputs.get('albedo_sweep'):
+        sensitivity = albedo_tilt_sweep(None, None, None, inputs['albedo_sweep'], tilts=tilt_grid(tilt_step),
+                                        decomposition=decomposition, surface_azimuth_deg=azimuth)
+        payload['albedo_sensitivity'] = {
+            'albedo': sensitivity['albedo'].tolist(),
+            'tilt': _json_column(sensitivity['tilt'], 3),
+            'It': [_json_column(row, 3) for row in sensitivity['It']],
+            'optimal_tilt': _json_column(sensitivity['optimal_tilt'], 3),
+            'max_It': _json_column(sensitivity['max_It'], 3),
+        }
+    report_progress(0.8)
+
+    if inputs.get('orientation_analysis'):
+        grid = orientation_grid(None, None, None, tilts=tilt_grid(tilt_step), azimuths=azimuth_grid(azimuth_step),
+                                albedo=albedo, decomposition=decomposition)
+        payload['orientation_analysis'] = {
+            'tilt': _json_column(grid['tilt'], 3),
+            'azimuth': _json_column(grid['azimuth'], 3),
+            'It': [_json_column(row, 3) for row in grid['It']],
+            'optimal_tilt': float(grid['optimal_tilt']),
+            'optimal_azimuth': float(grid['optimal_azimuth']),
+            'max_It': _json_column([grid['max_It']], 3)[0],
+        }
+
+    if series.get('dates'):
+        summary = summarize_radiation(series['dates'], series['ghi'], lat, tilt, albedo, azimuth)
+        payload['summary'] = {
+            period: {key: (_json_column(values, 3) if values.dtype.kind == 'f' else values.tolist())
+                     for key, values in columns.items()}
+            for period, columns in summary.items()
+        }
+
+    return payload
+
+
+def _serializable_inputs(inputs):
+    series = dict(inputs['series'])
+    series['ghi'] = np.asarray(series['ghi'], dtype=float).tolist()
+    series['days'] = list(series['days'])
+    return dict(inputs, series=series)
+
+
+@csrf_exempt
+@require_POST
+def compute(request):
+    """JSON counterpart of the calculator form for machine clients.
+
+    Takes the same fields as the HTML form (as a JSON object or a form/multipart
+    POST with an optional ``csv_file``) and returns compact columnar arrays;
+    plotly is never imported on this path.  ``tilt_step`` / ``azimuth_step``
+    set the sweep and orientation grid resolution in degrees (grids larger
+    than inputs.MAX_SWEEP_CELLS / MAX_ORIENTATION_CELLS are rejected), and ``async``
+    queues the computation as a job.
+    """
+    try:
+        data, files = _read_api_request(request)
+        form = RadiationForm(data, files)
+        if not form.is_valid():
+            return JsonResponse({'error': 'Invalid input', 'fields': form.errors}, status=400)
+        inputs = read_inputs(form, data, files)
+        tilt_step = _grid_step(data, 'tilt_step', 1.0, 90)
+        azimuth_step = _grid_step(data, 'azimuth_step', 5.0, 180)
+        check_grid_size(inputs, tilt_step, azimuth_step)
+    except InputError as e:
+        return JsonResponse({'error': str(e), 'field': e.field}, status=400)
+
+    if _flag(data.get('async')):
+        job = submit_job('compute', {'inputs': _serializable_inputs(inputs), 'tilt_step': tilt_step,
+                                     'azimuth_step': azimuth_step})
+        payload = job_status(job)
+        payload['status_url'] = reverse('api_job_status', args=[job.id])
+        payload['result_url'] = reverse('api_job_result', args=[job.id])
+        return JsonResponse(payload, status=202)
+
+    series = inputs['series']
+    key = result_cache_key(
+        format='json', lat=inputs['lat'], tilt=inputs['tilt'], azimuth=inputs['azimuth'], mode=inputs['mode'],
+        ghi_unit=inputs['ghi_unit'], ghi=series['ghi'], year=inputs['year'],
+        albedo=inputs['albedo'], albedo_sweep=inputs['albedo_sweep'],
+        days=series['days'], labels=series['labels'],
+        tilt_analysis=inputs['tilt_analysis'],
+        yearly_optimal_tilt=inputs['yearly_optimal_tilt'], tilt_step=tilt_step,
+        orientation_analysis=inputs['orientation_analysis'], azimuth_step=azimuth_step,
+    )
+    return JsonResponse(get_or_compute_result(key, lambda: compute_results(inputs, tilt_step, azimuth_step)))
+
+# --------------------------------------------------------------------------- #
+# BACKGROUND JOBS                                                             #
+# --------------------------------------------------------------------------- #
+@register_job_kind('batch')
+def run_batch_job(params, report_progress):
+    sites = [
+        dict(site, ghi=np.asarray(site['ghi'], dtype=float), days=np.asarray(site['days']),
+             azimuth=site.get('azimuth'),
+             dates=None if site['dates'] is None else np.asarray(site['dates'], dtype='datetime64[D]'))
+        for site in params['sites']
+    ]
+    results = []
+    for start in range(0, len(sites), JOB_CHUNK_SITES):
+        chunk = sites[start:start + JOB_CHUNK_SITES]
+        results.extend(compute_site_batch(chunk, include_daily=params['include_daily']))
+        report_progress((start + len(chunk)) / len(sites))
+    return {'sites': results}
+
+
+@register_job_kind('compute')
+def run_compute_job(params, report_progress):
+    return compute_results(params['inputs'], params['tilt_step'], params.get('azimuth_step', 5.0),
+                           report_progress)
+
+
+@csrf_exempt
+@require_POST
+def job_submit(request):
+    """Queue a batch computation and return its job id immediately (202).
+
+    Takes the same input as ``batch``; uploaded series are parsed here so the
+    stored job is self-contained.  Poll ``status_url`` until ``done``.
+    """
+    try:
+        sites, options = _load_manifest(request)
+        parsed_files = {}
+        _prefetch_grid(sites, parsed_files)
+        inputs = [_site_inputs(i, site, request.FILES, parsed_files) for i, site in enumerate(sites)]
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    job = submit_job('batch', {
+        'sites': [
+            dict(site, ghi=site['ghi'].tolist(), days=site['days'].tolist(),
+                 dates=None if site['dates'] is None else site['dates'].astype(str).tolist())
+            for site in inputs
+        ],
+        'include_daily': _flag(options.get('include_daily'), default=True),
+    })
+    payload = job_status(job)
+    payload['status_url'] = reverse('api_job_status', args=[job.id])
+    payload['result_url'] = reverse('api_job_result', args=[job.id])
+    return JsonResponse(payload, status=202)
+
+
+@require_GET
+def job_status_view(request, job_id):
+    start_workers()
+    fail_stale_jobs()
+    job = get_object_or_404(Job, id=job_id)
+    payload = job_status(job)
+    if job.status == Job.DONE:
+        payload['result_url'] = reverse('api_job_result', args=[job.id])
+    return JsonResponse(payload)
+
+
+@require_GET
+def job_result(request, job_id):
+    """Output of a finished job: JSON, or a table export with ``?format=``."""
+    start_workers()
+    fail_stale_jobs()
+    job = get_object_or_404(Job, id=job_id)
+    if job.status == Job.FAILED:
+        return JsonResponse({'error': job.error}, status=500)
+    if job.status != Job.DONE:
+        return JsonResponse(job_status(job), status=409)
+    try:
+        fmt = _export_format(request)
+        if fmt == 'json':
+            return JsonResponse(job.result)
+        if job.kind == 'compute':
+            table = ResultTable.from_dict(job.result['columns'])
+        else:
+            table = _entries_table(job.result['sites'])
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return export_response(table, fmt, filename=f'solar_{job.kind}_{job.id}')
@@ -1,6 +1,23 @@
 from django.apps import AppConfig
+from django.conf import settings
+
+
+def preload_dependencies():
+    """Import and warm the heavy optional dependencies ahead of the first request.
+
+    Request paths import plotly (server-side figures) and openpyxl (XLSX
+    uploads) lazily; long-lived workers can pay that cost at start-up instead.
+    """
+    import openpyxl  # noqa: F401
+
+    from .utils import plotting
+    plotting.warm_up()
 
 
 class SolarCalcConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'solar_calc'
+
+    def ready(self):
+        if getattr(settings, 'SOLAR_CALC_PRELOAD', False):
+            preload_dependencies()
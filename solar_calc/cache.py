@@ -0,0 +1,91 @@
+import hashlib
+import json
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from .models import ResultDownload
+from .utils.hdkr_calc import ResultTable
+
+# Bump when the engine or the plots change so stale entries are never served
+RESULT_CACHE_VERSION = 1
+RESULT_CACHE_ALIAS = 'results'
+# Seconds a stored result stays downloadable (see models.ResultDownload)
+DOWNLOAD_TIMEOUT = 30 * 60
+
+
+def result_cache():
+    """Cache backend holding computed results (falls back to ``default``)."""
+    alias = getattr(settings, 'SOLAR_CALC_RESULT_CACHE', RESULT_CACHE_ALIAS)
+    return caches[alias if alias in settings.CACHES else 'default']
+
+
+def _normalize(value):
+    if isinstance(value, (list, tuple, np.ndarray)):
+        array = np.asarray(value)
+        if array.dtype.kind in 'iuf':
+            return hashlib.sha256(np.ascontiguousarray(array, dtype=float).tobytes()).hexdigest()
+        return [str(item) for item in value]
+    if isinstance(value, float):
+        return repr(value)
+    return value if value is None or isinstance(value, (bool, int, str)) else str(value)
+
+
+def result_cache_key(**inputs):
+    """Content-addressed key for a computation over normalized inputs.
+
+    Numeric vectors (GHI, day numbers) are hashed from their float64 bytes, so
+    the same series submitted as text or as a file maps to the same entry.
+    """
+    payload = json.dumps({name: _normalize(value) for name, value in inputs.items()},
+                         sort_keys=True)
+    digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    return f'hdkr-result:v{RESULT_CACHE_VERSION}:{digest}'
+
+
+def get_or_compute_result(key, compute):
+    """Return the cached value for ``key`` or store and return ``compute()``."""
+    cache = result_cache()
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value)
+    return value
+
+
+def download_token(key):
+    """Short public token for the result computed under ``key``."""
+    return key.rsplit(':', 1)[-1][:32]
+
+
+def store_download(token, table):
+    """Keep a ResultTable in the database so any worker can stream it by token.
+
+    A row with more than half its lifetime left is reused as is, so repeated
+    submissions of the same inputs only cost one lookup.  Expired rows are
+    removed by ``purge_downloads`` (the ``purge_jobs`` command).
+    """
+    timeout = getattr(settings, 'SOLAR_CALC_DOWNLOAD_TIMEOUT', DOWNLOAD_TIMEOUT)
+    now = timezone.now()
+    fresh_until = now + timedelta(seconds=timeout / 2)
+    if ResultDownload.objects.filter(token=token, expires_at__gt=fresh_until).exists():
+        return
+    ResultDownload.objects.update_or_create(token=token, defaults={
+        'table': table.to_dict(),
+        'expires_at': now + timedelta(seconds=timeout),
+    })
+
+
+def purge_downloads():
+    """Delete expired download rows; returns how many were removed."""
+    deleted, _ = ResultDownload.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
+
+
+def load_download(token):
+    """The stored ResultTable for ``token``, or None once it has expired."""
+    stored = ResultDownload.objects.filter(token=token, expires_at__gt=timezone.now()).first()
+    return None if stored is None else ResultTable.from_dict(stored.table)
@@ -0,0 +1,120 @@
+import csv
+import tempfile
+from importlib.util import find_spec
+
+import numpy as np
+from django.http import StreamingHttpResponse
+
+# Rows formatted per streamed chunk
+EXPORT_CHUNK_ROWS = 2048
+# Bytes read per chunk when a writer has to build a file first (zip / parquet)
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+# format -> (writer(table) yielding str/bytes chunks, content type)
+EXPORT_FORMATS = {}
+
+
+def register_export(fmt, content_type):
+    """Decorator registering a streaming writer for download format ``fmt``."""
+    def decorator(writer):
+        EXPORT_FORMATS[fmt] = (writer, content_type)
+        return writer
+    return decorator
+
+
+# Writers take any table exposing keys(), table[key] -> 1-D array and len():
+# a ResultTable, or the long per-site table built by api.site_batch_table.
+
+def iter_record_chunks(table, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Row tuples of a table in ``keys()`` order, ``chunk_rows`` at a time."""
+    columns = [table[key] for key in table.keys()]
+    for start in range(0, len(table), chunk_rows):
+        yield list(zip(*(column[start:start + chunk_rows].tolist() for column in columns)))
+
+
+# Numeric columns stay numeric; labels (days, months, ISO dates) become fixed
+# width unicode so NPZ files load without pickle
+def _plain_array(values):
+    values = np.asarray(values)
+    return values if values.dtype.kind in 'biuf' else values.astype(str)
+
+
+def _iter_file(handle):
+    handle.seek(0)
+    try:
+        while chunk := handle.read(EXPORT_CHUNK_BYTES):
+            yield chunk
+    finally:
+        handle.close()
+
+
+class _Echo:
+    """File-like sink: csv.writer hands back each formatted line."""
+
+    def write(self, value):
+        return value
+
+
+@register_export('csv', 'text/csv')
+def iter_csv(table):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(table.keys())
+    for chunk in iter_record_chunks(table):
+        yield ''.join(writer.writerow(record) for record in chunk)
+
+
+@register_export('npz', 'application/octet-stream')
+def iter_npz(table):
+    handle = tempfile.TemporaryFile()
+    np.savez_compressed(handle, **{key: _plain_array(table[key]) for key in table.keys()})
+    yield from _iter_file(handle)
+
+
+@register_export('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+def iter_xlsx(table):
+    from openpyxl import Workbook  # ~200 ms to import; only XLSX downloads need it
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Results')
+    sheet.append(table.keys())
+    for chunk in iter_record_chunks(table):
+        for record in chunk:
+            sheet.append(record)
+    handle = tempfile.TemporaryFile()
+    workbook.save(handle)
+    yield from _iter_file(handle)
+
+
+# Arrow IPC and Parquet need pyarrow, which is optional
+def _arrow_table(table):
+    import pyarrow as pa
+
+    return pa.table({key: _plain_array(table[key]) for key in table.keys()})
+
+
+if find_spec('pyarrow') is not None:
+    @register_export('arrow', 'application/vnd.apache.arrow.file')
+    def iter_arrow(table):
+        import pyarrow as pa
+
+        data = _arrow_table(table)
+        handle = tempfile.TemporaryFile()
+        with pa.ipc.new_file(handle, data.schema) as writer:
+            writer.write_table(data, max_chunksize=EXPORT_CHUNK_ROWS)
+        yield from _iter_file(handle)
+
+    @register_export('parquet', 'application/vnd.apache.parquet')
+    def iter_parquet(table):
+        import pyarrow.parquet as pq
+
+        handle = tempfile.TemporaryFile()
+        pq.write_table(_arrow_table(table), handle)
+        yield from _iter_file(handle)
+
+
+def export_response(table, fmt, filename='solar_radiation_results'):
+    """StreamingHttpResponse writing ``table`` in a registered format."""
+    writer, content_type = EXPORT_FORMATS[fmt]
+    response = StreamingHttpResponse(writer(table), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+    return response
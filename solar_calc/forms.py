@@ -23,6 +23,14 @@ class RadiationForm(forms.Form):
         widget=forms.NumberInput(attrs={'step': '0.01'})
     )
 
+    azimuth = forms.FloatField(
+        required=False,
+        label='Surface Azimuth (°)',
+        widget=forms.NumberInput(attrs={'step': '0.01', 'min': -180, 'max': 180}),
+        help_text='0 = south, east negative, west positive, ±180 = north; '
+                  'leave blank for the classic south-facing (noon ratio) model'
+    )
+
     date = forms.DateField(
         required=False,
         label='Date (for Single Day)',
@@ -46,6 +54,7 @@ class RadiationForm(forms.Form):
 
 
     ghi = forms.CharField(
+        required=False,
         label='GHI Value(s)',
         help_text="For full month, enter comma-separated values."
     )
@@ -56,6 +65,18 @@ class RadiationForm(forms.Form):
         help_text="Only required if GHI is in W/m²"
     )
 
+    albedo = forms.CharField(
+        required=False,
+        label='Ground Albedo',
+        help_text="One value (default 0.2), 12 monthly values or one value per day, comma-separated."
+    )
+
+    albedo_sweep = forms.CharField(
+        required=False,
+        label='Albedo Sensitivity',
+        help_text="Comma-separated albedo values to compare across tilt angles (optional)."
+    )
+
     ghi_unit = forms.ChoiceField(
         label='GHI Unit',
         choices=UNIT_CHOICES
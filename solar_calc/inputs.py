@@ -0,0 +1,271 @@
+import calendar
+import datetime
+from calendar import monthrange
+
+from .utils.hdkr_calc import MONTH_MID_DAYS, albedo_series, azimuth_grid, date_index, tilt_grid
+from .utils.ingest import parse_uploaded_file, parse_uploaded_series
+
+MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun',
+          'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+
+DEFAULT_ALBEDO = 0.2
+# Most albedo values one sensitivity sweep may compare
+MAX_ALBEDO_SWEEP = 50
+# Largest grids one request may evaluate: tilts × rows (× albedos) for the tilt
+# and albedo sweeps, tilts × azimuths for the orientation grid
+MAX_SWEEP_CELLS = 2_000_000
+MAX_ORIENTATION_CELLS = 50_000
+
+
+class InputError(ValueError):
+    """Invalid calculator input; ``field`` names the form field it belongs to."""
+
+    def __init__(self, message, field=None):
+        super().__init__(message)
+        self.field = field
+
+
+def _to_mj(ghi, sun):
+    return [(g * s * 3600) / 1e6 for g, s in zip(ghi, sun)]
+
+
+def _float_values(raw):
+    return [float(x.strip()) for x in raw.split(',') if x.strip()]
+
+
+# --------------------------------------------------------------------------- #
+# Per-mode readers: each returns the normalized input series                  #
+# --------------------------------------------------------------------------- #
+def _read_monthly(data, ghi_unit):
+    ghi_vals_mj = []
+    for m in MONTHS:
+        g_raw = data.get(f'month_{m}_ghi')
+        s_raw = data.get(f'month_{m}_sunshine')
+        if not g_raw:
+            raise InputError(f'Missing GHI for {m.capitalize()}')
+
+        if ghi_unit == 'W':
+            if not s_raw:
+                raise InputError(f'Missing sunshine for {m.capitalize()}')
+            ghi_vals_mj.append((float(g_raw) * float(s_raw) * 3600) / 1e6)
+        else:
+            ghi_vals_mj.append(float(g_raw))
+
+    return {
+        'kind': '12_month',
+        'days': MONTH_MID_DAYS,
+        'ghi': ghi_vals_mj,
+        'index_key': 'month',
+        'labels': list(range(1, 13)),
+        'label': '12-Month Average',
+    }
+
+
+def _read_daily_year(cleaned, files, ghi_unit, year):
+    # A leap year takes 366 values; 365 keeps the plain day numbering
+    year_days = 366 if calendar.isleap(year) else 365
+    dates = None
+    try:
+        csv_file = files.get('csv_file')
+        if csv_file:
+            dates, ghi_vals = parse_uploaded_series(csv_file, ghi_unit)
+            if dates is None and len(ghi_vals) not in (365, year_days):
+                raise ValueError(f"Expected {year_days} GHI values (or add a Date column)")
+        else:
+            ghi_vals = _float_values(cleaned['ghi'])
+            if ghi_unit == 'W':
+                sun_vals = _float_values(cleaned['sunshine_hours'])
+                if len(ghi_vals) not in (365, year_days) or len(sun_vals) != len(ghi_vals):
+                    raise ValueError(f"{year_days} GHI and Sunshine values required")
+                ghi_vals = _to_mj(ghi_vals, sun_vals)
+            elif len(ghi_vals) not in (365, year_days):
+                raise ValueError(f"{year_days} GHI values required")
+    except Exception as e:
+        raise InputError(f"Yearly data error: {e}", field='csv_file') from e
+
+    if dates is not None:
+        # Date-indexed upload: any length, possibly spanning several years
+        if not len(dates):
+            raise InputError("Yearly data error: the uploaded file has no rows", field='csv_file')
+        labels = dates.astype(str).tolist()
+        return {
+            'kind': '365_days',
+            'days': date_index(dates)[1].tolist(),
+            'dates': labels,
+            'ghi': ghi_vals,
+            'index_key': 'day',
+            'labels': labels,
+            'label': f"{labels[0]} to {labels[-1]}",
+        }
+
+    return {
+        'kind': '365_days',
+        'days': list(range(1, len(ghi_vals) + 1)),
+        'ghi': ghi_vals,
+        'index_key': 'day',
+        'labels': list(range(1, len(ghi_vals) + 1)),
+        'label': f'Full Year ({len(ghi_vals)} Days)',
+    }
+
+
+def _read_full_month(cleaned, files, ghi_unit, year):
+    month = int(cleaned['month'])
+    num_days = monthrange(year, month)[1]
+
+    csv_file = files.get('csv_file')
+    if csv_file:
+        try:
+            ghi_vals = parse_uploaded_file(csv_file, ghi_unit, num_days)
+        except Exception as e:
+            raise InputError(f"Full-month data error: {e}", field='csv_file') from e
+    else:
+        try:
+            ghi_vals = _float_values(cleaned['ghi'])
+            if ghi_unit == 'W':
+                sun_vals = _float_values(cleaned['sunshine_hours'])
+                if len(ghi_vals) != len(sun_vals):
+                    raise InputError('GHI and sunshine count must match.', field='ghi')
+                ghi_vals = _to_mj(ghi_vals, sun_vals)
+        except InputError:
+            raise
+        except ValueError:
+            raise InputError('Invalid GHI or Sunshine input format.', field='ghi') from None
+
+    if len(ghi_vals) != num_days:
+        raise InputError(f'Enter exactly {num_days} GHI values.', field='ghi')
+
+    return {
+        'kind': 'full_month',
+        'days': [datetime.date(year, month, day).timetuple().tm_yday
+                 for day in range(1, num_days + 1)],
+        'ghi': ghi_vals,
+        'index_key': 'day',
+        'labels': [f"{day:02d}-{month:02d}" for day in range(1, num_days + 1)],
+        'label': datetime.date(year, month, 1).strftime('%B %Y'),
+    }
+
+
+def _read_single_day(cleaned, ghi_unit):
+    date = cleaned['date']
+    if not date:
+        raise InputError('Please select a valid date.', field='date')
+
+    try:
+        if ghi_unit == 'MJ':
+            H = float(cleaned['ghi'].strip())
+        else:
+            g = float(cleaned['ghi'].strip())
+            s = float(cleaned['sunshine_hours'].strip())
+            H = (g * s * 3600) / 1e6
+    except ValueError:
+        raise InputError('Invalid GHI input.', field='ghi') from None
+
+    return {
+        'kind': 'single_day',
+        'days': [date.timetuple().tm_yday],
+        'ghi': [H],
+        'index_key': 'day',
+        'labels': [date.strftime('%d-%b')],
+        'label': date.strftime('%d %B %Y'),
+    }
+
+
+# --------------------------------------------------------------------------- #
+# Ground albedo: one value, 12 monthly values or one per row of the series     #
+# --------------------------------------------------------------------------- #
+def _read_albedo(cleaned, series, year):
+    raw = cleaned.get('albedo') or ''
+    try:
+        values = _float_values(raw) if raw.strip() else [DEFAULT_ALBEDO]
+        albedo = albedo_series(values, series['days'], year=year, dates=series.get('dates'))
+    except ValueError as e:
+        raise InputError(f'Invalid albedo: {e}', field='albedo') from None
+    return albedo if isinstance(albedo, float) else albedo.tolist()
+
+
+def _read_albedo_sweep(cleaned):
+    raw = cleaned.get('albedo_sweep') or ''
+    if not raw.strip():
+        return None
+    try:
+        values = _float_values(raw)
+    except ValueError:
+        raise InputError('Invalid albedo sensitivity values.', field='albedo_sweep') from None
+    if len(values) > MAX_ALBEDO_SWEEP:
+        raise InputError(f'Enter at most {MAX_ALBEDO_SWEEP} albedo sensitivity values.', field='albedo_sweep')
+    if not all(0 <= value <= 1 for value in values):
+        raise InputError('Albedo sensitivity values must be between 0 and 1.', field='albedo_sweep')
+    return values
+
+
+def check_grid_size(inputs, tilt_step=1.0, azimuth_step=5.0):
+    """Reject sweeps whose grids exceed MAX_SWEEP_CELLS / MAX_ORIENTATION_CELLS."""
+    n_tilts = len(tilt_grid(tilt_step))
+    rows = len(inputs['series']['days'])
+    n_albedos = len(inputs['albedo_sweep'] or [])
+    if n_albedos and n_tilts * rows * n_albedos > MAX_SWEEP_CELLS:
+        raise InputError(f'Too many albedo sensitivity values for {rows} rows: the sweep may evaluate at most '
+                         f'{MAX_SWEEP_CELLS} albedo × tilt × row cells', field='albedo_sweep')
+    if inputs['tilt_analysis'] and n_tilts * rows > MAX_SWEEP_CELLS:
+        raise InputError(f'tilt_step {tilt_step:g} is too fine for {rows} rows: a sweep may evaluate at most '
+                         f'{MAX_SWEEP_CELLS} tilt × row cells', field='tilt_step')
+    n_azimuths = len(azimuth_grid(azimuth_step))
+    if inputs['orientation_analysis'] and n_tilts * n_azimuths > MAX_ORIENTATION_CELLS:
+        raise InputError(f'tilt_step / azimuth_step too fine: the orientation grid may have at most '
+                         f'{MAX_ORIENTATION_CELLS} tilt × azimuth cells', field='azimuth_step')
+
+
+def read_inputs(form, data, files):
+    """Normalize a validated RadiationForm plus the extra POST fields.
+
+    Returns the scalar settings and ``series``: the day numbers, daily GHI in
+    MJ/m²/day, row labels and chart label for the selected mode.  ``albedo``
+    is a float or one value per series row; ``albedo_sweep`` lists the values
+    for the albedo sensitivity analysis (None when not requested).  Raises
+    InputError with the message (and field) to report back to the user.
+    """
+    cleaned = form.cleaned_data
+    mode = cleaned['mode']          # single_day / full_month / 12_month / 365_days
+    ghi_unit = cleaned['ghi_unit']  # MJ or W
+    year = cleaned['year'] or datetime.datetime.now().year
+
+    if mode == '365_days':
+        year_input_mode = 'daily'
+    else:
+        year_input_mode = data.get('year_input_mode') or 'monthly'
+
+    if mode in ['12_month', '365_days']:
+        try:
+            if year_input_mode == 'monthly':
+                series = _read_monthly(data, ghi_unit)
+            elif year_input_mode == 'daily':
+                series = _read_daily_year(cleaned, files, ghi_unit, year)
+            else:
+                raise InputError('Invalid yearly input mode.')
+        except InputError:
+            raise
+        except Exception as e:
+            raise InputError(f'Yearly processing error: {e}') from e
+    elif mode == 'full_month':
+        series = _read_full_month(cleaned, files, ghi_unit, year)
+    else:
+        series = _read_single_day(cleaned, ghi_unit)
+
+    azimuth = cleaned.get('azimuth')
+    if azimuth is not None and not -180 <= azimuth <= 180:
+        raise InputError('Surface azimuth must be between -180 and 180.', field='azimuth')
+
+    return {
+        'lat': cleaned['latitude'],
+        'tilt': cleaned['tilt'],
+        'azimuth': azimuth,
+        'mode': mode,
+        'ghi_unit': ghi_unit,
+        'year': year,
+        'albedo': _read_albedo(cleaned, series, year),
+        'albedo_sweep': _read_albedo_sweep(cleaned),
+        'tilt_analysis': bool(data.get('tilt_analysis')),
+        'yearly_optimal_tilt': bool(data.get('yearly_optimal_tilt')),
+        'orientation_analysis': bool(data.get('orientation_analysis')),
+        'series': series,
+    }
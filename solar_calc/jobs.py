@@ -0,0 +1,141 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# kind -> handler(params, report_progress) returning a JSON-serializable result
+JOB_HANDLERS = {}
+
+# Seconds without a progress update after which a running job counts as lost
+JOB_STALE_AFTER = 15 * 60
+# Seconds finished jobs (and their stored results) are kept before purging
+JOB_RETENTION = 7 * 24 * 60 * 60
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def register_job_kind(kind):
+    """Decorator registering the handler that runs jobs of ``kind``."""
+    def decorator(handler):
+        JOB_HANDLERS[kind] = handler
+        return handler
+    return decorator
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'SOLAR_CALC_JOB_WORKERS', 2),
+                thread_name_prefix='solar-calc-job',
+            )
+            _recover_jobs(_executor)
+        return _executor
+
+
+def start_workers():
+    """Start the local worker pool, picking up jobs left by an earlier process."""
+    _get_executor()
+
+
+def _recover_jobs(executor):
+    """Re-dispatch queued jobs and fail lost running ones (first pool start only).
+
+    Dispatch is in-memory, so after a restart queued rows would never run and
+    running rows would never finish.  ``run_job`` claims a row atomically, so
+    a job seen by several processes still runs once.
+    """
+    try:
+        fail_stale_jobs()
+        for job_id in Job.objects.filter(status=Job.QUEUED).values_list('id', flat=True):
+            executor.submit(run_job, job_id)
+    except DatabaseError:
+        logger.exception('Could not recover queued jobs')
+
+
+def fail_stale_jobs():
+    """Mark running jobs with no recent progress as failed; returns how many."""
+    stale_after = getattr(settings, 'SOLAR_CALC_JOB_STALE_AFTER', JOB_STALE_AFTER)
+    now = timezone.now()
+    return Job.objects.filter(status=Job.RUNNING, updated_at__lt=now - timedelta(seconds=stale_after)).update(
+        status=Job.FAILED, error='Job was interrupted before it finished; please resubmit', updated_at=now,
+    )
+
+
+def purge_jobs(older_than=None):
+    """Delete finished jobs last updated more than ``older_than`` seconds ago."""
+    if older_than is None:
+        older_than = getattr(settings, 'SOLAR_CALC_JOB_RETENTION', JOB_RETENTION)
+    cutoff = timezone.now() - timedelta(seconds=older_than)
+    deleted, _ = Job.objects.filter(status__in=[Job.DONE, Job.FAILED], updated_at__lt=cutoff).delete()
+    return deleted
+
+
+def submit_job(kind, params):
+    """Persist a queued job and hand it to the local worker pool.
+
+    The job is queued only once the surrounding transaction commits, so a
+    worker never picks up a row it cannot see yet.  Finished jobs past the
+    retention period are purged on the way.
+    """
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind '{kind}'")
+    purge_jobs()
+    job = Job.objects.create(kind=kind, params=params)
+    transaction.on_commit(lambda: _get_executor().submit(run_job, job.id))
+    return job
+
+
+def run_job(job_id):
+    """Execute one job in a worker thread, recording progress and outcome."""
+    close_old_connections()
+    try:
+        updated = Job.objects.filter(id=job_id, status=Job.QUEUED).update(
+            status=Job.RUNNING, updated_at=timezone.now(),
+        )
+        if not updated:
+            return
+        job = Job.objects.get(id=job_id)
+
+        # Progress doubles as the heartbeat that keeps fail_stale_jobs away;
+        # the outcome is only recorded while the row is still RUNNING, so a job
+        # already reported as failed never flips to done
+        running = Job.objects.filter(id=job_id, status=Job.RUNNING)
+
+        def report_progress(fraction):
+            running.update(progress=min(max(fraction, 0.0), 1.0), updated_at=timezone.now())
+
+        try:
+            result = JOB_HANDLERS[job.kind](job.params, report_progress)
+        except Exception as e:
+            logger.exception('Job %s failed', job_id)
+            running.update(status=Job.FAILED, error=str(e), updated_at=timezone.now())
+            return
+
+        if not running.update(result=result, status=Job.DONE, progress=1.0, updated_at=timezone.now()):
+            logger.warning('Job %s finished after it was marked failed; result discarded', job_id)
+    finally:
+        close_old_connections()
+
+
+def job_status(job):
+    """Status payload for the polling endpoint."""
+    return {
+        'id': str(job.id),
+        'kind': job.kind,
+        'status': job.status,
+        'progress': round(job.progress, 3),
+        'error': job.error or None,
+        'created_at': job.created_at.isoformat(),
+        'updated_at': job.updated_at.isoformat(),
+    }
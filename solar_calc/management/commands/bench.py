@@ -0,0 +1,245 @@
+import json
+import platform
+import statistics
+import time
+
+import django
+import numpy as np
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+from solar_calc.api import compute_site_batch
+from solar_calc.cache import result_cache
+from solar_calc.utils.hdkr_calc import (
+    calculate_io,
+    compute_daily_radiation,
+    compute_monthly_radiation,
+    compute_radiation_arrays,
+    date_range,
+    optimal_tilt_rows,
+    optimal_tilts,
+    orientation_grid,
+    tilt_sweep,
+)
+from solar_calc.utils.hdkr_hourly import compute_hourly_radiation
+
+# Row counts of the synthetic series: single day, month, year, and 8760 rows
+# (hourly for the hourly engine, a 24-year dated daily record elsewhere)
+SIZES = (1, 31, 365, 8760)
+MONTHS = ('jan', 'feb', 'mar', 'apr', 'may', 'jun',
+          'jul', 'aug', 'sep', 'oct', 'nov', 'dec')
+LATITUDE = 23.5
+TILT = 30.0
+ALBEDO = 0.2
+
+
+def _ghi(rows, seed=0):
+    """Plausible daily GHI (MJ/m²/day), reproducible per seed."""
+    return np.round(np.random.default_rng(seed).uniform(5, 28, rows), 2)
+
+
+def _dated_csv(rows):
+    dates = date_range('2000-01-01', rows).astype(str)
+    lines = ['Date,GHI'] + [f'{d},{h}' for d, h in zip(dates, _ghi(rows).tolist())]
+    return SimpleUploadedFile('bench.csv', '\n'.join(lines).encode(), content_type='text/csv')
+
+
+def _form_cases():
+    """(name, rows, POST data builder) for every calculator mode."""
+    base = {'latitude': str(LATITUDE), 'tilt': str(TILT), 'ghi_unit': 'MJ', 'year': '2023'}
+    H = _ghi(365)
+    return [
+        ('single_day', 1, lambda: dict(base, mode='single_day', date='2023-06-21', ghi='20',
+                                       tilt_analysis='on')),
+        ('full_month', 31, lambda: dict(base, mode='full_month', month='1',
+                                        ghi=','.join(map(str, H[:31])), tilt_analysis='on')),
+        ('12_month', 12, lambda: dict(base, mode='12_month', year_input_mode='monthly', ghi='0',
+                                      **{f'month_{m}_ghi': str(h) for m, h in zip(MONTHS, H)})),
+        ('365_days', 365, lambda: dict(base, mode='365_days', ghi=','.join(map(str, H)),
+                                       tilt_analysis='on', yearly_optimal_tilt='on')),
+        ('365_days_dated', 8760, lambda: dict(base, mode='365_days', ghi='', csv_file=_dated_csv(8760),
+                                              tilt_analysis='on', yearly_optimal_tilt='on')),
+    ]
+
+
+class Command(BaseCommand):
+    help = ('Time the HDKR engine, the plotting functions and full index() requests '
+            'on synthetic inputs, and report the timings as JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Timed runs per case after one warm-up run (default 5).')
+        parser.add_argument('--sites', type=int, default=100,
+                            help='Sites in the multi-site cases (default 100).')
+        parser.add_argument('--filter', default='',
+                            help='Only run cases whose name contains this text.')
+        parser.add_argument('--skip-views', action='store_true',
+                            help='Leave out the index() request cases.')
+        parser.add_argument('--format', choices=('json', 'text'), default='json')
+        parser.add_argument('--output', help='Also write the JSON report to this file.')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1')
+        cases = self.engine_cases(options['sites']) + self.plot_cases()
+        if not options['skip_views']:
+            cases += self.view_cases()
+        cases = [case for case in cases if options['filter'] in case[0]]
+
+        results = []
+        for name, group, rows, run, setup in cases:
+            timings = self.time_case(run, setup, options['repeat'])
+            results.append({
+                'name': name,
+                'group': group,
+                'rows': rows,
+                'repeat': options['repeat'],
+                'min_ms': round(min(timings), 3),
+                'median_ms': round(statistics.median(timings), 3),
+                'mean_ms': round(statistics.fmean(timings), 3),
+            })
+            if options['verbosity'] > 1:
+                self.stderr.write(f"{name}: {results[-1]['median_ms']} ms")
+
+        report = {
+            'meta': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'numpy': np.__version__,
+                'machine': platform.machine(),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'repeat': options['repeat'],
+                'sites': options['sites'],
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+        if options['format'] == 'json':
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            width = max((len(r['name']) for r in results), default=4)
+            self.stdout.write(f"{'case':<{width}}  {'rows':>6}  {'min ms':>10}  {'median ms':>10}")
+            for r in results:
+                self.stdout.write(f"{r['name']:<{width}}  {r['rows']:>6}  "
+                                  f"{r['min_ms']:>10.3f}  {r['median_ms']:>10.3f}")
+
+    @staticmethod
+    def time_case(run, setup, repeat):
+        """Milliseconds per run; ``setup`` runs before each call, untimed."""
+        timings = []
+        for i in range(repeat + 1):
+            state = setup() if setup else None
+            start = time.perf_counter()
+            run(state)
+            elapsed = (time.perf_counter() - start) * 1000
+            if i:  # the first run is the warm-up
+                timings.append(elapsed)
+        return timings
+
+    # Each case is (name, group, rows, run(state), setup() or None)
+
+    def engine_cases(self, n_sites):
+        cases = []
+        for rows in SIZES:
+            H = _ghi(rows)
+            days = np.arange(rows) % 365 + 1
+            start_date = '2000-01-01' if rows > 366 else None
+            cases += [
+                (f'calculate_io[{rows}]', 'engine', rows,
+                 lambda _, days=days: calculate_io(days, LATITUDE), None),
+                (f'compute_daily_radiation[{rows}]', 'engine', rows,
+                 lambda _, H=H, start_date=start_date: compute_daily_radiation(
+                     H, LATITUDE, TILT, ALBEDO, start_date=start_date), None),
+                (f'tilt_sweep[{rows}]', 'engine', rows,
+                 lambda _, days=days, H=H: tilt_sweep(days, H, LATITUDE, albedo=ALBEDO), None),
+            ]
+        H = _ghi(365)
+        days = np.arange(1, 366)
+        cases += [
+            ('compute_monthly_radiation[12]', 'engine', 12,
+             lambda _: compute_monthly_radiation(H[:12], LATITUDE, TILT, ALBEDO), None),
+            ('optimal_tilts[365]', 'engine', 365,
+             lambda _: optimal_tilts(days, H, LATITUDE, albedo=ALBEDO, year=2023), None),
+            ('orientation_grid[365]', 'engine', 365,
+             lambda _: orientation_grid(days, H, LATITUDE, albedo=ALBEDO), None),
+        ]
+
+        hours = np.arange(8760)
+        I = np.clip(np.sin(np.pi * ((hours % 24) - 6) / 12), 0, None) * _ghi(365).repeat(24) / 7.6
+        cases.append(('compute_hourly_radiation[8760]', 'engine', 8760,
+                      lambda _: compute_hourly_radiation(hours // 24 + 1, hours % 24, I,
+                                                         LATITUDE, TILT, ALBEDO), None))
+
+        site_H = np.stack([_ghi(365, seed) for seed in range(n_sites)])
+        site_lat = np.linspace(-60, 60, n_sites)
+        sites = [{'id': str(i), 'latitude': float(lat), 'tilt': TILT, 'azimuth': None, 'albedo': ALBEDO,
+                  'start_day': 1, 'dates': None, 'days': days, 'ghi': site_H[i]}
+                 for i, lat in enumerate(site_lat)]
+        rows = n_sites * 365
+        cases += [
+            (f'compute_radiation_arrays[{n_sites}x365]', 'multi_site', rows,
+             lambda _: compute_radiation_arrays(days, site_H, site_lat[:, None], TILT, ALBEDO), None),
+            (f'tilt_sweep[{n_sites}x365]', 'multi_site', rows,
+             lambda _: tilt_sweep(days, site_H, site_lat[:, None], albedo=ALBEDO), None),
+            (f'orientation_grid[{n_sites}x365]', 'multi_site', rows,
+             lambda _: orientation_grid(days, site_H, site_lat[:, None], albedo=ALBEDO), None),
+            (f'compute_site_batch[{n_sites}x365]', 'multi_site', rows,
+             lambda _: compute_site_batch(sites), None),
+        ]
+        return cases
+
+    def plot_cases(self):
+        from solar_calc.utils.plotting import (
+            plot_hd_hb_it_bars,
+            plot_optimal_tilt,
+            plot_radiation_vs_tilt,
+            plot_tilted_radiation,
+        )
+
+        cases = []
+        for rows in SIZES:
+            table = compute_daily_radiation(_ghi(rows), LATITUDE, TILT, ALBEDO,
+                                            start_date='2000-01-01' if rows > 366 else None)
+            cases += [
+                (f'plot_tilted_radiation[{rows}]', 'plot', rows,
+                 lambda _, table=table: plot_tilted_radiation(table), None),
+                (f'plot_hd_hb_it_bars[{rows}]', 'plot', rows,
+                 lambda _, table=table: plot_hd_hb_it_bars(table), None),
+            ]
+        H = _ghi(365)
+        days = np.arange(1, 366)
+        sweep = tilt_sweep(days, H, LATITUDE, albedo=ALBEDO)
+        optima = optimal_tilt_rows(optimal_tilts(days, H, LATITUDE, albedo=ALBEDO, year=2023))
+        cases += [
+            ('plot_radiation_vs_tilt[91]', 'plot', 91, lambda _: plot_radiation_vs_tilt(sweep), None),
+            ('plot_optimal_tilt[91]', 'plot', 91, lambda _: plot_optimal_tilt(sweep), None),
+            ('plot_optimal_tilt_monthly[13]', 'plot', len(optima),
+             lambda _: plot_optimal_tilt(optima, mode='monthly'), None),
+        ]
+        return cases
+
+    def view_cases(self):
+        """Full POST / requests, result cache cleared before each run."""
+        client = Client()
+
+        def post(data, rendering):
+            with override_settings(ALLOWED_HOSTS=['testserver'], SOLAR_CALC_CHART_RENDERING=rendering):
+                response = client.post('/', data)
+            if response.status_code != 200:
+                raise CommandError(f'index() returned {response.status_code}')
+
+        def fresh(build):
+            def setup():
+                result_cache().clear()
+                return build()
+            return setup
+
+        cases = []
+        for rendering in ('client', 'server'):
+            for mode, rows, build in _form_cases():
+                cases.append((f'index:{mode}:{rendering}[{rows}]', 'view', rows,
+                              lambda data, rendering=rendering: post(data, rendering), fresh(build)))
+        return cases
@@ -0,0 +1,101 @@
+import csv
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from solar_calc.utils.grid_archive import create_archive
+
+
+def _ascending(values, ghi, axis):
+    """Flip a descending coordinate axis (e.g. north-to-south rows) and its data."""
+    if len(values) > 1 and values[1] < values[0]:
+        return values[::-1], np.flip(ghi, axis=axis)
+    return values, ghi
+
+
+class Command(BaseCommand):
+    help = ('Convert gridded daily GHI into a memory-mapped archive (days × cells) for '
+            'nearest / bilinear lookups by latitude and longitude.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='.npz (ghi[day, lat, lon], lat, lon), .nc (needs xarray) '
+                                           'or a long .csv with Date,Latitude,Longitude,GHI columns.')
+        parser.add_argument('archive', help='Output directory.')
+        parser.add_argument('--variable', default='ghi', help='GHI variable in .npz/.nc files.')
+        parser.add_argument('--lat-name', default='lat')
+        parser.add_argument('--lon-name', default='lon')
+        parser.add_argument('--start-date', help='First day when the source carries no dates.')
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help='Factor converting source values to MJ/m²/day '
+                                 '(0.0864 for daily-mean W/m², 0.0036 for Wh/m²).')
+
+    def handle(self, *args, **options):
+        source = options['source']
+        try:
+            if source.lower().endswith('.csv'):
+                days = self.import_csv(source, options)
+            elif source.lower().endswith(('.npz', '.nc')):
+                days = self.import_array(source, options)
+            else:
+                raise CommandError('Unsupported source; use .npz, .nc or .csv')
+        except (OSError, KeyError, ValueError) as e:
+            raise CommandError(str(e)) from None
+        self.stdout.write(f"Wrote {days} days to {options['archive']}")
+
+    def import_array(self, source, options):
+        if source.lower().endswith('.nc'):
+            try:
+                import xarray
+            except ImportError:
+                raise CommandError('Reading NetCDF needs xarray; convert the grid to .npz instead') from None
+            with xarray.open_dataset(source) as dataset:
+                ghi = dataset[options['variable']].transpose(..., options['lat_name'], options['lon_name']).values
+                lats = dataset[options['lat_name']].values
+                lons = dataset[options['lon_name']].values
+                times = dataset['time'].values if 'time' in dataset.coords else None
+        else:
+            with np.load(source) as archive:
+                ghi = archive[options['variable']]
+                lats, lons = archive[options['lat_name']], archive[options['lon_name']]
+                times = archive['time'] if 'time' in archive.files else None
+
+        if ghi.ndim != 3:
+            raise CommandError('GHI must be a (day, lat, lon) array')
+        start = times[0] if times is not None and len(times) else options['start_date']
+        if start is None:
+            raise CommandError('The source has no time axis; pass --start-date')
+        lats, ghi = _ascending(np.asarray(lats, dtype=float), ghi, 1)
+        lons, ghi = _ascending(np.asarray(lons, dtype=float), ghi, 2)
+
+        data = create_archive(options['archive'], np.datetime64(start, 'D'), lats, lons, ghi.shape[0])
+        for first in range(0, ghi.shape[0], 366):
+            block = np.asarray(ghi[first:first + 366], dtype=float) * options['scale']
+            data[first:first + len(block)] = block.reshape(len(block), -1)
+        data.flush()
+        return ghi.shape[0]
+
+    # Two passes over the file: the first finds the grid and date range, the
+    # second writes each value into its (day, cell) slot.
+    def import_csv(self, source, options):
+        lats, lons = set(), set()
+        first = last = None
+        with open(source, newline='', encoding='utf-8-sig') as handle:
+            for row in csv.DictReader(handle):
+                day = np.datetime64(row['Date'].strip(), 'D')
+                first = day if first is None or day < first else first
+                last = day if last is None or day > last else last
+                lats.add(float(row['Latitude']))
+                lons.add(float(row['Longitude']))
+        if first is None:
+            raise CommandError('The CSV has no rows')
+
+        lat_axis, lon_axis = np.array(sorted(lats)), np.array(sorted(lons))
+        data = create_archive(options['archive'], first, lat_axis, lon_axis, (last - first).astype(int) + 1)
+        with open(source, newline='', encoding='utf-8-sig') as handle:
+            for row in csv.DictReader(handle):
+                day = (np.datetime64(row['Date'].strip(), 'D') - first).astype(int)
+                cell = (np.searchsorted(lat_axis, float(row['Latitude'])) * len(lon_axis)
+                        + np.searchsorted(lon_axis, float(row['Longitude'])))
+                data[day, cell] = float(row['GHI']) * options['scale']
+        data.flush()
+        return data.shape[0]
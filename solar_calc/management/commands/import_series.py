@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from solar_calc.models import IrradianceSeries, Site
+from solar_calc.utils.ingest import parse_uploaded_series
+
+
+class Command(BaseCommand):
+    help = ('Store a daily GHI file (.csv/.xlsx with a GHI column) as an IrradianceSeries, '
+            'so batch manifests can reference it by series_id instead of re-uploading it.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--site', required=True, help='Site name (created when missing).')
+        parser.add_argument('--latitude', type=float, help='Required when the site is new.')
+        parser.add_argument('--longitude', type=float)
+        parser.add_argument('--start-date', help='First day (YYYY-MM-DD) when the file has no Date column.')
+        parser.add_argument('--ghi-unit', choices=('MJ', 'W'), default='MJ')
+        parser.add_argument('--name', default='', help='Label for the stored series.')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as handle:
+                dates, ghi = parse_uploaded_series(File(handle, name=options['path']), options['ghi_unit'])
+        except OSError as e:
+            raise CommandError(f"Cannot read {options['path']}: {e}") from None
+        except ValueError as e:
+            raise CommandError(str(e)) from None
+
+        if dates is not None:
+            if len(dates) > 1 and np.any(np.diff(dates) != np.timedelta64(1, 'D')):
+                raise CommandError('Dates must be consecutive days')
+            start_date = dates[0] if len(dates) else None
+        elif options['start_date']:
+            start_date = options['start_date']
+        else:
+            raise CommandError('The file has no Date column; pass --start-date')
+
+        with transaction.atomic():
+            site = Site.objects.filter(name=options['site']).first()
+            if site is None:
+                if options['latitude'] is None:
+                    raise CommandError(f"Site '{options['site']}' is new; pass --latitude")
+                site = Site.objects.create(name=options['site'], latitude=options['latitude'],
+                                           longitude=options['longitude'])
+            try:
+                series = IrradianceSeries.from_array(site, start_date, ghi, name=options['name'],
+                                                     source=os.path.basename(options['path']))
+            except ValueError as e:
+                raise CommandError(str(e)) from None
+            series.save()
+
+        self.stdout.write(f'Stored series {series.pk}: {series}, {series.length} days')
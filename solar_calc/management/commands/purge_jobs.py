@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from solar_calc.cache import purge_downloads
+from solar_calc.jobs import fail_stale_jobs, purge_jobs
+
+
+class Command(BaseCommand):
+    help = ('Delete finished jobs older than the retention period and expired result downloads, '
+            'and mark running jobs that stopped reporting progress as failed.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=float,
+                            help='Keep finished jobs this many days (default: SOLAR_CALC_JOB_RETENTION).')
+
+    def handle(self, *args, **options):
+        stale = fail_stale_jobs()
+        older_than = None if options['days'] is None else options['days'] * 24 * 60 * 60
+        deleted = purge_jobs(older_than)
+        downloads = purge_downloads()
+        self.stdout.write(f'Marked {stale} stale job(s) failed, deleted {deleted} finished job(s) '
+                          f'and {downloads} expired download(s).')
@@ -1,3 +1,127 @@
+import uuid
+
+import numpy as np
 from django.db import models
+from django.db.models.functions import Substr
+
+
+class Job(models.Model):
+    """A background computation submitted through the jobs API.
+
+    Inputs are stored in ``params`` at submit time so a worker can run the job
+    without the original request; the finished output lands in ``result``.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=32)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=QUEUED, db_index=True)
+    progress = models.FloatField(default=0.0)
+    params = models.JSONField()
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f'{self.kind} job {self.id} ({self.status})'
+
+
+class ResultDownload(models.Model):
+    """A computed result table kept for its /download/<token>.<fmt> links.
+
+    Stored in the database rather than a cache so any worker process can
+    serve the export; rows past ``expires_at`` are treated as gone.
+    """
+    token = models.CharField(max_length=32, primary_key=True)
+    table = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f'download {self.token}'
+
+
+class Site(models.Model):
+    """A location whose irradiance series are kept in the dataset store."""
+    name = models.CharField(max_length=100, unique=True)
+    latitude = models.FloatField()
+    longitude = models.FloatField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class IrradianceSeries(models.Model):
+    """Consecutive daily GHI (MJ/m²/day) for a site from ``start_date``.
+
+    Values are one little-endian float32 blob, so loading a date range reads
+    only that byte range (``load``) and never re-parses the original file.
+    """
+    DTYPE = np.dtype('<f4')
+
+    site = models.ForeignKey(Site, on_delete=models.CASCADE, related_name='series')
+    name = models.CharField(max_length=100, blank=True)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    length = models.PositiveIntegerField()
+    values = models.BinaryField()
+    source = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['site', 'start_date']
+        indexes = [models.Index(fields=['site', 'start_date', 'end_date'])]
+        verbose_name_plural = 'irradiance series'
+
+    def __str__(self):
+        return f'{self.site} {self.start_date}..{self.end_date}'
+
+    @classmethod
+    def from_array(cls, site, start_date, ghi, **fields):
+        """Unsaved series holding ``ghi`` for consecutive days from ``start_date``."""
+        ghi = np.asarray(ghi, dtype=float)
+        if ghi.ndim != 1 or not len(ghi):
+            raise ValueError('A series needs at least one daily value')
+        start = np.datetime64(start_date, 'D')
+        return cls(site=site, start_date=start.item(), end_date=(start + len(ghi) - 1).item(),
+                   length=len(ghi), values=ghi.astype(cls.DTYPE).tobytes(), **fields)
+
+    def _offset(self, day):
+        return int((np.datetime64(day, 'D') - np.datetime64(self.start_date, 'D')).astype(int))
+
+    def read_values(self, first=0, stop=None):
+        """float32 values for rows ``first``..``stop``; deferred blobs are sliced in SQL."""
+        stop = self.length if stop is None else stop
+        size = self.DTYPE.itemsize
+        if 'values' in self.get_deferred_fields():
+            blob = type(self).objects.filter(pk=self.pk).annotate(chunk=Substr(
+                'values', first * size + 1, (stop - first) * size, output_field=models.BinaryField(),
+            )).values_list('chunk', flat=True).get()
+        else:
+            blob = memoryview(self.values)[first * size:stop * size]
+        return np.frombuffer(bytes(blob), dtype=self.DTYPE)
 
-# Create your models here.
+    def load(self, start=None, end=None):
+        """(dates, GHI) for the stored days within [start, end] (inclusive)."""
+        first = 0 if start is None else min(max(self._offset(start), 0), self.length)
+        stop = self.length if end is None else min(max(self._offset(end) + 1, first), self.length)
+        dates = np.datetime64(self.start_date, 'D') + np.arange(first, stop)
+        ghi = self.read_values(first, stop).astype(float) if stop > first else np.empty(0)
+        return dates, ghi
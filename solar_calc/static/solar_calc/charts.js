@@ -0,0 +1,217 @@
+/* Builds the result charts in the browser from the compact payload emitted by
+   solar_calc/utils/chart_data.py (float32 series encoded as base64). */
+(function () {
+  // plotly.js has no named templates; approximate plotly_white
+  const WHITE = { plot_bgcolor: 'white', paper_bgcolor: 'white' };
+  const GRID = '#EBF0F8';
+
+  function decode(b64) {
+    const bytes = Uint8Array.from(atob(b64), c => c.charCodeAt(0));
+    return new Float32Array(bytes.buffer);
+  }
+
+  function target(containerId) {
+    const container = document.getElementById(containerId);
+    if (!container) return null;
+    const div = document.createElement('div');
+    div.className = 'plotly-graph-div';
+    container.appendChild(div);
+    return div;
+  }
+
+  function starTrace(max, name, text) {
+    return {
+      x: [max.x], y: [max.y],
+      mode: 'markers+text',
+      name: name,
+      text: [text],
+      textposition: 'top center',
+      marker: { color: 'red', size: 12, symbol: 'star' }
+    };
+  }
+
+  function titled(text, label) {
+    return label ? `${text} - ${label}` : text;
+  }
+
+  function plotSeries(data) {
+    const x = data.x;
+    const It = decode(data.It);  // LTTB-decimated server-side
+    const dayAxis = { title: { text: 'Day' }, type: 'category', gridcolor: GRID, tickangle: 45 };
+
+    const line = target('tiltedPlot');
+    if (line) {
+      Plotly.newPlot(line, [{
+        x: x, y: It,
+        mode: data.decimated ? 'lines' : 'lines+markers',
+        name: 'Tilted Radiation (It)',
+        line: { color: 'green', dash: 'dash' },
+        marker: { size: 8 },
+        hovertemplate: '%{x}: %{y:.2f}<extra></extra>'
+      }, starTrace(data.max, 'Max It', data.max.y.toFixed(2))], {
+        title: { text: titled('📈 Tilted Solar Radiation (It) over Time', data.label) },
+        xaxis: dayAxis,
+        yaxis: { gridcolor: GRID, title: { text: 'It (MJ/m²/day)' } },
+        ...WHITE,
+        height: 400
+      });
+    }
+
+    const bars = data.bars && target('barPlot');
+    if (bars) {
+      const groups = data.bars;
+      const bar = (name, values, color) => ({
+        type: 'bar', name: name, x: groups.x, y: decode(values), marker: { color: color },
+        hovertemplate: '%{x}: %{y:.2f}<extra></extra>'
+      });
+      Plotly.newPlot(bars, [
+        bar('Hd (Diffuse)', groups.Hd, 'skyblue'),
+        bar('Hb (Beam)', groups.Hb, 'orange'),
+        bar('It (Tilted)', groups.It, 'seagreen'),
+        {
+          x: [groups.max_x], y: [data.max.y],
+          mode: 'text', text: [groups.max_text],
+          textposition: 'top center', showlegend: false
+        }
+      ], {
+        barmode: 'group',
+        title: { text: titled('📊 Daily Radiation Components', data.label) },
+        xaxis: dayAxis,
+        yaxis: { gridcolor: GRID, title: { text: 'Radiation (MJ/m²/day)' } },
+        ...WHITE,
+        height: 450
+      });
+    }
+  }
+
+  function plotTiltSweep(data) {
+    const div = target('tiltPlot');
+    if (!div) return;
+    const tilt = decode(data.tilt);
+    const component = (name, values, line) => ({
+      x: tilt, y: decode(values),
+      mode: 'lines+markers', name: name, line: line, marker: { size: 7 }
+    });
+    Plotly.newPlot(div, [
+      component('Hd (Diffuse)', data.Hd, { dash: 'dot', color: 'blue' }),
+      component('Hb (Beam)', data.Hb, { dash: 'dash', color: 'orange' }),
+      component('It (Tilted)', data.It, { color: 'green', width: 2 }),
+      starTrace(data.max, 'Max It', data.max.y.toFixed(2))
+    ], {
+      title: { text: '🌞 Radiation vs Tilt Angle' },
+      xaxis: { gridcolor: GRID, title: { text: 'Tilt (°)' } },
+      yaxis: { gridcolor: GRID, title: { text: 'Radiation (MJ/m²/day)' } },
+      ...WHITE,
+      height: 420,
+      legend: { title: { text: 'Components' }, orientation: 'h', y: 1.1 }
+    });
+  }
+
+  function plotOptimal(optimal, sweep) {
+    const div = target('optimalTiltPlot');
+    if (!div) return;
+
+    if (optimal.kind === 'sweep') {
+      Plotly.newPlot(div, [{
+        x: decode(sweep.tilt), y: decode(sweep.It),
+        mode: 'lines+markers', name: 'It vs Tilt', line: { color: 'green' }
+      }, starTrace(sweep.max, 'Max It', sweep.max.y.toFixed(2))], {
+        title: { text: 'Optimal Tilt vs Radiation' },
+        xaxis: { gridcolor: GRID, title: { text: 'Tilt (°)' } },
+        yaxis: { gridcolor: GRID, title: { text: 'It (MJ/m²)' } },
+        ...WHITE,
+        height: 420
+      });
+      return;
+    }
+
+    const x = optimal.x.slice();
+    const y = Array.from(decode(optimal.tilt));
+    const traces = [];
+    if (optimal.year !== null) {
+      x.push('Year');
+      y.push(optimal.year);
+    }
+    traces.push({
+      x: x, y: y, mode: 'lines+markers', name: 'Optimal Tilt',
+      marker: { color: 'royalblue', size: 8 }, line: { width: 2 },
+      hovertemplate: '%{x}: %{y:.2f}°<extra></extra>'
+    });
+    if (optimal.year !== null) {
+      traces.push({
+        x: ['Year'], y: [optimal.year],
+        mode: 'markers+text', name: 'Max Yearly',
+        marker: { color: 'red', size: 12, symbol: 'star' },
+        text: [`Year Max: ${optimal.year.toFixed(1)}°`],
+        textposition: 'top center'
+      });
+    }
+    Plotly.newPlot(div, traces, {
+      title: { text: '📅 Optimal Tilt Angle (Monthly + Yearly)' },
+      xaxis: { gridcolor: GRID, title: { text: 'Month' } },
+      yaxis: { gridcolor: GRID, title: { text: 'Tilt Angle (°)' } },
+      ...WHITE,
+      height: 420
+    });
+  }
+
+  function plotAlbedoSweep(data) {
+    const div = target('albedoPlot');
+    if (!div) return;
+    const tilt = decode(data.tilt);
+    const traces = data.albedo.map((albedo, i) => ({
+      x: tilt, y: decode(data.It[i]), mode: 'lines', name: `Albedo ${albedo}`
+    }));
+    traces.push({
+      x: data.optimal_tilt, y: data.max_It,
+      mode: 'markers', name: 'Optimal Tilt',
+      marker: { color: 'red', size: 10, symbol: 'star' },
+      text: data.albedo.map((albedo, i) => `Albedo ${albedo}: ${data.optimal_tilt[i].toFixed(0)}°`),
+      hovertemplate: '%{text}, It %{y:.2f}<extra></extra>'
+    });
+    Plotly.newPlot(div, traces, {
+      title: { text: '❄️ Albedo Sensitivity (It vs Tilt)' },
+      xaxis: { gridcolor: GRID, title: { text: 'Tilt (°)' } },
+      yaxis: { gridcolor: GRID, title: { text: 'Mean It (MJ/m²/day)' } },
+      ...WHITE,
+      height: 450,
+      legend: { title: { text: 'Ground Albedo' } }
+    });
+  }
+
+  function plotOrientation(data) {
+    const div = target('orientationPlot');
+    if (!div) return;
+    const azimuth = decode(data.azimuth);
+    const It = decode(data.It);  // row-major: one row of azimuths per tilt
+    const z = [];
+    for (let i = 0; i < It.length; i += azimuth.length) {
+      z.push(Array.from(It.subarray(i, i + azimuth.length)));
+    }
+    Plotly.newPlot(div, [{
+      type: 'heatmap', x: Array.from(azimuth), y: Array.from(decode(data.tilt)), z: z,
+      colorscale: 'Viridis', colorbar: { title: { text: 'Mean It' } },
+      hovertemplate: 'Azimuth %{x}°, tilt %{y}°: %{z:.2f}<extra></extra>'
+    }, {
+      x: [data.optimal_azimuth], y: [data.optimal_tilt],
+      mode: 'markers+text', name: 'Optimum',
+      marker: { color: 'red', size: 12, symbol: 'star' },
+      text: [`${data.optimal_tilt.toFixed(0)}° / ${data.optimal_azimuth.toFixed(0)}°: ${data.max_It.toFixed(2)}`],
+      textposition: 'top center'
+    }], {
+      title: { text: '🧭 Mean It by Tilt and Surface Azimuth (beam integrated over sunlit hours)' },
+      xaxis: { title: { text: 'Surface Azimuth (°, 0 = south, east negative)' } },
+      yaxis: { title: { text: 'Tilt (°)' } },
+      ...WHITE,
+      height: 500
+    });
+  }
+
+  window.renderSolarCharts = function (data) {
+    plotSeries(data.series);
+    if (data.tilt) plotTiltSweep(data.tilt);
+    if (data.optimal) plotOptimal(data.optimal, data.tilt);
+    if (data.albedo) plotAlbedoSweep(data.albedo);
+    if (data.orientation) plotOrientation(data.orientation);
+  };
+})();
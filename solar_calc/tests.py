@@ -1,3 +1,767 @@
-from django.test import TestCase
+import io
+import json
+import math
+import os
+import tempfile
+import uuid
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from .cache import load_download, purge_downloads, result_cache, result_cache_key, store_download
+from . import views
+from .api import compute_results, run_compute_job
+from .jobs import JOB_HANDLERS, _recover_jobs, fail_stale_jobs, purge_jobs, run_job
+from .models import IrradianceSeries, Job, ResultDownload, Site
+from .utils.hdkr_calc import (
+    ResultTable,
+    _daily_beam_ratio,
+    calculate_hdkr,
+    calculate_io,
+    compute_daily_radiation,
+    compute_radiation_arrays,
+    decompose,
+    erbs_diffuse_fraction,
+    geometry_cache_clear,
+    lookup_io,
+    optimal_tilts,
+    orientation_grid,
+    solve_optimal_tilt,
+    tilt_grid,
+    tilt_sweep,
+    transpose,
+)
+from .utils.hdkr_hourly import HOURLY_MAX_RB, compute_hourly_arrays, compute_hourly_radiation
+from .utils.chart_data import series_payload
+from .utils.decimation import aggregate_bars, bar_group_width, lttb_indices
+from .utils.grid_archive import GridArchive, grid_radiation
+from .utils.ingest import parse_uploaded_series
+
+DAYS = np.arange(1, 366)
+GHI = np.round(np.random.default_rng(0).uniform(5, 28, 365), 2)
+
+
+# Daily rows from the original one-day-at-a-time path: scalar calculate_io,
+# erbs_diffuse_fraction and calculate_hdkr per day
+def scalar_rows(days, ghi, lat, tilt, albedo=0.2):
+    rows = []
+    for day, H in zip(days.tolist(), ghi.tolist()):
+        Io, declination, delta_rad = calculate_io(day, lat)
+        Kt = H / Io
+        Hd = float(erbs_diffuse_fraction(Kt)) * H
+        values = calculate_hdkr(H, Hd, math.radians(lat), math.radians(tilt), delta_rad, albedo)
+        rows.append({'declination': declination, 'Io': Io, 'Kt': Kt, **values})
+    return rows
+
+
+# Records of step_hours over whole days in solar time, with I a fixed share of
+# the extraterrestrial irradiation of each record (symmetric about solar noon)
+def hourly_records(lat, step_hours=1.0, days=365, clearness=0.6):
+    per_day = round(24 / step_hours)
+    day = np.repeat(np.arange(1, days + 1), per_day)
+    hour = np.tile(step_hours * np.arange(per_day), days)
+    io = compute_hourly_arrays(day, hour, np.zeros(day.shape), lat, 0.0, step_hours=step_hours)['Io']
+    return day, hour, clearness * io
+
+
+class HourlyEngineTests(SimpleTestCase):
+    def test_io_sums_to_daily_io(self):
+        for lat in (-35.0, 0.0, 40.0, 60.0):
+            day, hour, I = hourly_records(lat)
+            _, daily = compute_hourly_radiation(day, hour, I, lat, 30.0)
+            np.testing.assert_allclose(daily['Io'], calculate_io(np.arange(1, 366), lat)[0], rtol=1e-12)
+
+    def test_horizontal_surface_returns_ghi(self):
+        day, hour, I = hourly_records(40.0)
+        hourly, daily = compute_hourly_radiation(day, hour, I, 40.0, 0.0, albedo=0.5)
+        np.testing.assert_allclose(hourly['It'], I, atol=1e-12)
+        np.testing.assert_allclose(daily['It'], daily['Hd'] + daily['Hb'], atol=1e-12)
+
+    def test_east_and_west_facing_are_symmetric(self):
+        day, hour, I = hourly_records(40.0)
+        _, east = compute_hourly_radiation(day, hour, I, 40.0, 60.0, surface_azimuth_deg=-90.0)
+        _, west = compute_hourly_radiation(day, hour, I, 40.0, 60.0, surface_azimuth_deg=90.0)
+        np.testing.assert_allclose(east['It'], west['It'], rtol=1e-12)
+        self.assertTrue((east['Hb_tilted'] > 0).all())
+
+    def test_low_sun_and_twilight_records_carry_no_beam(self):
+        # Fixed 6-18 h daylight (slivers at sunrise / sunset) plus a twilight floor
+        hours = np.arange(8760)
+        I = np.clip(np.sin(np.pi * ((hours % 24) - 6) / 12), 0, None) * 2.5 + 0.02
+        for lat, tilt, azimuth in ((55.0, 35.0, -45.0), (45.0, 90.0, 90.0), (-30.0, 20.0, 180.0)):
+            hourly, daily = compute_hourly_radiation(hours // 24 + 1, hours % 24, I, lat, tilt,
+                                                     surface_azimuth_deg=azimuth)
+            self.assertLessEqual(hourly['rb'].max(), HOURLY_MAX_RB)
+            self.assertTrue((hourly['Ib'][I > hourly['Io']] == 0).all())
+            self.assertLess((daily['It'] / (daily['Hd'] + daily['Hb'])).max(), 3.0)
+            self.assertLess(daily['It'].sum(), 1.5 * I.sum())
+
+    def test_quarter_hour_records_agree_with_hourly(self):
+        hourly = compute_hourly_radiation(*hourly_records(40.0), 40.0, 30.0)[1]
+        quarter = compute_hourly_radiation(*hourly_records(40.0, step_hours=0.25), 40.0, 30.0, step_hours=0.25)[1]
+        np.testing.assert_allclose(quarter['It'].sum(), hourly['It'].sum(), rtol=0.01)
+
+
+class HourlyBatchTests(TestCase):
+    def post(self, sites):
+        return self.client.post('/api/batch/', json.dumps({'sites': sites}), content_type='application/json')
+
+    def test_hourly_site_runs_through_hourly_engine(self):
+        day, hour, I = hourly_records(40.0)
+        response = self.post([{'id': 'h', 'latitude': 40, 'tilt': 30, 'azimuth': -45,
+                               'ghi': I.tolist(), 'step_hours': 1}])
+        self.assertEqual(response.status_code, 200)
+        site = response.json()['sites'][0]
+        self.assertEqual((site['days'], site['step_hours']), (365, 1.0))
+        _, daily = compute_hourly_radiation(day, hour, I, 40.0, 30.0, surface_azimuth_deg=-45.0)
+        np.testing.assert_allclose(site['daily']['It'], np.round(daily['It'], 2))
+
+    def test_clock_time_records_use_longitude_and_utc_offset(self):
+        day, hour, I = hourly_records(40.0)
+        watts = I * 1e6 / 3600
+        solar = self.post([{'latitude': 40, 'tilt': 30, 'ghi': watts.tolist(), 'ghi_unit': 'W',
+                            'step_hours': 1}]).json()['sites'][0]
+        clock = self.post([{'latitude': 40, 'tilt': 30, 'ghi': watts.tolist(), 'ghi_unit': 'W',
+                            'step_hours': 1, 'longitude': 10, 'utc_offset': 1}]).json()['sites'][0]
+        self.assertAlmostEqual(solar['summary']['mean_H'], clock['summary']['mean_H'], places=3)
+        self.assertNotEqual(solar['daily']['It'], clock['daily']['It'])
+
+    def test_invalid_hourly_layouts_are_rejected(self):
+        site = {'id': 'h', 'latitude': 40, 'tilt': 30, 'ghi': [1.0] * 48, 'step_hours': 1}
+        for change, message in (({'step_hours': 7}, 'step_hours must divide 24'),
+                                ({'ghi': [1.0] * 25}, 'do not fill whole days'),
+                                ({'longitude': 10}, 'give both longitude and utc_offset')):
+            response = self.post([dict(site, **change)])
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(message, response.json()['error'])
+
+
+class EngineTests(SimpleTestCase):
+    def test_arrays_match_scalar_path(self):
+        for lat, tilt in ((23.5, 30.0), (-33.9, 20.0), (51.5, 90.0)):
+            columns = compute_radiation_arrays(DAYS, GHI, lat, tilt)
+            for key in ('declination', 'Io', 'Kt', 'Hd_H', 'Hd', 'Hb', 'rb', 'Hd_tilted', 'Hb_tilted', 'It'):
+                np.testing.assert_allclose(columns[key], [row[key] for row in scalar_rows(DAYS, GHI, lat, tilt)],
+                                           rtol=1e-13, atol=1e-13, err_msg=key)
+
+    def test_decompose_then_transpose_is_bit_identical(self):
+        split = transpose(decompose(DAYS, GHI, 40.0), 35.0, 0.3)
+        direct = compute_radiation_arrays(DAYS, GHI, 40.0, 35.0, 0.3)
+        for key, values in direct.items():
+            np.testing.assert_array_equal(split[key], values, err_msg=key)
+
+    def test_daily_table_rounds_engine_columns(self):
+        table = compute_daily_radiation(GHI.tolist(), 40.0, 30.0, 0.2)
+        self.assertEqual(table.keys()[0], 'day')
+        np.testing.assert_array_equal(table['It'], np.round(compute_radiation_arrays(DAYS, GHI, 40.0, 30.0)['It'], 2))
+        self.assertEqual(ResultTable.from_dict(table.to_dict()).to_dict(), table.to_dict())
+
+    def test_lookup_io_matches_calculate_io(self):
+        geometry_cache_clear()
+        for lat in (-66.0, 0.0, 12.3456, 45.0):
+            for got, expected in zip(lookup_io(np.arange(1, 367), lat), calculate_io(np.arange(1, 367), lat)):
+                np.testing.assert_array_equal(got, expected)
+        lats = np.array([[10.0], [20.0], [30.0]])
+        for got, expected in zip(lookup_io(DAYS, lats), calculate_io(DAYS, lats)):
+            np.testing.assert_array_equal(got, np.broadcast_to(expected, got.shape))
+        # Days past the table wrap around it; fractional days are computed directly
+        np.testing.assert_allclose(lookup_io(np.array([367, 730]), 40.0)[0], calculate_io(np.array([2, 365]), 40.0)[0])
+        self.assertEqual(lookup_io(100.5, 40.0)[0], calculate_io(100.5, 40.0)[0])
+
+
+class TiltAnalysisTests(SimpleTestCase):
+    def test_tilt_sweep_matches_brute_force(self):
+        tilts = tilt_grid(5.0)
+        for azimuth in (None, -60.0):
+            sweep = tilt_sweep(DAYS, GHI, 40.0, tilts=tilts, albedo=0.25, surface_azimuth_deg=azimuth)
+            for index, tilt in enumerate(tilts):
+                columns = compute_radiation_arrays(DAYS, GHI, 40.0, tilt, 0.25, azimuth)
+                self.assertAlmostEqual(sweep['It'][index], columns['It'].mean(), places=12)
+                self.assertAlmostEqual(sweep['Hb'][index], columns['Hb_tilted'].mean(), places=12)
+                self.assertAlmostEqual(sweep['Hd'][index], columns['Hd_tilted'].mean(), places=12)
+            self.assertEqual(sweep['optimal_tilt'], tilts[np.argmax(sweep['It'])])
+
+    def test_optimal_tilt_matches_fine_grid(self):
+        fine = tilt_grid(0.001)
+        for lat in (40.0, -25.0):
+            for azimuth in (None, 30.0):
+                optima = optimal_tilts(DAYS, GHI, lat, year=2023, surface_azimuth_deg=azimuth)
+                sweep = tilt_sweep(DAYS, GHI, lat, tilts=fine, surface_azimuth_deg=azimuth)
+                self.assertAlmostEqual(optima['annual']['optimal_tilt'], float(sweep['optimal_tilt']), delta=0.001)
+                self.assertGreaterEqual(optima['annual']['It'], float(sweep['max_It']) - 1e-9)
+
+    def test_solve_optimal_tilt_per_group(self):
+        groups = (DAYS - 1) // 92  # four ~quarter groups
+        tilts, max_it = solve_optimal_tilt(DAYS, GHI, 40.0, groups, 5)
+        fine = tilt_grid(0.001)
+        for group in range(4):
+            mask = groups == group
+            sweep = tilt_sweep(DAYS[mask], GHI[mask], 40.0, tilts=fine)
+            self.assertAlmostEqual(tilts[group], float(sweep['optimal_tilt']), delta=0.001)
+            self.assertAlmostEqual(max_it[group], float(sweep['max_It']), places=6)
+        self.assertTrue(np.isnan(tilts[4]))
+
+
+class OrientationTests(SimpleTestCase):
+    def test_beam_ratio_matches_numeric_integration(self):
+        lat_rad, delta_rad = math.radians(50.0), math.radians(15.0)
+        w = np.linspace(-math.pi, math.pi, 400001)
+        for beta, gamma in ((30.0, 0.0), (90.0, -90.0), (90.0, 180.0), (60.0, 135.0)):
+            b, g = math.radians(beta), math.radians(gamma)
+            cos_theta = (math.sin(delta_rad) * (math.sin(lat_rad) * math.cos(b) - math.cos(lat_rad) * math.sin(b) * math.cos(g))
+                         + math.cos(delta_rad) * (math.cos(lat_rad) * math.cos(b) + math.sin(lat_rad) * math.sin(b) * math.cos(g)) * np.cos(w)
+                         + math.cos(delta_rad) * math.sin(b) * math.sin(g) * np.sin(w))
+            cos_zenith = math.sin(delta_rad) * math.sin(lat_rad) + math.cos(delta_rad) * math.cos(lat_rad) * np.cos(w)
+            day = cos_zenith > 0
+            expected = np.maximum(cos_theta, 0)[day].sum() / cos_zenith[day].sum()
+            self.assertAlmostEqual(float(_daily_beam_ratio(lat_rad, delta_rad, b, g)), expected, places=4)
+
+    def test_walls_get_non_negative_beam(self):
+        north = compute_radiation_arrays(DAYS, GHI, 50.0, 90.0, 0.2, 180.0)
+        east = compute_radiation_arrays(DAYS, GHI, 40.0, 90.0, 0.2, -90.0)
+        west = compute_radiation_arrays(DAYS, GHI, 40.0, 90.0, 0.2, 90.0)
+        self.assertTrue((north['Hb_tilted'] >= 0).all())
+        self.assertGreater(east['Hb_tilted'].sum(), 0)
+        np.testing.assert_allclose(east['It'], west['It'])
+
+    def test_grid_matches_brute_force(self):
+        grid = orientation_grid(DAYS, GHI, 50.0, tilts=tilt_grid(15.0), azimuths=np.arange(-180.0, 181.0, 45.0))
+        decomposition = decompose(DAYS, GHI, 50.0)
+        expected = [[transpose(decomposition, tilt, 0.2, azimuth)['It'].mean() for azimuth in grid['azimuth']]
+                    for tilt in grid['tilt']]
+        np.testing.assert_allclose(grid['It'], expected, rtol=1e-12)
+        self.assertEqual(float(grid['optimal_azimuth']), 0.0)
+        self.assertAlmostEqual(float(grid['max_It']), float(np.max(expected)), places=12)
+
+    def test_sites_only_use_their_own_days(self):
+        lats = np.array([[-40.0], [35.5], [35.5], [60.0]])
+        H = np.stack([GHI, GHI[::-1], GHI * 0.5, GHI])
+        azimuths = np.arange(-180.0, 181.0, 60.0)
+        with mock.patch('solar_calc.utils.hdkr_calc.ORIENTATION_CHUNK_CELLS', 3000):  # several site blocks
+            grid = orientation_grid(DAYS, H, lats, tilts=tilt_grid(30.0), azimuths=azimuths)
+        for site in range(len(lats)):
+            decomposition = decompose(DAYS, H[site], lats[site, 0])
+            expected = [[transpose(decomposition, tilt, 0.2, azimuth)['It'].mean() for azimuth in azimuths]
+                        for tilt in grid['tilt']]
+            np.testing.assert_allclose(grid['It'][site], expected, rtol=1e-12)
+
+
+class IngestTests(SimpleTestCase):
+    def parse(self, content, name='ghi.csv', ghi_unit='MJ', **kwargs):
+        return parse_uploaded_series(SimpleUploadedFile(name, content.encode()), ghi_unit, **kwargs)
+
+    def assertParseError(self, message, content, **kwargs):
+        with self.assertRaisesMessage(ValueError, message):
+            self.parse(content, **kwargs)
+
+    def test_reads_dates_and_converts_watts(self):
+        dates, ghi = self.parse('Date,GHI\n2024-02-28,10\n2024-02-29,12\n')
+        self.assertEqual(dates.astype(str).tolist(), ['2024-02-28', '2024-02-29'])
+        self.assertEqual(ghi.tolist(), [10.0, 12.0])
+        _, mj = self.parse('GHI,Sunshine\n500,10\n', ghi_unit='W')
+        self.assertAlmostEqual(mj[0], 18.0)
+
+    def test_reads_xlsx(self):
+        from openpyxl import Workbook
+
+        workbook = Workbook()
+        workbook.active.append(['GHI'])
+        for value in (10, 11, 12):
+            workbook.active.append([value])
+        handle = io.BytesIO()
+        workbook.save(handle)
+        upload = SimpleUploadedFile('ghi.xlsx', handle.getvalue())
+        self.assertEqual(parse_uploaded_series(upload, 'MJ', expect_days=3)[1].tolist(), [10.0, 11.0, 12.0])
+
+    def test_error_paths(self):
+        self.assertParseError("Missing 'GHI' column", 'Value\n1\n')
+        self.assertParseError('The uploaded file is empty', '')
+        self.assertParseError("Row 2: invalid GHI value 'abc'", 'GHI\nabc\n')
+        self.assertParseError('Row 3: missing GHI value', 'GHI,Sunshine\n1,2\n,3\n')
+        self.assertParseError('Row 2: invalid Date value', 'Date,GHI\n2024-13-01,1\n')
+        self.assertParseError('Row 3: dates must be in ascending order', 'Date,GHI\n2024-01-02,1\n2024-01-01,1\n')
+        self.assertParseError('Row 3: missing Date value', 'Date,GHI\n2024-01-01,1\n,1\n')
+        self.assertParseError('Expected 3 GHI values', 'GHI\n1\n2\n', expect_days=3)
+        self.assertParseError('Expected 1 GHI values, found more (row 3)', 'GHI\n1\n2\n', expect_days=1)
+        self.assertParseError('Expected 2 GHI and Sunshine values', 'GHI,Sunshine\n1,2\n3,\n', ghi_unit='W')
+        self.assertParseError('Unsupported file format', 'GHI\n1\n', name='ghi.txt')
+
+
+class ComputeApiTests(TestCase):
+    def post(self, payload):
+        return self.client.post('/api/compute/', json.dumps(payload), content_type='application/json')
+
+    def yearly(self, **extra):
+        return {'latitude': 40, 'tilt': 30, 'mode': '365_days', 'year': 2023, 'ghi_unit': 'MJ',
+                'ghi': GHI.tolist(), **extra}
+
+    def test_yearly_columns_and_analyses(self):
+        response = self.post(self.yearly(tilt_analysis=True, yearly_optimal_tilt=True, tilt_step=5))
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        np.testing.assert_array_equal(payload['columns']['It'],
+                                      np.round(compute_radiation_arrays(DAYS, GHI, 40.0, 30.0)['It'], 2))
+        sweep = tilt_sweep(DAYS, GHI, 40.0, tilts=tilt_grid(5.0))
+        self.assertEqual(payload['tilt_analysis']['optimal_tilt'], float(sweep['optimal_tilt']))
+        self.assertAlmostEqual(payload['optimal_tilt']['annual']['optimal_tilt'],
+                               optimal_tilts(DAYS, GHI, 40.0, year=2023)['annual']['optimal_tilt'], places=3)
+
+    def test_orientation_grid_payload(self):
+        response = self.post(self.yearly(orientation_analysis=True, azimuth=-30, tilt_step=10, azimuth_step=30))
+        self.assertEqual(response.status_code, 200)
+        grid = response.json()['orientation_analysis']
+        self.assertEqual((len(grid['tilt']), len(grid['azimuth'])), (10, 13))
+        self.assertEqual(len(grid['It']), 10)
+        self.assertEqual(grid['optimal_azimuth'], 0.0)
+
+    def test_invalid_input_is_rejected(self):
+        self.assertEqual(self.post({'latitude': 30, 'mode': 'single_day'}).status_code, 400)
+        bad = self.client.post('/api/compute/', 'nope', content_type='application/json')
+        self.assertEqual(bad.status_code, 400)
+        for extra, field in (({'tilt_step': 0.0001}, 'tilt_step'),
+                             ({'tilt_step': 0.01, 'tilt_analysis': True}, 'tilt_step'),
+                             ({'orientation_analysis': True, 'azimuth_step': 0.5}, 'azimuth_step'),
+                             ({'azimuth': 200}, 'azimuth')):
+            response = self.post(self.yearly(**extra))
+            self.assertEqual(response.status_code, 400, extra)
+            self.assertEqual(response.json()['field'], field)
+
+    def test_albedo_sweep_is_capped(self):
+        response = self.post(self.yearly(albedo_sweep=','.join(['0.2'] * 50), tilt_step=0.5))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['field'], 'albedo_sweep')
+
+    def test_async_compute_runs_as_job(self):
+        with self.captureOnCommitCallbacks():
+            response = self.post(self.yearly(tilt_analysis=True, tilt_step=5, **{'async': True}))
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()['id']
+        run_job(job_id)
+        result = self.client.get(response.json()['result_url']).json()
+        self.assertEqual(result['columns'], self.post(self.yearly(tilt_analysis=True, tilt_step=5)).json()['columns'])
+
+
+class BatchApiTests(TestCase):
+    def post(self, body, path='/api/batch/'):
+        return self.client.post(path, json.dumps(body), content_type='application/json')
+
+    def test_sites_match_single_site_engine(self):
+        sites = [{'id': 'a', 'latitude': 23.5, 'tilt': 30, 'ghi': GHI.tolist()},
+                 {'id': 'b', 'latitude': -10, 'tilt': 10, 'albedo': 0.3, 'azimuth': 45, 'ghi': GHI.tolist()},
+                 {'id': 'c', 'latitude': 40, 'tilt': 35, 'ghi': GHI[:31].tolist(), 'start_date': '2024-02-01'}]
+        response = self.post({'sites': sites})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['sites']
+        self.assertEqual([site['id'] for site in results], ['a', 'b', 'c'])
+        expected = compute_radiation_arrays(DAYS, GHI, -10.0, 10.0, 0.3, 45.0)
+        np.testing.assert_array_equal(results[1]['daily']['It'], np.round(expected['It'], 2))
+        self.assertEqual(results[2]['daily']['date'][-1], '2024-03-02')
+
+    def test_manifest_errors(self):
+        for body, message in (({'sites': [1, 2]}, 'Site 1: each site must be an object'),
+                              ({'sites': [{'latitude': 1}]}, 'Site 1: missing tilt'),
+                              ({'sites': [{'latitude': 95, 'tilt': 1, 'ghi': [1]}]}, 'latitude must be between'),
+                              ({'sites': [{'latitude': 1, 'tilt': 1}]}, "provide 'ghi' values")):
+            for path in ('/api/batch/', '/api/jobs/'):
+                response = self.post(body, path)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(message, response.json()['error'])
+
+    def test_export_formats(self):
+        sites = [{'id': 'a', 'latitude': 23.5, 'tilt': 30, 'ghi': GHI[:10].tolist()},
+                 {'id': 'b', 'latitude': 40, 'tilt': 20, 'ghi': GHI[:5].tolist()}]
+        csv_response = self.post({'sites': sites}, '/api/batch/?format=csv')
+        self.assertEqual(csv_response['Content-Type'], 'text/csv')
+        lines = b''.join(csv_response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'site,day,declination,Io,Kt,Hd_H,Hd,Hb,rb,Hd_tilted,Hb_tilted,It')
+        self.assertEqual(len(lines), 16)
+
+        npz_response = self.post({'sites': sites}, '/api/batch/?format=npz')
+        with np.load(io.BytesIO(b''.join(npz_response.streaming_content))) as data:
+            self.assertEqual(data['site'].tolist(), ['a'] * 10 + ['b'] * 5)
+            np.testing.assert_array_equal(data['It'][:10], np.round(
+                compute_radiation_arrays(DAYS[:10], GHI[:10], 23.5, 30.0)['It'], 2))
+
+        from openpyxl import load_workbook
+
+        xlsx_response = self.post({'sites': sites}, '/api/batch/?format=xlsx')
+        sheet = load_workbook(io.BytesIO(b''.join(xlsx_response.streaming_content))).active
+        rows = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(rows[0][:2], ('site', 'day'))
+        self.assertEqual(len(rows), 16)
+
+        bad = self.post({'sites': sites}, '/api/batch/?format=pdf')
+        self.assertEqual(bad.status_code, 400)
+
+
+class JobTests(TestCase):
+    def submit(self, sites, include_daily=True):
+        with self.captureOnCommitCallbacks():
+            response = self.client.post('/api/jobs/', json.dumps({'sites': sites, 'include_daily': include_daily}),
+                                        content_type='application/json')
+        self.assertEqual(response.status_code, 202)
+        return response.json()
+
+    def test_job_lifecycle(self):
+        job = self.submit([{'id': 'a', 'latitude': 30, 'tilt': 25, 'ghi': GHI.tolist()}])
+        self.assertEqual(job['status'], Job.QUEUED)
+        self.assertEqual(self.client.get(job['result_url']).status_code, 409)
+
+        run_job(job['id'])
+        status = self.client.get(job['status_url']).json()
+        self.assertEqual((status['status'], status['progress']), (Job.DONE, 1.0))
+        result = self.client.get(job['result_url']).json()
+        np.testing.assert_array_equal(result['sites'][0]['daily']['It'],
+                                      np.round(compute_radiation_arrays(DAYS, GHI, 30.0, 25.0)['It'], 2))
+        csv_response = self.client.get(job['result_url'] + '?format=csv')
+        self.assertEqual(len(b''.join(csv_response.streaming_content).decode().splitlines()), 366)
+        self.assertEqual(self.client.get(f'/api/jobs/{uuid.uuid4()}/').status_code, 404)
+
+    def test_summary_only_job_cannot_export_rows(self):
+        job = self.submit([{'latitude': 30, 'tilt': 25, 'ghi': GHI.tolist()}], include_daily=False)
+        run_job(job['id'])
+        self.assertEqual(self.client.get(job['result_url'] + '?format=csv').status_code, 400)
+
+    def test_failed_job_reports_error(self):
+        job = Job.objects.create(kind='batch', params={'sites': None, 'include_daily': True})
+        with self.assertLogs('solar_calc.jobs', 'ERROR'):
+            run_job(job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(self.client.get(f'/api/jobs/{job.id}/result/').status_code, 500)
+
+    def test_progress_is_a_heartbeat_and_late_results_do_not_revive_failed_jobs(self):
+        def handler(params, report_progress):
+            Job.objects.filter(id=job.id).update(updated_at=timezone.now() - timedelta(hours=1))
+            report_progress(0.5)
+            self.assertEqual(fail_stale_jobs(), 0)
+            Job.objects.filter(id=job.id).update(status=Job.FAILED, error='lost')
+            return {'late': True}
+
+        job = Job.objects.create(kind='probe', params={})
+        with mock.patch.dict(JOB_HANDLERS, {'probe': handler}), self.assertLogs('solar_calc.jobs', 'WARNING'):
+            run_job(job.id)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error, job.result), (Job.FAILED, 'lost', None))
+
+    def test_compute_jobs_report_each_stage(self):
+        with self.captureOnCommitCallbacks():
+            response = self.client.post('/api/compute/', json.dumps({
+                'latitude': 40, 'tilt': 30, 'mode': '365_days', 'year': 2023, 'ghi_unit': 'MJ',
+                'ghi': GHI.tolist(), 'tilt_analysis': True, 'orientation_analysis': True, 'async': True,
+            }), content_type='application/json')
+        stages = []
+        with mock.patch.dict(JOB_HANDLERS, {'compute': lambda params, report: run_compute_job(
+                params, lambda fraction: (stages.append(fraction), report(fraction)))}):
+            run_job(response.json()['id'])
+        self.assertEqual(stages, [0.2, 0.4, 0.6, 0.8])
+        self.assertEqual(Job.objects.get(id=response.json()['id']).status, Job.DONE)
+
+    def test_recovery_and_retention(self):
+        params = {'sites': [], 'include_daily': True}
+        queued = Job.objects.create(kind='batch', params=params)
+        stale = Job.objects.create(kind='batch', params=params, status=Job.RUNNING)
+        live = Job.objects.create(kind='batch', params=params, status=Job.RUNNING)
+        old = Job.objects.create(kind='batch', params=params, status=Job.DONE)
+        Job.objects.filter(id=stale.id).update(updated_at=timezone.now() - timedelta(hours=1))
+        Job.objects.filter(id=old.id).update(updated_at=timezone.now() - timedelta(days=30))
+
+        class Recorder:
+            submitted = []
+
+            def submit(self, fn, *args):
+                self.submitted.append(args)
+
+        executor = Recorder()
+        _recover_jobs(executor)
+        self.assertEqual(executor.submitted, [(queued.id,)])
+        self.assertEqual(Job.objects.get(id=stale.id).status, Job.FAILED)
+        self.assertEqual(Job.objects.get(id=live.id).status, Job.RUNNING)
+        self.assertEqual(fail_stale_jobs(), 0)
+
+        self.assertEqual(purge_jobs(), 1)
+        self.assertFalse(Job.objects.filter(id=old.id).exists())
+        self.assertTrue(Job.objects.filter(id=stale.id).exists())
+
+
+class DownloadTests(TestCase):
+    form = {'latitude': 30, 'tilt': 25, 'mode': '365_days', 'year': '2023', 'ghi_unit': 'MJ',
+            'ghi': ','.join(map(str, GHI.tolist()))}
+
+    def test_download_by_token_matches_posted_csv(self):
+        response = self.client.post('/', self.form)
+        token = response.context['result_token']
+        self.assertTrue(ResultDownload.objects.filter(token=token).exists())
+        download = self.client.get(f'/download/{token}.csv')
+        body = b''.join(download.streaming_content)
+        posted = self.client.post('/download_csv/', {'result_json': json.dumps(response.context['result'].to_dict())})
+        self.assertEqual(body, posted.content)
+        for fmt in ('npz', 'xlsx'):
+            self.assertEqual(self.client.get(f'/download/{token}.{fmt}').status_code, 200)
+        self.assertEqual(self.client.get(f'/download/{token}.pdf').status_code, 404)
+
+    @override_settings(SOLAR_CALC_DOWNLOAD_TIMEOUT=60)
+    def test_expired_downloads_are_gone(self):
+        table = compute_daily_radiation(GHI[:3].tolist(), 40.0, 30.0, 0.2)
+        store_download('a' * 32, table)
+        self.assertEqual(load_download('a' * 32).to_dict(), table.to_dict())
+        ResultDownload.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertIsNone(load_download('a' * 32))
+        self.assertEqual(self.client.get(f'/download/{"a" * 32}.csv').status_code, 404)
+        store_download('b' * 32, table)
+        self.assertEqual(purge_downloads(), 1)
+        self.assertEqual(list(ResultDownload.objects.values_list('token', flat=True)), ['b' * 32])
+
+    def test_repeat_submissions_reuse_the_stored_table(self):
+        token = self.client.post('/', self.form).context['result_token']
+        stored = ResultDownload.objects.get(token=token)
+        self.assertEqual(self.client.post('/', self.form).context['result_token'], token)
+        self.assertEqual(ResultDownload.objects.get(token=token).expires_at, stored.expires_at)
+
+    def test_oversized_sweeps_are_rejected_on_the_form(self):
+        upload = SimpleUploadedFile('ghi.csv', ('Date,GHI\n' + ''.join(
+            f'{day},15\n' for day in np.arange('2000-01-01', '2010-01-01', dtype='datetime64[D]'))).encode())
+        form = dict(self.form, ghi='', csv_file=upload, albedo_sweep=','.join(['0.2'] * 50))
+        response = self.client.post('/', form)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('albedo_sweep', response.context['form'].errors)
+        self.assertIsNone(response.context.get('result_token'))
+
+    def test_page_renders_without_the_download_table(self):
+        with mock.patch('solar_calc.views.store_download', side_effect=DatabaseError('no such table')), \
+                self.assertLogs('solar_calc.views', 'ERROR'):
+            response = self.client.post('/', self.form)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context['result_token'])
+        self.assertTrue(len(response.context['result']))
+
+
+@override_settings(SOLAR_CALC_TIMING=True)
+class TimingTests(TestCase):
+    form = DownloadTests.form
+
+    def setUp(self):
+        result_cache().clear()
+
+    def spans(self, response):
+        entries = [entry.split(';dur=') for entry in response['Server-Timing'].split(', ')]
+        return [(name, float(ms)) for name, ms in entries]
+
+    def test_spans_do_not_overlap(self):
+        with self.assertLogs('solar_calc.views', 'INFO') as logs:
+            response = self.client.post('/', dict(self.form, tilt_analysis='on'))
+        spans = self.spans(response)
+        names = [name for name, _ in spans]
+        for stage in ('form', 'inputs', 'cache', 'decompose', 'engine', 'tilt', 'charts', 'store', 'render'):
+            self.assertIn(stage, names)
+        self.assertEqual(names[-1], 'total')
+        self.assertLessEqual(sum(ms for name, ms in spans[:-1]), spans[-1][1] + 0.5)
+        record = json.loads(logs.records[-1].getMessage().split(' ', 1)[1])
+        self.assertEqual(record['status'], 200)
+        self.assertIn('decompose', record['spans'])
+
+    def test_cache_hits_skip_the_engine(self):
+        self.client.post('/', self.form)
+        names = [name for name, _ in self.spans(self.client.post('/', self.form))]
+        self.assertIn('cache', names)
+        self.assertNotIn('engine', names)
+        self.assertNotIn('decompose', names)
+
+
+class IrradianceSeriesTests(TestCase):
+    def setUp(self):
+        self.site = Site.objects.create(name='Lisbon', latitude=38.7)
+        self.series = IrradianceSeries.from_array(self.site, '2023-12-30', GHI)
+        self.series.save()
+
+    def test_load_reads_only_the_requested_range(self):
+        stored = IrradianceSeries.objects.defer('values').get(pk=self.series.pk)
+        dates, ghi = stored.load('2024-02-28', '2024-03-01')
+        self.assertEqual(dates.astype(str).tolist(), ['2024-02-28', '2024-02-29', '2024-03-01'])
+        np.testing.assert_array_equal(ghi, GHI[60:63].astype('<f4'))
+        self.assertEqual(len(stored.load('2020-01-01', '2023-12-30')[1]), 1)
+        self.assertEqual(len(stored.load('2025-06-01')[1]), 0)
+        self.assertEqual(self.series.end_date.isoformat(), '2024-12-28')
+
+    def test_batch_reads_stored_series(self):
+        response = self.client.post('/api/batch/', json.dumps({'sites': [
+            {'id': 'stored', 'series_id': self.series.pk, 'tilt': 30,
+             'start_date': '2024-01-01', 'end_date': '2024-01-31'},
+            {'id': 'inline', 'latitude': 38.7, 'tilt': 30, 'start_date': '2024-01-01',
+             'ghi': GHI[2:33].astype('<f4').astype(float).tolist()},
+        ]}), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        stored, inline = response.json()['sites']
+        self.assertEqual(stored['daily'], inline['daily'])
+
+        missing = self.client.post('/api/batch/', json.dumps({'sites': [{'series_id': 999, 'tilt': 30}]}),
+                                   content_type='application/json')
+        self.assertEqual(missing.status_code, 400)
+        self.assertIn('no stored series 999', missing.json()['error'])
+
+    def test_import_series_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'porto.csv')
+            with open(path, 'w') as handle:
+                handle.write('Date,GHI\n2024-01-01,10\n2024-01-02,11.5\n')
+            call_command('import_series', path, site='Porto', latitude=41.1, stdout=io.StringIO())
+            series = IrradianceSeries.objects.get(site__name='Porto')
+            self.assertEqual((series.start_date.isoformat(), series.length, series.source),
+                             ('2024-01-01', 2, 'porto.csv'))
+            self.assertEqual(series.load()[1].tolist(), [10.0, 11.5])
+            with self.assertRaisesMessage(CommandError, "Site 'Braga' is new; pass --latitude"):
+                call_command('import_series', path, site='Braga', stdout=io.StringIO())
+
+
+class GridArchiveTests(TestCase):
+    # A field linear in latitude and longitude, so bilinear lookups are exact
+    lats = np.array([50.0, 45.0, 40.0, 35.0])  # north to south, as many grids store it
+    lons = np.array([-10.0, -5.0, 0.0])
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'archive')
+        self.field = (10 + 0.1 * self.lats[None, :, None] + 0.05 * self.lons[None, None, :]
+                      + np.arange(60)[:, None, None] * 0.01)
+        source = os.path.join(directory.name, 'grid.npz')
+        np.savez(source, ghi=self.field, lat=self.lats, lon=self.lons)
+        call_command('import_grid', source, self.path, start_date='2024-01-01', stdout=io.StringIO())
+
+    def expected(self, lat, lon):
+        return 10 + 0.1 * lat + 0.05 * lon + np.arange(60) * 0.01
+
+    def test_nearest_and_bilinear_lookups(self):
+        archive = GridArchive(self.path)
+        self.assertEqual(archive.lats.tolist(), [35.0, 40.0, 45.0, 50.0])
+        dates, H = archive.series([41.0, 49.0], [-6.0, -1.0])
+        np.testing.assert_allclose(H, [self.expected(40.0, -5.0), self.expected(50.0, 0.0)], rtol=1e-6)
+        self.assertEqual(str(dates[0]), '2024-01-01')
+        _, H = archive.series([41.3], [-7.2], method='bilinear', start='2024-02-01', end='2024-02-10')
+        np.testing.assert_allclose(H[0], self.expected(41.3, -7.2)[31:41], rtol=1e-6)
+        with self.assertRaisesMessage(ValueError, 'outside the grid archive'):
+            archive.series([60.0], [0.0])
+
+    def test_bilinear_skips_missing_neighbours(self):
+        data = np.load(os.path.join(self.path, 'ghi.npy'), mmap_mode='r+')
+        data[:, 1 * 3 + 0] = np.nan  # (40, -10)
+        data.flush()
+        del data
+        _, H = GridArchive(self.path).series([40.0], [-7.5], method='bilinear')
+        np.testing.assert_allclose(H[0], self.expected(40.0, -5.0), rtol=1e-6)
+
+    def test_grid_radiation_and_batch_sites(self):
+        archive = GridArchive(self.path)
+        dates, H, columns = grid_radiation(archive, [41.0, 36.0], [-6.0, -9.0], 30.0)
+        np.testing.assert_array_equal(columns['It'][1], compute_radiation_arrays(
+            np.arange(1, 61), H[1], 36.0, 30.0)['It'])
+
+        with override_settings(SOLAR_CALC_GRID_ARCHIVE=self.path):
+            response = self.client.post('/api/batch/', json.dumps({'sites': [
+                {'id': 'g', 'grid': 'bilinear', 'latitude': 41.3, 'longitude': -7.2, 'tilt': 30,
+                 'start_date': '2024-01-01', 'end_date': '2024-01-31'},
+            ]}), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        expected = compute_radiation_arrays(np.arange(1, 32), self.expected(41.3, -7.2)[:31], 41.3, 30.0)
+        np.testing.assert_allclose(response.json()['sites'][0]['daily']['It'], expected['It'], atol=0.006)
+
+        response = self.client.post('/api/batch/', json.dumps({'sites': [
+            {'grid': 'nearest', 'latitude': 41, 'longitude': -6, 'tilt': 30}]}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('SOLAR_CALC_GRID_ARCHIVE', response.json()['error'])
+
+    def test_import_long_csv(self):
+        source = os.path.join(os.path.dirname(self.path), 'grid.csv')
+        with open(source, 'w') as handle:
+            handle.write('Date,Latitude,Longitude,GHI\n')
+            for day in ('2024-01-01', '2024-01-02'):
+                for lat in (40, 41):
+                    for lon in (1, 2):
+                        handle.write(f'{day},{lat},{lon},{lat + lon / 10}\n')
+        call_command('import_grid', source, self.path + '-csv', stdout=io.StringIO())
+        dates, H = GridArchive(self.path + '-csv').series([41.0], [1.0])
+        self.assertEqual(str(dates[-1]), '2024-01-02')
+        np.testing.assert_allclose(H[0], [41.1, 41.1], rtol=1e-6)
+
+
+class DecimationTests(SimpleTestCase):
+    def test_lttb_keeps_ends_peak_and_budget(self):
+        y = np.sin(np.linspace(0, 20, 5000)) + np.random.default_rng(1).normal(0, 0.1, 5000)
+        y[1234] = 5.0
+        keep = lttb_indices(y, 200)
+        self.assertEqual(len(keep), 200)
+        self.assertTrue((np.diff(keep) > 0).all())
+        self.assertEqual((keep[0], keep[-1]), (0, 4999))
+        self.assertIn(1234, keep)
+        np.testing.assert_array_equal(lttb_indices(y[:150], 200), np.arange(150))
+
+    def test_lttb_keeps_isolated_dips(self):
+        y = np.ones(3650)
+        y[[400, 2000, 3100]] = -10.0
+        keep = lttb_indices(y, 100)
+        for dip in (400, 2000, 3100):
+            self.assertIn(dip, keep)
+
+    def test_bars_average_weekly_or_wider(self):
+        self.assertEqual(bar_group_width(100, 120), 1)
+        self.assertEqual(bar_group_width(365, 120), 7)
+        self.assertEqual(bar_group_width(3650, 120), 56)
+        labels, means, width = aggregate_bars(range(1, 11), {'It': np.arange(10.0)}, 2)
+        self.assertEqual((labels, width), (['1–7', '8–10'], 7))
+        np.testing.assert_array_equal(means['It'], [3.0, 8.0])
+
+    def test_series_payload_keeps_the_exact_maximum(self):
+        days = np.arange(1, 3651)
+        ghi = np.resize(GHI, 3650)
+        table = ResultTable.from_columns(compute_radiation_arrays((days - 1) % 365 + 1, ghi, 40.0, 30.0),
+                                         'day', days)
+        payload = series_payload(table, max_points=300, max_groups=100)
+        self.assertTrue(payload['decimated'])
+        self.assertEqual(len(payload['x']), 300)
+        self.assertEqual(payload['max']['y'], float(np.max(table['It'])))
+        self.assertIn(payload['max']['x'], payload['x'])
+        self.assertLessEqual(len(payload['bars']['x']), 100)
+
+
+class ResultCacheTests(TestCase):
+    form = DownloadTests.form
+
+    def setUp(self):
+        result_cache().clear()
+
+    def test_key_normalizes_series(self):
+        key = result_cache_key(lat=40.0, ghi=[10, 11.5], days=np.array([1, 2]))
+        self.assertEqual(key, result_cache_key(days=[1.0, 2.0], ghi=np.array([10.0, 11.5]), lat=40.0))
+        self.assertNotEqual(key, result_cache_key(lat=40.0, ghi=[10, 11.6], days=[1, 2]))
+        self.assertNotEqual(key, result_cache_key(lat=40.0, ghi=[10, 11.5], days=[1, 2], tilt=30))
+
+    def test_repeat_posts_reuse_the_result(self):
+        with mock.patch.object(views, 'compute_outputs', wraps=views.compute_outputs) as compute:
+            first = self.client.post('/', self.form)
+            second = self.client.post('/', self.form)
+        self.assertEqual(compute.call_count, 1)
+        self.assertEqual(first.context['result'].to_dict(), second.context['result'].to_dict())
+
+    def test_tilt_changes_reuse_the_decomposition(self):
+        with mock.patch.object(views, 'decompose', wraps=views.decompose) as decompose_:
+            first = self.client.post('/', self.form)
+            second = self.client.post('/', dict(self.form, tilt=45))
+        self.assertEqual(decompose_.call_count, 1)
+        np.testing.assert_array_equal(second.context['result']['It'],
+                                      np.round(compute_radiation_arrays(DAYS, GHI, 30.0, 45.0)['It'], 2))
+        self.assertNotEqual(first.context['result_token'], second.context['result_token'])
+
+    def test_api_results_are_memoized(self):
+        payload = json.dumps({'latitude': 30, 'tilt': 25, 'mode': '365_days', 'year': 2023, 'ghi_unit': 'MJ',
+                              'ghi': GHI.tolist(), 'tilt_analysis': True})
+        with mock.patch('solar_calc.api.compute_results', wraps=compute_results) as compute:
+            first = self.client.post('/api/compute/', payload, content_type='application/json')
+            second = self.client.post('/api/compute/', payload, content_type='application/json')
+        self.assertEqual(compute.call_count, 1)
+        self.assertEqual(first.json(), second.json())
@@ -0,0 +1,138 @@
+import contextvars
+import cProfile
+import json
+import os
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+# Opt-in request instrumentation.  Views wrap their stages in span(name), never
+# one span inside another, so the spans add up to (at most) the request total.
+# When RequestTimingMiddleware is active the spans are reported in a Server-Timing
+# header and one JSON log line per request, and requests can be profiled with
+# pyinstrument (if installed) or cProfile.  Without an active timer span() only
+# costs a context-variable lookup.
+
+PROFILE_HEADER = 'HTTP_X_SOLAR_PROFILE'
+
+_current_timer = contextvars.ContextVar('solar_calc_request_timer', default=None)
+
+
+class RequestTimer:
+    """Named (name, milliseconds) spans recorded during one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+
+    def add(self, name, elapsed_ms):
+        self.spans.append((name, elapsed_ms))
+
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self, total_ms):
+        entries = [f'{name};dur={ms:.1f}' for name, ms in self.spans]
+        entries.append(f'total;dur={total_ms:.1f}')
+        return ', '.join(entries)
+
+
+@contextmanager
+def span(name):
+    """Time the enclosed block as ``name`` on the current request, if any."""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, (time.perf_counter() - start) * 1000)
+
+
+def _profile_path(request, suffix):
+    directory = getattr(settings, 'SOLAR_CALC_PROFILE_DIR', None) or tempfile.gettempdir()
+    os.makedirs(directory, exist_ok=True)
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', request.path).strip('-') or 'root'
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    return os.path.join(directory, f'solar-calc-{stamp}-{request.method}-{slug}-{os.getpid()}{suffix}')
+
+
+def profile_request(get_response, request):
+    """Run the request under pyinstrument (HTML report) or cProfile (.prof).
+
+    Returns the response and the path of the written profile.
+    """
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        profiler = cProfile.Profile()
+        response = profiler.runcall(get_response, request)
+        path = _profile_path(request, '.prof')
+        profiler.dump_stats(path)
+        return response, path
+
+    profiler = Profiler()
+    profiler.start()
+    try:
+        response = get_response(request)
+    finally:
+        profiler.stop()
+    path = _profile_path(request, '.html')
+    with open(path, 'w', encoding='utf-8') as handle:
+        handle.write(profiler.output_html())
+    return response, path
+
+
+class RequestTimingMiddleware:
+    """Server-Timing header, timing log line and optional profiling per request.
+
+    Enabled by ``SOLAR_CALC_TIMING``; ``SOLAR_CALC_PROFILE`` is 'off',
+    'header' (profile requests sending ``X-Solar-Profile``) or 'always'.
+    """
+
+    def __init__(self, get_response):
+        self.timing = getattr(settings, 'SOLAR_CALC_TIMING', False)
+        self.profile = getattr(settings, 'SOLAR_CALC_PROFILE', 'off')
+        if not self.timing and self.profile == 'off':
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def _should_profile(self, request):
+        return self.profile == 'always' or (self.profile == 'header' and PROFILE_HEADER in request.META)
+
+    def __call__(self, request):
+        timer = RequestTimer()
+        token = _current_timer.set(timer)
+        profile_path = None
+        try:
+            if self._should_profile(request):
+                response, profile_path = profile_request(self.get_response, request)
+            else:
+                response = self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        total_ms = timer.total_ms()
+
+        if profile_path:
+            response['X-Solar-Profile'] = os.path.basename(profile_path)
+        if self.timing:
+            response['Server-Timing'] = timer.server_timing(total_ms)
+            spans = {}
+            for name, ms in timer.spans:
+                spans[name] = spans.get(name, 0.0) + ms
+            from .views import logger
+            logger.info('request_timing %s', json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'total_ms': round(total_ms, 2),
+                'spans': {name: round(ms, 2) for name, ms in spans.items()},
+                'profile': profile_path,
+            }))
+        return response
@@ -1,9 +1,15 @@
 from django.urls import path
-from . import views
+from . import api, views
 from .views import index, download_csv
 
 urlpatterns = [
     path('', views.index, name='index'),
-    #path('download-xlsx/', views.download_xlsx, name='download_xlsx'), 
+    path('download-xlsx/<slug:token>/', views.download_xlsx, name='download_xlsx'),
      path('download_csv/', views.download_csv, name='download_csv'),
+    path('download/<slug:token>.<slug:fmt>', views.download_result, name='download_result'),
+    path('api/compute/', api.compute, name='api_compute'),
+    path('api/batch/', api.batch, name='api_batch'),
+    path('api/jobs/', api.job_submit, name='api_job_submit'),
+    path('api/jobs/<uuid:job_id>/', api.job_status_view, name='api_job_status'),
+    path('api/jobs/<uuid:job_id>/result/', api.job_result, name='api_job_result'),
 ]
@@ -0,0 +1,124 @@
+import base64
+import re
+from functools import lru_cache
+from importlib import metadata
+
+import numpy as np
+
+from .decimation import BAR_GROUP_BUDGET, LINE_POINT_BUDGET, aggregate_bars, lttb_indices
+
+# Compact chart payloads for client-side rendering (static/solar_calc/charts.js).
+# Numeric series travel as base64-encoded little-endian float32, so a 365-day
+# result costs ~2 KB per series instead of a full Plotly figure per chart.
+
+
+# CDN URL of the plotly.js build matching the installed plotly package.  The
+# version is read from plotly's generated version file so pages that render
+# charts client-side never import plotly itself (~70 ms cold).
+@lru_cache(maxsize=None)
+def plotly_js_url():
+    try:
+        path = metadata.distribution('plotly').locate_file('plotly/offline/_plotlyjs_version.py')
+        version = re.search(r'__plotlyjs_version__\s*=\s*"([^"]+)"', path.read_text()).group(1)
+    except (metadata.PackageNotFoundError, OSError, AttributeError):
+        from plotly.offline import get_plotlyjs_version
+        version = get_plotlyjs_version()
+    return f"https://cdn.plot.ly/plotly-{version}.min.js"
+
+
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+               'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+def encode_float32(values):
+    return base64.b64encode(np.asarray(values, dtype='<f4').tobytes()).decode('ascii')
+
+
+# Index and value of the first maximum, taken from the float64 values so the
+# annotation matches the server-rendered figures exactly
+def _max_point(x_values, y_values):
+    y_values = np.asarray(y_values, dtype=float)
+    idx = int(np.argmax(y_values))
+    x = x_values[idx]
+    return {'x': x.item() if isinstance(x, np.generic) else x, 'y': float(y_values[idx])}
+
+
+# Time series charts from a ResultTable: the It line is LTTB-decimated to
+# max_points and the Hd/Hb/It bars averaged down to max_groups groups; the
+# max-It point always comes from the full series.
+def series_payload(result, label=None, bars=True,
+                   max_points=LINE_POINT_BUDGET, max_groups=BAR_GROUP_BUDGET):
+    x_values = result.index.tolist()
+    It = result['It']
+    peak = _max_point(x_values, It)
+    keep = lttb_indices(It, max_points)
+    payload = {
+        'label': label,
+        'x': [x_values[i] for i in keep],
+        'It': encode_float32(It[keep]),
+        'max': peak,
+        'decimated': len(keep) < len(x_values),
+        'bars': None,
+    }
+    if bars:
+        groups, means, width = aggregate_bars(
+            x_values, {key: result[key] for key in ('Hd', 'Hb', 'It')}, max_groups)
+        max_idx = int(np.argmax(It))
+        payload['bars'] = {
+            'x': [str(g) for g in groups],
+            'Hd': encode_float32(means['Hd']),
+            'Hb': encode_float32(means['Hb']),
+            'It': encode_float32(means['It']),
+            'max_x': str(groups[max_idx // width]),
+            'max_text': f"{peak['y']:.2f}" if width == 1 else f"max {peak['y']:.2f} ({peak['x']})",
+        }
+    return payload
+
+
+# Radiation-vs-tilt chart from a tilt_sweep() result
+def tilt_payload(sweep):
+    tilts = np.asarray(sweep['tilt'], dtype=float)
+    return {
+        'tilt': encode_float32(tilts),
+        'Hd': encode_float32(sweep['Hd']),
+        'Hb': encode_float32(sweep['Hb']),
+        'It': encode_float32(sweep['It']),
+        'max': _max_point(tilts.tolist(), sweep['It']),
+    }
+
+
+# Monthly + yearly optimal tilt chart from optimal_tilt_rows()
+def optimal_payload(rows):
+    months = [r for r in rows if isinstance(r.get('month'), int)]
+    year = next((r for r in rows if r.get('month') == 'Year'), None)
+    return {
+        'kind': 'monthly',
+        'x': [MONTH_NAMES[r['month'] - 1] for r in months],
+        'tilt': encode_float32([r['optimal_tilt'] for r in months]),
+        'year': None if year is None else float(year['optimal_tilt']),
+    }
+
+
+# Albedo sensitivity chart (mean It vs tilt, one line per albedo) from
+# albedo_tilt_sweep()
+def albedo_payload(sensitivity):
+    return {
+        'tilt': encode_float32(sensitivity['tilt']),
+        'albedo': np.asarray(sensitivity['albedo'], dtype=float).tolist(),
+        'It': [encode_float32(row) for row in sensitivity['It']],
+        'optimal_tilt': np.asarray(sensitivity['optimal_tilt'], dtype=float).tolist(),
+        'max_It': np.asarray(sensitivity['max_It'], dtype=float).tolist(),
+    }
+
+
+# Tilt × azimuth heat map from orientation_grid(); It is sent row-major
+# (one row of azimuths per tilt)
+def orientation_payload(grid):
+    return {
+        'tilt': encode_float32(grid['tilt']),
+        'azimuth': encode_float32(grid['azimuth']),
+        'It': encode_float32(np.asarray(grid['It'], dtype=float).ravel()),
+        'optimal_tilt': float(grid['optimal_tilt']),
+        'optimal_azimuth': float(grid['optimal_azimuth']),
+        'max_It': float(grid['max_It']),
+    }
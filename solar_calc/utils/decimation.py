@@ -0,0 +1,79 @@
+import numpy as np
+
+# Chart decimation: keeps what the browser draws bounded however long the series.
+# Line charts use Largest-Triangle-Three-Buckets; bar charts average consecutive
+# rows into weekly (or wider) groups.  numpy only, shared by plotting.py and the
+# client-side chart payloads.
+
+LINE_POINT_BUDGET = 1000
+BAR_GROUP_BUDGET = 120
+
+
+def lttb_indices(y, max_points, x=None):
+    """Indices of the points Largest-Triangle-Three-Buckets keeps (ascending).
+
+    The first and last points are always kept, as is the global maximum of
+    ``y`` (it replaces the point chosen in its bucket), so max annotations
+    stay exact.  ``x`` defaults to the row position (category axes).
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if max_points >= n or n <= 2:
+        return np.arange(n)
+    max_points = max(int(max_points), 3)
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+
+    # Bucket edges over the interior points 1 .. n-2
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    keep = np.empty(max_points, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    prev = 0
+    for b in range(max_points - 2):
+        lo, hi = edges[b], max(edges[b + 1], edges[b] + 1)
+        if b + 2 < len(edges):
+            nlo, nhi = edges[b + 1], max(edges[b + 2], edges[b + 1] + 1)
+            next_x, next_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        # Twice the triangle area (prev point, candidate, next bucket average)
+        area = np.abs((x[prev] - next_x) * (y[lo:hi] - y[prev])
+                      - (x[prev] - x[lo:hi]) * (next_y - y[prev]))
+        prev = lo + int(np.argmax(area))
+        keep[b + 1] = prev
+
+    peak = int(np.argmax(y))
+    if peak not in keep:
+        keep[np.searchsorted(edges, peak, side='right')] = peak
+    return np.unique(keep)
+
+
+def bar_group_width(n_rows, max_groups):
+    """Rows per bar group: 1 when the series fits, else 7 (weekly), doubled as needed."""
+    if n_rows <= max_groups:
+        return 1
+    width = 7
+    while -(-n_rows // width) > max_groups:
+        width *= 2
+    return width
+
+
+def aggregate_bars(labels, columns, max_groups):
+    """Average consecutive rows so at most ``max_groups`` bars per trace remain.
+
+    ``columns`` maps names to equal-length value sequences.  Returns the group
+    labels ("first–last" when rows were merged), the averaged columns and the
+    group width.
+    """
+    labels = list(labels)
+    width = bar_group_width(len(labels), max_groups)
+    if width == 1:
+        return labels, {k: np.asarray(v, dtype=float) for k, v in columns.items()}, 1
+
+    starts = np.arange(0, len(labels), width)
+    counts = np.minimum(starts + width, len(labels)) - starts
+    group_labels = [f"{labels[s]}–{labels[s + c - 1]}" for s, c in zip(starts, counts)]
+    grouped = {
+        name: np.add.reduceat(np.asarray(values, dtype=float), starts) / counts
+        for name, values in columns.items()
+    }
+    return group_labels, grouped, width
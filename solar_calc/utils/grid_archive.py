@@ -0,0 +1,158 @@
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from .hdkr_calc import compute_radiation_arrays, date_index
+
+# Gridded daily GHI archive: a directory holding
+#
+#   ghi.npy    float32 (days × cells), opened memory-mapped; cell = row·n_lon + col
+#   meta.json  start_date, units and the regular grid (lat0, dlat, n_lat,
+#              lon0, dlon, n_lon); cell centres are lat0 + i·dlat, lon0 + j·dlon
+#
+# A day is one contiguous row, so a date range is a contiguous block of the
+# file and only the pages of that block (and of the requested cells) are read.
+# The grid is regular, so the spatial index is arithmetic: no search structure.
+
+DATA_FILE = 'ghi.npy'
+META_FILE = 'meta.json'
+
+
+# Cell-centre coordinates along one grid axis
+def _axis(start, step, count):
+    return start + step * np.arange(count)
+
+
+# Create an empty (NaN) archive for a regular grid and return its writable
+# (days × cells) memmap; fill it, then flush().  lats / lons are the ascending,
+# evenly spaced cell-centre coordinates.
+def create_archive(path, start_date, lats, lons, days):
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    for name, axis in (('latitude', lats), ('longitude', lons)):
+        steps = np.diff(axis)
+        if len(axis) > 1 and (steps.min() <= 0 or not np.allclose(steps, steps[0], rtol=1e-6, atol=1e-9)):
+            raise ValueError(f'Grid {name}s must be ascending and evenly spaced')
+
+    os.makedirs(path, exist_ok=True)
+    meta = {
+        'start_date': str(np.datetime64(start_date, 'D')),
+        'units': 'MJ/m2/day',
+        'lat0': float(lats[0]), 'dlat': float(lats[1] - lats[0]) if len(lats) > 1 else 1.0, 'n_lat': len(lats),
+        'lon0': float(lons[0]), 'dlon': float(lons[1] - lons[0]) if len(lons) > 1 else 1.0, 'n_lon': len(lons),
+    }
+    data = np.lib.format.open_memmap(os.path.join(path, DATA_FILE), mode='w+', dtype='<f4',
+                                     shape=(int(days), len(lats) * len(lons)))
+    data[:] = np.nan
+    with open(os.path.join(path, META_FILE), 'w') as handle:
+        json.dump(meta, handle, indent=2)
+    return data
+
+
+class GridArchive:
+    """Read-only view of an archive written by ``create_archive``."""
+
+    def __init__(self, path):
+        with open(os.path.join(path, META_FILE)) as handle:
+            self.meta = json.load(handle)
+        self.path = path
+        self.data = np.load(os.path.join(path, DATA_FILE), mmap_mode='r')
+        self.start_date = np.datetime64(self.meta['start_date'], 'D')
+        self.lats = _axis(self.meta['lat0'], self.meta['dlat'], self.meta['n_lat'])
+        self.lons = _axis(self.meta['lon0'], self.meta['dlon'], self.meta['n_lon'])
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    @property
+    def dates(self):
+        return self.start_date + np.arange(len(self))
+
+    # Fractional grid position of each point; ValueError outside the grid
+    def _grid_position(self, lat, lon):
+        lat = np.atleast_1d(np.asarray(lat, dtype=float))
+        lon = np.atleast_1d(np.asarray(lon, dtype=float))
+        row = (lat - self.meta['lat0']) / self.meta['dlat']
+        col = (lon - self.meta['lon0']) / self.meta['dlon']
+        outside = (row < -0.5) | (row > self.meta['n_lat'] - 0.5) | (col < -0.5) | (col > self.meta['n_lon'] - 0.5)
+        if outside.any():
+            i = int(np.flatnonzero(outside)[0])
+            raise ValueError(f'({lat[i]}, {lon[i]}) lies outside the grid archive')
+        return row, col
+
+    def nearest_cells(self, lat, lon):
+        """Index of the grid cell whose centre is nearest each point."""
+        row, col = self._grid_position(lat, lon)
+        row = np.clip(np.rint(row), 0, self.meta['n_lat'] - 1).astype(int)
+        col = np.clip(np.rint(col), 0, self.meta['n_lon'] - 1).astype(int)
+        return row * self.meta['n_lon'] + col
+
+    def bilinear_cells(self, lat, lon):
+        """(cells, weights), both (points × 4), for bilinear interpolation.
+
+        Points beyond the outermost cell centres are clamped to the edge.
+        """
+        row, col = self._grid_position(lat, lon)
+        row = np.clip(row, 0, self.meta['n_lat'] - 1)
+        col = np.clip(col, 0, self.meta['n_lon'] - 1)
+        r0 = np.minimum(np.floor(row).astype(int), max(self.meta['n_lat'] - 2, 0))
+        c0 = np.minimum(np.floor(col).astype(int), max(self.meta['n_lon'] - 2, 0))
+        r1 = np.minimum(r0 + 1, self.meta['n_lat'] - 1)
+        c1 = np.minimum(c0 + 1, self.meta['n_lon'] - 1)
+        fr, fc = row - r0, col - c0
+        n_lon = self.meta['n_lon']
+        cells = np.stack([r0 * n_lon + c0, r0 * n_lon + c1, r1 * n_lon + c0, r1 * n_lon + c1], axis=-1)
+        weights = np.stack([(1 - fr) * (1 - fc), (1 - fr) * fc, fr * (1 - fc), fr * fc], axis=-1)
+        return cells, weights
+
+    def _rows(self, start=None, end=None):
+        first = 0 if start is None else int((np.datetime64(start, 'D') - self.start_date).astype(int))
+        stop = len(self) if end is None else int((np.datetime64(end, 'D') - self.start_date).astype(int)) + 1
+        first, stop = max(first, 0), min(stop, len(self))
+        return first, max(stop, first)
+
+    def series(self, lat, lon, method='nearest', start=None, end=None):
+        """(dates, H) for many points: H is (points × days) in MJ/m²/day.
+
+        ``method`` is 'nearest' or 'bilinear'; with bilinear, missing (NaN)
+        neighbours are left out and the remaining weights renormalized.
+        """
+        first, stop = self._rows(start, end)
+        dates = self.start_date + np.arange(first, stop)
+        block = self.data[first:stop]
+        if method == 'nearest':
+            return dates, block[:, self.nearest_cells(lat, lon)].T.astype(float)
+        if method != 'bilinear':
+            raise ValueError("Grid lookup method must be 'nearest' or 'bilinear'")
+
+        cells, weights = self.bilinear_cells(lat, lon)
+        values = block[:, cells.ravel()].reshape(stop - first, *cells.shape).astype(float)
+        present = np.isfinite(values)
+        weights = np.where(present, weights, 0.0)
+        total = weights.sum(axis=-1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            H = (np.where(present, values, 0.0) * weights).sum(axis=-1) / total
+        return dates, np.where(total > 0, H, np.nan).T
+
+
+# Shared GridArchive per path, so the memmap is opened once per process
+@lru_cache(maxsize=8)
+def open_archive(path):
+    return GridArchive(path)
+
+
+# Pull every point's series out of the archive and run the HDKR engine on the
+# (points × days) block in one broadcast.  Returns (dates, H, columns).
+def grid_radiation(archive, lat, lon, tilt_deg, albedo=0.2, method='nearest', start=None, end=None,
+                   surface_azimuth_deg=None):
+    dates, H = archive.series(lat, lon, method=method, start=start, end=end)
+    columns = compute_radiation_arrays(
+        date_index(dates)[1], H,
+        np.atleast_1d(np.asarray(lat, dtype=float))[:, None],
+        np.asarray(tilt_deg, dtype=float)[..., None],
+        np.asarray(albedo, dtype=float)[..., None],
+        None if surface_azimuth_deg is None else np.asarray(surface_azimuth_deg, dtype=float)[..., None],
+    )
+    return dates, H, columns
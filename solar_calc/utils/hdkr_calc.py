@@ -1,12 +1,14 @@
 import numpy as np
 import math
+import calendar
+import functools
 
 # Convert GHI from W/m² with sunshine hours → MJ/m²/day
 def convert_w_to_mj(ghi_w, sunshine_hours):
     return [(w * h * 3600) / 1e6 for w, h in zip(ghi_w, sunshine_hours)]
 
-# Calculate extraterrestrial radiation Io (MJ/m²/day), declination, and delta_rad
-def calculate_io(day_num, lat_deg):
+# Solar geometry for a day number and latitude: dr, declination, ws and Io (MJ/m²/day)
+def _solar_geometry(day_num, lat_deg):
     Gsc = 0.0820  # MJ/m²/min
     dr = 1 + 0.033 * np.cos(2 * np.pi * day_num / 365)
     delta = 23.45 * np.sin(2 * np.pi * (284 + day_num) / 365)
@@ -17,19 +19,137 @@ def calculate_io(day_num, lat_deg):
         ws * np.sin(phi_rad) * np.sin(delta_rad) +
         np.cos(phi_rad) * np.cos(delta_rad) * np.sin(ws)
     )
-    return io, delta, delta_rad
+    return {'dr': dr, 'declination': delta, 'delta_rad': delta_rad, 'ws': ws, 'Io': io}
+
+# Calculate extraterrestrial radiation Io (MJ/m²/day), declination, and delta_rad
+def calculate_io(day_num, lat_deg):
+    geometry = _solar_geometry(day_num, lat_deg)
+    return geometry['Io'], geometry['declination'], geometry['delta_rad']
+
+# Latitudes are quantized to this many decimals before the geometry table lookup
+GEOMETRY_LAT_DECIMALS = 4
+# Number of per-latitude geometry tables kept (least recently used are evicted)
+GEOMETRY_CACHE_SIZE = 512
+
+# Read-only table of dr/declination/delta_rad/ws/Io for days 1..366 (row = day - 1)
+@functools.lru_cache(maxsize=GEOMETRY_CACHE_SIZE)
+def _geometry_table(lat_deg):
+    table = _solar_geometry(np.arange(1, 367), lat_deg)
+    for column in table.values():
+        column.setflags(write=False)
+    return table
+
+# Cached geometry table for a latitude (quantized to GEOMETRY_LAT_DECIMALS)
+def solar_geometry_table(lat_deg):
+    return _geometry_table(round(float(lat_deg), GEOMETRY_LAT_DECIMALS))
+
+geometry_cache_info = _geometry_table.cache_info
+geometry_cache_clear = _geometry_table.cache_clear
+
+# Same result as calculate_io, served from the per-latitude geometry tables.
+# The formulas repeat every 365 days, so days outside 1..366 wrap onto the table;
+# non-integer days, or more distinct latitudes than the cache holds, are computed
+# directly.
+def lookup_io(day_num, lat_deg):
+    day_num = np.asarray(day_num)
+    lat_deg = np.round(np.asarray(lat_deg, dtype=float), GEOMETRY_LAT_DECIMALS)
+    if day_num.dtype.kind not in 'iu':
+        if not np.all(np.mod(day_num, 1) == 0):
+            return calculate_io(day_num, lat_deg)
+        day_num = day_num.astype(int)
+
+    row = day_num - 1
+    if row.size and (row.min() < 0 or row.max() > 365):
+        row = np.where((row >= 0) & (row <= 365), row, row % 365)
+
+    if lat_deg.ndim == 0:
+        table = _geometry_table(float(lat_deg))
+        return table['Io'][row], table['declination'][row], table['delta_rad'][row]
+
+    latitudes, lat_index = np.unique(lat_deg, return_inverse=True)
+    if len(latitudes) > GEOMETRY_CACHE_SIZE:
+        return calculate_io(day_num, lat_deg)
 
-# Erbs model for diffuse fraction (Hd/H)
+    tables = [_geometry_table(float(lat)) for lat in latitudes]
+    lat_index = lat_index.reshape(lat_deg.shape)
+    return tuple(
+        np.stack([table[key] for table in tables])[lat_index, row]
+        for key in ('Io', 'declination', 'delta_rad')
+    )
+
+# Erbs model for diffuse fraction (Hd/H); accepts a scalar or an array of kt
 def erbs_diffuse_fraction(kt):
-    if kt <= 0.22:
-        return 1.0
-    elif kt <= 0.8:
-        return 1.0 - 1.13 * kt + 0.53 * (kt ** 2)
-    else: 
-        return 0.18
-
-# HDKR model for tilted surface radiation
-def calculate_hdkr(H, Hd, lat_rad, beta_rad, delta_rad, albedo=0.2):
+    kt = np.asarray(kt, dtype=float)
+    hd_h = np.where(
+        kt <= 0.22, 1.0,
+        np.where(kt <= 0.8, 1.0 - 1.13 * kt + 0.53 * (kt ** 2), 0.18)
+    )
+    return hd_h[()] if hd_h.ndim == 0 else hd_h
+
+# Element-wise num / den that yields 0 where den == 0 (scalar or array)
+def _safe_divide(num, den):
+    num, den = np.broadcast_arrays(np.asarray(num, dtype=float), np.asarray(den, dtype=float))
+    out = np.zeros(num.shape)
+    np.divide(num, den, out=out, where=den != 0)
+    return out[()] if out.ndim == 0 else out
+
+# cosθ on a surface of tilt β and azimuth γ (0 = south, east negative) as
+# a + b·cosω + c·sinω in the hour angle ω (D&B eq. 1.6.2 grouped by ω)
+def _incidence_coefficients(lat_rad, delta_rad, beta_rad, gamma_rad):
+    sin_phi, cos_phi = np.sin(lat_rad), np.cos(lat_rad)
+    sin_delta, cos_delta = np.sin(delta_rad), np.cos(delta_rad)
+    sin_beta, cos_beta = np.sin(beta_rad), np.cos(beta_rad)
+    cos_gamma = np.cos(gamma_rad)
+    a = sin_delta * (sin_phi * cos_beta - cos_phi * sin_beta * cos_gamma)
+    b = cos_delta * (cos_phi * cos_beta + sin_phi * sin_beta * cos_gamma)
+    c = cos_delta * sin_beta * np.sin(gamma_rad)
+    return a, b, c
+
+# ∫ (a + b·cosω + c·sinω) dω from w1 to w2
+def _integrate_incidence(a, b, c, w1, w2):
+    return a * (w2 - w1) + b * (np.sin(w2) - np.sin(w1)) - c * (np.cos(w2) - np.cos(w1))
+
+# Integrals over [w1, w2] of cosθz and cosθ; the interval is first clipped to the
+# daylight hours [-ωs, ωs], so intervals that straddle sunrise or sunset are
+# weighted correctly (used per record by hdkr_hourly)
+def _interval_geometry(w1, w2, lat_rad, delta_rad, ws, beta_rad, gamma_rad):
+    w1 = np.clip(w1, -ws, ws)
+    w2 = np.clip(w2, -ws, ws)
+    horizontal = _integrate_incidence(*_incidence_coefficients(lat_rad, delta_rad, 0.0, 0.0), w1, w2)
+    tilted = _integrate_incidence(*_incidence_coefficients(lat_rad, delta_rad, beta_rad, gamma_rad), w1, w2)
+    return horizontal, np.maximum(tilted, 0.0)
+
+# Daily beam ratio ∫max(cosθ, 0)dω / ∫cosθz dω over the day (D&B §2.20).  With
+# u = ω - ω0, cosθ = a + R·cos u (ω0 = atan2(c, b), R = √(b² + c²)) is positive
+# on |u| < α, cosα = -a / R: between the surface's own sunrise and sunset.  That
+# arc, and the copy 2π away that the day can reach, is intersected with the
+# horizontal day [-ωs, ωs]; polar day / night clip ωs to π / 0.  The ratio is
+# even in γ, as the day is symmetric about solar noon.
+def _daily_beam_ratio(lat_rad, delta_rad, beta_rad, gamma_rad):
+    ws = np.arccos(np.clip(-np.tan(lat_rad) * np.tan(delta_rad), -1.0, 1.0))
+    a, b, c = _incidence_coefficients(lat_rad, delta_rad, beta_rad, gamma_rad)
+    amplitude = np.hypot(b, c)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # R = 0: cosθ = a all day, so the arc is everything (a > 0) or nothing
+        cos_half_width = np.nan_to_num(-a / amplitude, nan=1.0)
+    half_width = np.arccos(np.clip(cos_half_width, -1.0, 1.0))
+    center = np.arctan2(c, b)
+
+    start, stop = -ws - center, ws - center
+    tilted = 0.0
+    for shift in (0.0, np.where(center >= 0, -2 * np.pi, 2 * np.pi)):
+        u1 = np.maximum(start, shift - half_width)
+        u2 = np.maximum(np.minimum(stop, shift + half_width), u1)
+        tilted = tilted + a * (u2 - u1) + amplitude * (np.sin(u2) - np.sin(u1))
+    horizontal = _integrate_incidence(*_incidence_coefficients(lat_rad, delta_rad, 0.0, 0.0), -ws, ws)
+    return _safe_divide(tilted, horizontal)
+
+# HDKR model for tilted surface radiation.  Without gamma_rad the beam ratio is
+# the noon ratio of the original south-facing model.  A surface azimuth γ
+# (radians, 0 = south, east negative, as in hdkr_hourly) switches to the daily
+# ratio integrated between the surface's own sunrise and sunset
+# (_daily_beam_ratio); NaN entries keep the noon ratio.
+def calculate_hdkr(H, Hd, lat_rad, beta_rad, delta_rad, albedo=0.2, gamma_rad=None):
     sin_phi = np.sin(lat_rad)
     cos_phi = np.cos(lat_rad)
     sin_delta = np.sin(delta_rad)
@@ -40,9 +160,14 @@ def calculate_hdkr(H, Hd, lat_rad, beta_rad, delta_rad, albedo=0.2):
 
     costheta = sin_delta * sin_phi_beta + cos_delta * cos_phi_beta
     costhetaz = sin_delta * sin_phi + cos_delta * cos_phi
-    rb = costheta / costhetaz if costhetaz != 0 else 0
+    rb = _safe_divide(costheta, costhetaz)
+    if gamma_rad is not None:
+        gamma_rad = np.asarray(gamma_rad, dtype=float)
+        noon = np.isnan(gamma_rad)
+        if not noon.all():
+            rb = np.where(noon, rb, _daily_beam_ratio(lat_rad, delta_rad, beta_rad, np.where(noon, 0.0, gamma_rad)))
 
-    Hd_H = Hd / H if H != 0 else 0
+    Hd_H = _safe_divide(Hd, H)
     Hb = H - Hd
     cos_beta = np.cos(beta_rad)
 
@@ -63,62 +188,536 @@ def calculate_hdkr(H, Hd, lat_rad, beta_rad, delta_rad, albedo=0.2):
         'It': It
     }
 
-# Compute daily solar radiation results
-def compute_daily_radiation(ghi_list_mj, lat, tilt_deg, albedo, start_day=1):
-    results = []
-    lat_rad = math.radians(lat)
-    tilt_rad = math.radians(tilt_deg)
-
-    for i in range(len(ghi_list_mj)):
-        day_of_year = start_day + i
-        H = ghi_list_mj[i]
-        io, delta, delta_rad = calculate_io(day_of_year, lat)
-        kt = H / io if io != 0 else 0
-        hd_h = erbs_diffuse_fraction(kt)
-        Hd = hd_h * H
-        values = calculate_hdkr(H, Hd, lat_rad, tilt_rad, delta_rad, albedo)
-
-        results.append({
-            'day': day_of_year,
-            'declination': round(delta, 2),
-            'Io': round(io, 3),
-            'Kt': round(kt, 3),
-            'Hd_H': round(hd_h, 3),
-            'Hd': round(values['Hd'], 2),
-            'Hb': round(values['Hb'], 2),
-            'rb': round(values['rb'], 3),
-            'Hd_tilted': round(values['Hd_tilted'], 2),
-            'Hb_tilted': round(values['Hb_tilted'], 2),  # added here
-            'It': round(values['It'], 2)
-        })
-    return results
-
-# Compute monthly radiation (using 12 fixed mid-month days)
+# Columns returned by the batched engine and their display precision
+RESULT_PRECISION = {
+    'declination': 2,
+    'Io': 3,
+    'Kt': 3,
+    'Hd_H': 3,
+    'Hd': 2,
+    'Hb': 2,
+    'rb': 3,
+    'Hd_tilted': 2,
+    'Hb_tilted': 2,
+    'It': 2,
+}
+
+# Tilt-independent part of the model: Io, declination, Kt and the Erbs split of H
+def _decompose(day_of_year, H, lat_deg):
+    io, delta, delta_rad = lookup_io(day_of_year, lat_deg)
+    kt = _safe_divide(H, io)
+    hd_h = erbs_diffuse_fraction(kt)
+    return io, delta, delta_rad, kt, hd_h, hd_h * H
+
+# Tilt-independent stage of the engine: solar geometry and the Erbs split of H.
+# It depends only on the days, H and latitude (broadcast against each other), so
+# callers can cache it and re-run transpose() when only tilt or albedo changes.
+def decompose(day_of_year, H, lat_deg):
+    day_of_year, H, lat_deg = np.broadcast_arrays(
+        np.asarray(day_of_year),
+        np.asarray(H, dtype=float),
+        np.asarray(lat_deg, dtype=float),
+    )
+    io, delta, delta_rad, kt, hd_h, Hd = _decompose(day_of_year, H, lat_deg)
+    return {
+        'day': day_of_year,
+        'H': H,
+        'lat_deg': lat_deg,
+        'declination': delta,
+        'delta_rad': delta_rad,
+        'Io': io,
+        'Kt': kt,
+        'Hd_H': hd_h,
+        'Hd': Hd,
+    }
+
+# Tilt / albedo stage: HDKR transposition of a decompose() result onto a surface
+# tilted by tilt_deg and facing surface_azimuth_deg (None: the original
+# south-facing noon-ratio model, see calculate_hdkr).  Tilt, albedo and azimuth
+# broadcast against the decomposition; the columns are those of
+# compute_radiation_arrays.
+def transpose(decomposition, tilt_deg, albedo=0.2, surface_azimuth_deg=None):
+    tilt_deg = np.asarray(tilt_deg, dtype=float)
+    albedo = np.asarray(albedo, dtype=float)
+    gamma_rad = None if surface_azimuth_deg is None else np.radians(np.asarray(surface_azimuth_deg, dtype=float))
+    shape = np.broadcast_shapes(decomposition['H'].shape, tilt_deg.shape, albedo.shape,
+                                np.shape(gamma_rad) if gamma_rad is not None else ())
+    if shape != decomposition['H'].shape:
+        decomposition = {key: np.broadcast_to(value, shape) for key, value in decomposition.items()}
+    values = calculate_hdkr(decomposition['H'], decomposition['Hd'], np.radians(decomposition['lat_deg']),
+                            np.radians(np.broadcast_to(tilt_deg, shape)), decomposition['delta_rad'],
+                            np.broadcast_to(albedo, shape),
+                            None if gamma_rad is None else np.broadcast_to(gamma_rad, shape))
+
+    return {
+        'day': decomposition['day'],
+        'declination': decomposition['declination'],
+        'Io': decomposition['Io'],
+        'Kt': decomposition['Kt'],
+        'Hd_H': decomposition['Hd_H'],
+        'Hd': values['Hd'],
+        'Hb': values['Hb'],
+        'rb': values['rb'],
+        'Hd_tilted': values['Hd_tilted'],
+        'Hb_tilted': values['Hb_tilted'],
+        'It': values['It'],
+    }
+
+# Batched HDKR engine: day-of-year, H (MJ/m²/day), latitude, tilt, albedo and
+# surface azimuth (degrees, None for the noon-ratio model) are broadcast against
+# each other and every component is computed in one pass.  Returns a struct-of-arrays dict keyed like
+# RESULT_PRECISION plus 'day'.
+def compute_radiation_arrays(day_of_year, H, lat_deg, tilt_deg, albedo=0.2, surface_azimuth_deg=None):
+    return transpose(decompose(day_of_year, H, lat_deg), tilt_deg, albedo, surface_azimuth_deg)
+
+# ResultTable as is; legacy list-of-dicts rows are converted once
+def as_result_table(results):
+    return results if isinstance(results, ResultTable) else ResultTable.from_rows(list(results))
+
+# Convert engine columns into rounded list-of-dicts rows (see ResultTable for
+# the columnar form used by the views)
+def columns_to_rows(columns, index_key, index_values):
+    rounded = {
+        key: np.round(columns[key], digits).tolist()
+        for key, digits in RESULT_PRECISION.items()
+    }
+    return [
+        {index_key: index, **{key: rounded[key][i] for key in RESULT_PRECISION}}
+        for i, index in enumerate(index_values)
+    ]
+
+# Columnar result container: one index column (day labels, month numbers, ISO
+# dates) plus the RESULT_PRECISION columns as rounded float64 arrays.  Views,
+# plotting and exports read columns directly; row dicts are only built at the
+# edges (rows() / to_rows()).
+class ResultTable:
+    __slots__ = ('index_key', 'index', 'columns')
+
+    def __init__(self, index_key, index, columns):
+        self.index_key = index_key
+        self.index = np.asarray(index)
+        self.columns = columns
+
+    @classmethod
+    def from_columns(cls, columns, index_key, index_values):
+        rounded = {
+            key: np.round(np.asarray(columns[key], dtype=float), digits)
+            for key, digits in RESULT_PRECISION.items()
+        }
+        return cls(index_key, list(index_values), rounded)
+
+    # From legacy row dicts keyed by 'day' or 'month'
+    @classmethod
+    def from_rows(cls, rows):
+        index_key = 'day' if 'day' in rows[0] else 'month'
+        columns = {key: np.array([r[key] for r in rows], dtype=float)
+                   for key in RESULT_PRECISION if key in rows[0]}
+        return cls(index_key, [r[index_key] for r in rows], columns)
+
+    # Inverse of to_dict(); columns missing from the payload are skipped
+    @classmethod
+    def from_dict(cls, data):
+        index_key = next(key for key in data if key not in RESULT_PRECISION)
+        index = np.asarray(data[index_key])
+        columns = {key: np.asarray(data[key], dtype=float) for key in RESULT_PRECISION if key in data}
+        if index.ndim != 1 or any(column.shape != index.shape for column in columns.values()):
+            raise ValueError('Result columns must be equal-length lists')
+        return cls(index_key, index, columns)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, key):
+        return self.index if key == self.index_key else self.columns[key]
+
+    def keys(self):
+        return [self.index_key, *self.columns]
+
+    # Plain-Python row tuples in keys() order (template / CSV writer)
+    def records(self):
+        return zip(self.index.tolist(), *(column.tolist() for column in self.columns.values()))
+
+    def rows(self):
+        keys = self.keys()
+        return (dict(zip(keys, record)) for record in self.records())
+
+    def to_rows(self):
+        return list(self.rows())
+
+    # Columnar JSON-ready payload: {index_key: [...], column: [...], ...}
+    def to_dict(self):
+        return {key: self[key].tolist() for key in self.keys()}
+
+# Mid-month representative days used for 12-month averages
+MONTH_MID_DAYS = [15, 45, 74, 105, 135, 162, 198, 228, 258, 288, 318, 344]
+
+# Meteorological seasons as month numbers
+SEASONS = {
+    'DJF': (12, 1, 2),
+    'MAM': (3, 4, 5),
+    'JJA': (6, 7, 8),
+    'SON': (9, 10, 11),
+}
+
+# Month number (1-12) for each day of year; leap years shift days after Feb 28
+def month_of_day(day_of_year, year=None):
+    leap = year is not None and calendar.isleap(year)
+    lengths = [31, 29 if leap else 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+    month_ends = np.cumsum(lengths)
+    day_index = (np.asarray(day_of_year) - 1) % month_ends[-1]
+    return np.searchsorted(month_ends, day_index, side='right') + 1
+
+# Calendar year and leap-aware day of year (1..366) for an array of dates
+# (datetime64, date objects or ISO strings)
+def date_index(dates):
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    year_start = dates.astype('datetime64[Y]')
+    day_of_year = (dates - year_start.astype('datetime64[D]')).astype(int) + 1
+    return year_start.astype(int) + 1970, day_of_year
+
+# `count` consecutive dates starting at `start`
+def date_range(start, count):
+    return np.datetime64(start, 'D') + np.arange(count)
+
+# Month number (1-12) for each date
+def month_of_date(dates):
+    return np.asarray(dates, dtype='datetime64[D]').astype('datetime64[M]').astype(int) % 12 + 1
+
+# Ground albedo per day from a scalar, 12 monthly values or one value per day.
+# A single value comes back as a float; monthly values are spread over the days
+# by calendar month (from `dates` when given, else the day numbers of `year`).
+def albedo_series(albedo, day_of_year, year=None, dates=None):
+    values = np.asarray(albedo, dtype=float).ravel()
+    if not np.all((values >= 0) & (values <= 1)):
+        raise ValueError('Albedo values must be between 0 and 1')
+    day_of_year = np.asarray(day_of_year)
+    if values.size == 1:
+        return float(values[0])
+    if values.size == day_of_year.size:
+        return values.reshape(day_of_year.shape)
+    if values.size == 12:
+        months = month_of_date(dates) if dates is not None else month_of_day(day_of_year, year)
+        return values[months - 1]
+    counts = [str(count) for count in sorted({1, 12, day_of_year.size})]
+    raise ValueError(f"Expected {', '.join(counts[:-1])} or {counts[-1]} albedo values, got {values.size}")
+
+# (year, slice) for each calendar year of a date-ordered series
+def year_slices(dates):
+    years, _ = date_index(dates)
+    starts = np.flatnonzero(np.r_[True, years[1:] != years[:-1]])
+    stops = np.r_[starts[1:], len(years)]
+    for start, stop in zip(starts, stops):
+        yield int(years[start]), slice(int(start), int(stop))
+
+# Run the engine one calendar year at a time over a date-indexed series, so a
+# multi-decade record is never held as one block of result columns.  H may be
+# (..., days) with the dates on the last axis; yields (year, dates, columns).
+def iter_radiation_by_year(dates, H, lat_deg, tilt_deg, albedo=0.2, surface_azimuth_deg=None):
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    H = np.asarray(H, dtype=float)
+    albedo = np.asarray(albedo, dtype=float)
+    for year, part in year_slices(dates):
+        _, day_of_year = date_index(dates[part])
+        # Per-day albedo runs along the date axis like H
+        year_albedo = albedo[..., part] if albedo.ndim and albedo.shape[-1] == len(dates) else albedo
+        yield year, dates[part], compute_radiation_arrays(day_of_year, H[..., part], lat_deg, tilt_deg,
+                                                          year_albedo, surface_azimuth_deg)
+
+# Monthly means (per year and month) and yearly totals of H, Hd, Hb and It for a
+# date-indexed series of any length, accumulated from the yearly chunks
+def summarize_radiation(dates, H, lat_deg, tilt_deg, albedo=0.2, surface_azimuth_deg=None):
+    keys = ('Hd', 'Hb', 'It')
+    monthly = {'year': [], 'month': [], 'days': [], 'H': [], **{key: [] for key in keys}}
+    yearly = {'year': [], 'days': [], 'H': [], **{key: [] for key in keys}}
+
+    for year, year_dates, columns in iter_radiation_by_year(dates, H, lat_deg, tilt_deg, albedo,
+                                                            surface_azimuth_deg):
+        columns['H'] = columns['Hd'] + columns['Hb']
+        months = month_of_date(year_dates)
+        starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+        counts = np.diff(np.r_[starts, len(months)])
+
+        monthly['year'].append(np.full(len(starts), year))
+        monthly['month'].append(months[starts])
+        monthly['days'].append(counts)
+        yearly['year'].append(year)
+        yearly['days'].append(len(months))
+        for key in ('H',) + keys:
+            monthly[key].append(np.add.reduceat(columns[key], starts, axis=-1) / counts)
+            yearly[key].append(columns[key].sum(axis=-1))
+
+    return {
+        'monthly': {key: np.concatenate(values, axis=-1) for key, values in monthly.items()},
+        'yearly': {key: np.stack(values, axis=-1) if key in ('H',) + keys else np.asarray(values)
+                   for key, values in yearly.items()},
+    }
+
+# Tilt steps (degrees) of the optimal-tilt search for a surface azimuth: a full
+# 0..90 grid at the first step, then ±1 coarse step around the best at each finer one
+OPTIMAL_TILT_STEPS = (1.0, 0.01, 0.0001)
+
+# Per-group mean It for per-group tilts (candidates × groups, degrees); each
+# day takes the tilt of its group
+def _group_mean_it(candidates, H, Hd, lat_deg, delta_rad, albedo, groups, n_groups, counts, gamma_rad):
+    beta_rad = np.radians(candidates)[:, groups]
+    it = calculate_hdkr(H, Hd, np.radians(lat_deg), beta_rad, delta_rad, albedo, gamma_rad)['It']
+    rows = np.arange(len(candidates))[:, None] * n_groups + groups
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.bincount(rows.ravel(), weights=it.ravel(),
+                           minlength=len(candidates) * n_groups).reshape(len(candidates), n_groups) / counts
+
+# Optimal tilt (degrees, within [0, 90]) maximizing mean It for each group of days.
+# With the noon-ratio model mean It over any set of days is exactly
+# P·cosβ + Q·sinβ + C, so the coefficients are reduced per group with bincount
+# and the maximizer is the closed-form atan2(Q, P), checked against the 0° / 90°
+# bounds.  For a surface azimuth the daily beam ratio has no such form and the
+# tilt is found by a grid search refined down to OPTIMAL_TILT_STEPS[-1].
+# `groups` holds an integer group id per day (0..n_groups-1); returns
+# (optimal_tilt, max_It) arrays.  A precomputed decompose() result may stand in
+# for day_of_year / H / lat_deg.
+def solve_optimal_tilt(day_of_year, H, lat_deg, groups, n_groups, albedo=0.2, decomposition=None,
+                       surface_azimuth_deg=None):
+    if decomposition is None:
+        decomposition = decompose(day_of_year, H, lat_deg)
+    albedo, groups = np.asarray(albedo, dtype=float), np.asarray(groups)
+    shape = np.broadcast_shapes(decomposition['H'].shape, albedo.shape, groups.shape)
+    H, Hd, lat_deg, delta_rad, albedo, groups = (
+        np.broadcast_to(x, shape).ravel() for x in (decomposition['H'], decomposition['Hd'],
+                                                    decomposition['lat_deg'], decomposition['delta_rad'],
+                                                    albedo, groups))
+    counts = np.bincount(groups, minlength=n_groups).astype(float)
+
+    if surface_azimuth_deg is not None:
+        gamma_rad = np.radians(np.broadcast_to(np.asarray(surface_azimuth_deg, dtype=float), shape).ravel())
+        best = np.zeros(n_groups)
+        previous = None
+        for step in OPTIMAL_TILT_STEPS:
+            if previous is None:
+                candidates = np.broadcast_to(tilt_grid(step)[:, None], (len(tilt_grid(step)), n_groups))
+            else:
+                offsets = step * np.arange(-round(previous / step), round(previous / step) + 1)
+                candidates = np.clip(best + offsets[:, None], 0.0, 90.0)
+            objective = _group_mean_it(candidates, H, Hd, lat_deg, delta_rad, albedo, groups, n_groups,
+                                       counts, gamma_rad)
+            index = np.argmax(np.nan_to_num(objective, nan=-np.inf), axis=0)[None]
+            best = np.take_along_axis(candidates, index, axis=0)[0]
+            max_it = np.take_along_axis(objective, index, axis=0)[0]
+            previous = step
+        best[counts == 0] = np.nan
+        return best, max_it
+
+    lat_rad = np.radians(lat_deg)
+    sin_phi, cos_phi = np.sin(lat_rad), np.cos(lat_rad)
+    sin_delta, cos_delta = np.sin(delta_rad), np.cos(delta_rad)
+
+    # Beam term Hb·rb = Hb/cosθz · (sinδ·sin(φ-β) + cosδ·cos(φ-β)), expanded in β
+    hb_over_cz = _safe_divide(H - Hd, sin_delta * sin_phi + cos_delta * cos_phi)
+    a = hb_over_cz * sin_delta
+    b = hb_over_cz * cos_delta
+    reflected = H * albedo
+    p = a * sin_phi + b * cos_phi + (Hd - reflected) / 2
+    q = b * sin_phi - a * cos_phi
+    c = (Hd + reflected) / 2
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p, q, c = (np.bincount(groups, weights=x, minlength=n_groups) / counts for x in (p, q, c))
+
+    candidates = np.stack([
+        np.zeros(n_groups),
+        np.full(n_groups, np.pi / 2),
+        np.clip(np.arctan2(q, p), 0, np.pi / 2),
+    ])
+    objective = p * np.cos(candidates) + q * np.sin(candidates) + c
+    best = np.argmax(np.nan_to_num(objective, nan=-np.inf), axis=0)
+    beta = np.take_along_axis(candidates, best[None], axis=0)[0]
+    max_it = np.take_along_axis(objective, best[None], axis=0)[0]
+    beta[counts == 0] = np.nan
+    return np.degrees(beta), max_it
+
+# Monthly, seasonal and annual optimal tilts for a series of days in one call.
+# Months come from `dates` when given (multi-year series), else from the day
+# numbers of `year`.  Pass `decomposition` (decompose() of the same series) to
+# skip the tilt-independent stage.
+def optimal_tilts(day_of_year, H, lat_deg, albedo=0.2, year=None, dates=None, decomposition=None,
+                  surface_azimuth_deg=None):
+    if decomposition is None:
+        decomposition = decompose(day_of_year, H, lat_deg)
+    day_of_year = decomposition['day']
+    months = month_of_date(dates) if dates is not None else month_of_day(day_of_year, year)
+    season_of_month = np.empty(13, dtype=int)
+    for index, season_months in enumerate(SEASONS.values()):
+        season_of_month[list(season_months)] = index
+
+    # One solve: groups 0-11 are months, 12-15 seasons, 16 the whole series
+    groups = np.concatenate([months - 1, 12 + season_of_month[months], np.full(months.shape, 16)])
+    tilts, max_it = solve_optimal_tilt(
+        None, None, None, groups, 17,
+        albedo=np.tile(np.broadcast_to(albedo, day_of_year.shape), 3),
+        decomposition={key: np.tile(decomposition[key], 3) for key in ('H', 'Hd', 'lat_deg', 'delta_rad')},
+        surface_azimuth_deg=surface_azimuth_deg,
+    )
+    return {
+        'monthly': {'month': np.arange(1, 13), 'optimal_tilt': tilts[:12], 'It': max_it[:12]},
+        'seasonal': {'season': list(SEASONS), 'optimal_tilt': tilts[12:16], 'It': max_it[12:16]},
+        'annual': {'optimal_tilt': float(tilts[16]), 'It': float(max_it[16])},
+    }
+
+# Rows for plot_optimal_tilt(mode='monthly'): months with data plus the annual optimum
+def optimal_tilt_rows(optima):
+    monthly = optima['monthly']
+    rows = [
+        {'month': int(month), 'optimal_tilt': tilt, 'It': it}
+        for month, tilt, it in zip(monthly['month'], monthly['optimal_tilt'].tolist(), monthly['It'].tolist())
+        if not math.isnan(tilt)
+    ]
+    rows.append({'month': 'Year', **optima['annual']})
+    return rows
+
+# Compute daily solar radiation results as a ResultTable.  With start_date the
+# series is date-indexed (any length, leap years included) and keyed by ISO date.
+def compute_daily_radiation(ghi_list_mj, lat, tilt_deg, albedo, start_day=1, start_date=None):
+    if start_date is not None:
+        dates = date_range(start_date, len(ghi_list_mj))
+        columns = compute_radiation_arrays(date_index(dates)[1], ghi_list_mj, lat, tilt_deg, albedo)
+        return ResultTable.from_columns(columns, 'day', dates.astype(str))
+    days = np.arange(start_day, start_day + len(ghi_list_mj))
+    columns = compute_radiation_arrays(days, ghi_list_mj, lat, tilt_deg, albedo)
+    return ResultTable.from_columns(columns, 'day', days)
+
+# Evenly spaced tilt angles (degrees) for sweeps, e.g. tilt_grid(0.1) for 0.1° steps
+def tilt_grid(step=1.0, start=0.0, stop=90.0):
+    count = int(round((stop - start) / step))
+    return start + step * np.arange(count + 1)
+
+# Evenly spaced surface azimuths (degrees, -180..180) for orientation grids
+def azimuth_grid(step=5.0):
+    return tilt_grid(step, -180.0, 180.0)
+
+# Evaluate every tilt against every day as one tilt × day broadcast.  The
+# decomposition is done once (or taken from `decomposition`, a decompose()
+# result, in which case day_of_year / H / lat_deg are not used); returns per-tilt
+# means of Hd_tilted, Hb_tilted and It along the last (day) axis plus the grid
+# optimum (argmax of mean It) for a surface facing surface_azimuth_deg.
+def tilt_sweep(day_of_year, H, lat_deg, tilts=None, albedo=0.2, decomposition=None, surface_azimuth_deg=None):
+    tilts = tilt_grid() if tilts is None else np.asarray(tilts, dtype=float)
+    if decomposition is None:
+        decomposition = decompose(day_of_year, H, lat_deg)
+    albedo = np.asarray(albedo, dtype=float)
+    shape = np.broadcast_shapes(decomposition['H'].shape, albedo.shape)
+    H, Hd, lat_deg, delta_rad = (np.broadcast_to(decomposition[key], shape)
+                                 for key in ('H', 'Hd', 'lat_deg', 'delta_rad'))
+
+    beta_rad = np.radians(tilts).reshape(tilts.shape + (1,) * len(shape))
+    grid = calculate_hdkr(H, Hd, np.radians(lat_deg), beta_rad, delta_rad, np.broadcast_to(albedo, shape),
+                          None if surface_azimuth_deg is None else np.radians(surface_azimuth_deg))
+
+    it_mean = grid['It'].mean(axis=-1)
+    best = np.argmax(it_mean, axis=0)
+    return {
+        'tilt': tilts,
+        'Hd': grid['Hd_tilted'].mean(axis=-1),
+        'Hb': grid['Hb_tilted'].mean(axis=-1),
+        'It': it_mean,
+        'optimal_tilt': tilts[best],
+        'max_It': np.take_along_axis(it_mean, np.expand_dims(best, 0), axis=0)[0],
+    }
+
+# Albedo sensitivity: every albedo × tilt × day combination as one tilt_sweep()
+# broadcast over a shared decomposition.  Returns the albedo and tilt axes, mean
+# It as an (albedo × tilt) grid and the optimal tilt / max It for each albedo.
+def albedo_tilt_sweep(day_of_year, H, lat_deg, albedos, tilts=None, decomposition=None, surface_azimuth_deg=None):
+    albedos = np.atleast_1d(np.asarray(albedos, dtype=float))
+    if decomposition is None:
+        decomposition = decompose(day_of_year, H, lat_deg)
+    sweep = tilt_sweep(None, None, None, tilts=tilts, decomposition=decomposition,
+                       albedo=albedos.reshape(albedos.shape + (1,) * decomposition['H'].ndim),
+                       surface_azimuth_deg=surface_azimuth_deg)
+    return {
+        'albedo': albedos,
+        'tilt': sweep['tilt'],
+        'It': np.moveaxis(sweep['It'], 0, -1),
+        'optimal_tilt': sweep['optimal_tilt'],
+        'max_It': sweep['max_It'],
+    }
+
+# Largest tilt × azimuth × (latitude, declination) block of beam ratios that
+# orientation_grid() evaluates at once
+ORIENTATION_CHUNK_CELLS = 250_000
+
+# Mean It for every tilt × surface azimuth pair, using the daily beam ratio
+# integrated between the surface's own sunrise and sunset (_daily_beam_ratio).
+# Only the beam term varies with azimuth, and its ratio depends on the day only
+# through (latitude, declination).  Sites are taken in blocks; within a block the
+# ratio is evaluated once per distinct pair and |azimuth|, in chunks of tilts,
+# and each site sums it over its own pairs only, weighted by the beam it
+# receives on those days, so work and memory grow linearly with the sites.
+# The diffuse and reflected terms reduce to day means.  Returns the tilt and
+# azimuth axes, It shaped (..., tilts, azimuths) and the grid optimum.
+def orientation_grid(day_of_year, H, lat_deg, tilts=None, azimuths=None, albedo=0.2, decomposition=None):
+    tilts = tilt_grid() if tilts is None else np.asarray(tilts, dtype=float)
+    azimuths = azimuth_grid() if azimuths is None else np.asarray(azimuths, dtype=float)
+    if decomposition is None:
+        decomposition = decompose(day_of_year, H, lat_deg)
+    albedo = np.asarray(albedo, dtype=float)
+    shape = np.broadcast_shapes(decomposition['H'].shape, albedo.shape)
+    H, Hd, lat_deg, delta_rad, albedo = (
+        np.broadcast_to(x, shape).reshape(-1, shape[-1])
+        for x in (decomposition['H'], decomposition['Hd'], decomposition['lat_deg'],
+                  decomposition['delta_rad'], albedo))
+    n_rows, n_days = H.shape
+
+    distinct_azimuths, azimuth_index = np.unique(np.abs(azimuths), return_inverse=True)
+    gamma_rad = np.radians(distinct_azimuths)[:, None]
+    beam = np.empty((len(tilts), len(distinct_azimuths), n_rows))
+    block_rows = max(1, ORIENTATION_CHUNK_CELLS // (len(distinct_azimuths) * n_days))
+    for first in range(0, n_rows, block_rows):
+        block = slice(first, first + block_rows)
+        # (site, pair) entries of this block, sorted by site, with their beam weight
+        pairs, pair_index = np.unique(np.stack([lat_deg[block].ravel(), delta_rad[block].ravel()]),
+                                      axis=1, return_inverse=True)
+        n_block = lat_deg[block].shape[0]
+        keys = np.repeat(np.arange(n_block), n_days) * pairs.shape[1] + pair_index.ravel()
+        entries, entry_index = np.unique(keys, return_inverse=True)
+        weights = np.bincount(entry_index, weights=(H[block] - Hd[block]).ravel() / n_days)
+        entry_row, entry_pair = np.divmod(entries, pairs.shape[1])
+        row_starts = np.searchsorted(entry_row, np.arange(n_block))
+
+        lat_rad, pair_delta = np.radians(pairs[0]), pairs[1]
+        chunk = max(1, ORIENTATION_CHUNK_CELLS // (len(distinct_azimuths) * len(entries)))
+        for start in range(0, len(tilts), chunk):
+            beta_rad = np.radians(tilts[start:start + chunk])[:, None, None]
+            ratio = _daily_beam_ratio(lat_rad, pair_delta, beta_rad, gamma_rad)
+            beam[start:start + chunk, :, block] = np.add.reduceat(
+                ratio[..., entry_pair] * weights, row_starts, axis=-1)
+    beam = beam[:, azimuth_index]
+
+    cos_beta = np.cos(np.radians(tilts))[:, None, None]
+    it = beam + Hd.mean(axis=-1) * (1 + cos_beta) / 2 + (H * albedo).mean(axis=-1) * (1 - cos_beta) / 2
+    it = np.moveaxis(it, -1, 0).reshape(shape[:-1] + it.shape[:2])
+    flat = np.nan_to_num(it, nan=-np.inf).reshape(it.shape[:-2] + (-1,))
+    best = np.argmax(flat, axis=-1)
+    tilt_index, azimuth_index = np.unravel_index(best, it.shape[-2:])
+    return {
+        'tilt': tilts,
+        'azimuth': azimuths,
+        'It': it,
+        'optimal_tilt': tilts[tilt_index],
+        'optimal_azimuth': azimuths[azimuth_index],
+        'max_It': np.take_along_axis(it.reshape(flat.shape), best[..., None], axis=-1)[..., 0],
+    }
+
+# Convert a 1-D tilt sweep into the row dicts used by the tilt plots
+def tilt_sweep_rows(sweep):
+    return [
+        {'tilt': tilt, 'Hd': hd, 'Hb': hb, 'It': it}
+        for tilt, hd, hb, it in zip(
+            sweep['tilt'].tolist(), sweep['Hd'].tolist(),
+            sweep['Hb'].tolist(), sweep['It'].tolist())
+    ]
+
+
+# Compute monthly radiation (using 12 fixed mid-month days) as a ResultTable
 def compute_monthly_radiation(ghi_monthly_mj, lat, tilt_deg, albedo):
-    results = []
-    month_mid_days = [15, 45, 74, 105, 135, 162, 198, 228, 258, 288, 318, 344]
-    lat_rad = math.radians(lat)
-    tilt_rad = math.radians(tilt_deg)
-
-    for i, H in enumerate(ghi_monthly_mj):
-        day_num = month_mid_days[i]
-        io, delta, delta_rad = calculate_io(day_num, lat)
-        kt = H / io if io != 0 else 0
-        hd_h = erbs_diffuse_fraction(kt)
-        Hd = hd_h * H
-        values = calculate_hdkr(H, Hd, lat_rad, tilt_rad, delta_rad, albedo)
-
-        results.append({
-            'month': i + 1,
-            'declination': round(delta, 2),
-            'Io': round(io, 3),
-            'Kt': round(kt, 3),
-            'Hd_H': round(hd_h, 3),
-            'Hd': round(values['Hd'], 2),
-            'Hb': round(values['Hb'], 2),
-            'rb': round(values['rb'], 3),
-            'Hd_tilted': round(values['Hd_tilted'], 2),
-            'Hb_tilted': round(values['Hb_tilted'], 2),  # added here
-            'It': round(values['It'], 2)
-        })
-    return results
+    days = np.asarray(MONTH_MID_DAYS[:len(ghi_monthly_mj)])
+    columns = compute_radiation_arrays(days, ghi_monthly_mj, lat, tilt_deg, albedo)
+    return ResultTable.from_columns(columns, 'month', range(1, len(days) + 1))
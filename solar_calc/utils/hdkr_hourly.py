@@ -0,0 +1,168 @@
+import numpy as np
+
+from .hdkr_calc import _interval_geometry, _safe_divide, _solar_geometry
+
+# Hourly (or sub-hourly) HDKR engine, Duffie & Beckman §1.10, §2.16 and §2.19.
+#
+# Records run along the last axis: day_of_year / solar_hour label each interval
+# and the irradiation I is the energy received on the horizontal in that
+# interval (MJ/m²).  Latitude, tilt, surface azimuth and albedo broadcast
+# against I, so (sites, 1) parameters with a (sites, 8760) I work in one pass.
+#
+#   Ai = Ib / Io                    anisotropy index (circumsolar share)
+#   f  = sqrt(Ib / I)               horizon-brightening modulation
+#   IT = (Ib + Id·Ai)·Rb
+#        + Id·(1 - Ai)·(1 + cosβ)/2·(1 + f·sin³(β/2))
+#        + I·ρg·(1 - cosβ)/2
+
+Gsc = 0.0820  # MJ/m²/min, as in the daily model
+
+# Intervals whose mean cosθz is below this (sun under ~85°, including the
+# sunrise / sunset slivers) carry no beam: the Rb of a few minutes of grazing
+# sun is meaningless, so all of I is treated as diffuse there.  Rb is capped as
+# well, for surfaces facing the low sun just above the threshold.
+HOURLY_MIN_COS_ZENITH = 0.0872
+HOURLY_MAX_RB = 10.0
+
+
+# W/m² averaged over an interval of step_hours → MJ/m² for that interval
+def irradiance_to_mj(ghi_w, step_hours=1.0):
+    return np.asarray(ghi_w, dtype=float) * step_hours * 3600 / 1e6
+
+
+# Equation of time in minutes (Spencer, D&B eq. 1.5.3)
+def equation_of_time(day_of_year):
+    B = np.radians((np.asarray(day_of_year) - 1) * 360 / 365)
+    return 229.2 * (0.000075 + 0.001868 * np.cos(B) - 0.032077 * np.sin(B)
+                    - 0.014615 * np.cos(2 * B) - 0.04089 * np.sin(2 * B))
+
+
+# Local clock hour → apparent solar hour.  Longitude is degrees east, utc_offset
+# the standard-time zone in hours (e.g. +1 for CET); daylight saving is ignored.
+def solar_time(day_of_year, clock_hour, longitude_deg, utc_offset):
+    correction = 4 * (np.asarray(longitude_deg, dtype=float) - 15 * utc_offset) + equation_of_time(day_of_year)
+    return np.asarray(clock_hour, dtype=float) + correction / 60
+
+
+# Hour angle in degrees: 0 at solar noon, morning negative, 15° per hour
+def hour_angle(solar_hour):
+    return 15 * (np.asarray(solar_hour, dtype=float) - 12)
+
+
+# Erbs hourly diffuse fraction Id/I (D&B eq. 2.10.1)
+def erbs_hourly_diffuse_fraction(kt):
+    kt = np.asarray(kt, dtype=float)
+    return np.where(
+        kt <= 0.22, 1.0 - 0.09 * kt,
+        np.where(kt <= 0.8,
+                 0.9511 - 0.1604 * kt + 4.388 * kt ** 2 - 16.638 * kt ** 3 + 12.336 * kt ** 4,
+                 0.165)
+    )
+
+
+# Per-interval HDKR columns.  solar_hour is the apparent solar time at the start
+# of each interval (see solar_time); I is MJ/m² per interval of step_hours.
+def compute_hourly_arrays(day_of_year, solar_hour, I, lat_deg, tilt_deg,
+                          albedo=0.2, surface_azimuth_deg=0.0, step_hours=1.0):
+    day_of_year, solar_hour, I, lat_deg, tilt_deg, albedo, surface_azimuth_deg = np.broadcast_arrays(
+        np.asarray(day_of_year),
+        np.asarray(solar_hour, dtype=float),
+        np.asarray(I, dtype=float),
+        np.asarray(lat_deg, dtype=float),
+        np.asarray(tilt_deg, dtype=float),
+        np.asarray(albedo, dtype=float),
+        np.asarray(surface_azimuth_deg, dtype=float),
+    )
+    with np.errstate(invalid='ignore'):  # daily ws/Io are NaN in polar day/night
+        geometry = _solar_geometry(day_of_year, lat_deg)
+    lat_rad = np.radians(lat_deg)
+    beta_rad = np.radians(tilt_deg)
+    delta_rad = geometry['delta_rad']
+    # Polar day / night: the sun never sets (ωs = π) or never rises (ωs = 0)
+    ws = np.arccos(np.clip(-np.tan(lat_rad) * np.tan(delta_rad), -1.0, 1.0))
+
+    w1 = np.radians(hour_angle(solar_hour))
+    width = np.radians(15 * step_hours)
+    horizontal, tilted = _interval_geometry(
+        w1, w1 + width, lat_rad, delta_rad, ws, beta_rad, np.radians(surface_azimuth_deg))
+
+    # Extraterrestrial irradiation over the interval (D&B eq. 1.10.4)
+    horizontal = np.maximum(horizontal, 0.0)
+    io = (12 * 60 / np.pi) * Gsc * geometry['dr'] * horizontal
+    # Beam only with the sun well up and I within Io; otherwise all diffuse
+    has_beam = (horizontal >= HOURLY_MIN_COS_ZENITH * width) & (I <= io)
+    rb = np.where(has_beam, np.minimum(_safe_divide(tilted, horizontal), HOURLY_MAX_RB), 0.0)
+
+    kt = np.clip(_safe_divide(I, io), 0.0, 1.0)
+    id_i = np.where(has_beam, erbs_hourly_diffuse_fraction(kt), 1.0)
+    Id = I * id_i
+    Ib = I - Id
+    ai = np.clip(_safe_divide(Ib, io), 0.0, 1.0)
+    f = np.sqrt(_safe_divide(Ib, I))
+
+    cos_beta = np.cos(beta_rad)
+    Ib_tilted = (Ib + Id * ai) * rb
+    Id_tilted = Id * (1 - ai) * (1 + cos_beta) / 2 * (1 + f * np.sin(beta_rad / 2) ** 3)
+    Ir_tilted = I * albedo * (1 - cos_beta) / 2
+
+    return {
+        'day': day_of_year,
+        'solar_hour': solar_hour,
+        'declination': geometry['declination'],
+        'hour_angle': np.degrees(w1 + width / 2),
+        'Io': io,
+        'kT': kt,
+        'Id_I': id_i,
+        'I': I,
+        'Id': Id,
+        'Ib': Ib,
+        'Ai': ai,
+        'f': f,
+        'rb': rb,
+        'Id_tilted': Id_tilted,
+        'Ib_tilted': Ib_tilted,
+        'Ir_tilted': Ir_tilted,
+        'It': Ib_tilted + Id_tilted + Ir_tilted,
+    }
+
+
+# Sum consecutive records of the same day into the daily result schema of
+# compute_radiation_arrays (RESULT_PRECISION keys plus 'day'); rb is the
+# effective daily ratio Hb_tilted / Hb.  Records must be in time order along
+# the last axis, with the same day labels for every row.
+def aggregate_daily(hourly):
+    days = np.asarray(hourly['day'])
+    labels = days.reshape(-1, days.shape[-1])[0]
+    starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+
+    def daily_sum(key):
+        return np.add.reduceat(hourly[key], starts, axis=-1)
+
+    H = daily_sum('I')
+    Hd = daily_sum('Id')
+    Hb = daily_sum('Ib')
+    Hb_tilted = daily_sum('Ib_tilted')
+    Hd_tilted = daily_sum('Id_tilted')
+    io = daily_sum('Io')
+
+    return {
+        'day': days[..., starts],
+        'declination': np.asarray(hourly['declination'])[..., starts],
+        'Io': io,
+        'Kt': _safe_divide(H, io),
+        'Hd_H': _safe_divide(Hd, H),
+        'Hd': Hd,
+        'Hb': Hb,
+        'rb': _safe_divide(Hb_tilted, Hb),
+        'Hd_tilted': Hd_tilted,
+        'Hb_tilted': Hb_tilted,
+        'It': Hb_tilted + Hd_tilted + daily_sum('Ir_tilted'),
+    }
+
+
+# Hourly engine run straight through to daily rows: returns (hourly, daily)
+def compute_hourly_radiation(day_of_year, solar_hour, I, lat_deg, tilt_deg,
+                             albedo=0.2, surface_azimuth_deg=0.0, step_hours=1.0):
+    hourly = compute_hourly_arrays(day_of_year, solar_hour, I, lat_deg, tilt_deg,
+                                   albedo, surface_azimuth_deg, step_hours)
+    return hourly, aggregate_daily(hourly)
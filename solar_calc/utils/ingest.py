@@ -0,0 +1,139 @@
+import codecs
+import csv
+import datetime
+
+import numpy as np
+
+
+# Decode uploaded byte chunks incrementally and yield text lines (line endings kept)
+def _iter_text_lines(chunks, encoding='utf-8-sig'):
+    decoder = codecs.getincrementaldecoder(encoding)()
+    tail = ''
+    for chunk in chunks:
+        lines = (tail + decoder.decode(chunk)).splitlines(keepends=True)
+        tail = lines.pop() if lines and not lines[-1].endswith(('\n', '\r')) else ''
+        yield from lines
+    tail += decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+# Locate the GHI / Sunshine (/ Date) columns once from the header row
+def _column_indices(headers, with_dates=False):
+    headers = [str(h).strip() if h is not None else '' for h in headers]
+    if 'GHI' not in headers:
+        raise ValueError("Missing 'GHI' column in header")
+    sun_idx = headers.index('Sunshine') if 'Sunshine' in headers else None
+    date_idx = headers.index('Date') if with_dates and 'Date' in headers else None
+    return headers.index('GHI'), sun_idx, date_idx
+
+
+def _cell_value(value, row_num, column):
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Row {row_num}: invalid {column} value {value!r}") from None
+
+
+def _date_value(value, row_num):
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    try:
+        return np.datetime64(value.strip() if isinstance(value, str) else value, 'D')
+    except (TypeError, ValueError):
+        raise ValueError(f"Row {row_num}: invalid Date value {value!r} (expected YYYY-MM-DD)") from None
+
+
+# Fill preallocated GHI / sunshine (/ date) arrays from (row number, cells) pairs.
+# With expect_days=None the length is open-ended and the buffers grow by doubling.
+def _read_rows(rows, ghi_idx, sun_idx, date_idx, expect_days):
+    capacity = expect_days if expect_days is not None else 1024
+    ghi = np.empty(capacity)
+    sun = np.full(capacity, np.nan)
+    dates = np.empty(capacity, dtype='datetime64[D]') if date_idx is not None else None
+    count = 0
+    for row_num, row in rows:
+        if not any(cell not in (None, '') for cell in row):
+            continue
+        if count == capacity:
+            if expect_days is not None:
+                raise ValueError(f"Expected {expect_days} GHI values, found more (row {row_num})")
+            capacity *= 2
+            ghi = np.resize(ghi, capacity)
+            sun = np.concatenate([sun, np.full(capacity - len(sun), np.nan)])
+            if dates is not None:
+                dates = np.resize(dates, capacity)
+
+        value = _cell_value(row[ghi_idx] if ghi_idx < len(row) else None, row_num, 'GHI')
+        if value is None:
+            raise ValueError(f"Row {row_num}: missing GHI value")
+        ghi[count] = value
+        if sun_idx is not None and sun_idx < len(row):
+            hours = _cell_value(row[sun_idx], row_num, 'Sunshine')
+            if hours is not None:
+                sun[count] = hours
+        if dates is not None:
+            cell = row[date_idx] if date_idx < len(row) else None
+            if cell in (None, ''):
+                raise ValueError(f"Row {row_num}: missing Date value")
+            dates[count] = _date_value(cell, row_num)
+            if count and dates[count] <= dates[count - 1]:
+                raise ValueError(f"Row {row_num}: dates must be in ascending order without repeats")
+        count += 1
+    return ghi[:count], sun[:count], None if dates is None else dates[:count]
+
+
+def _read_csv(file, expect_days, with_dates):
+    reader = csv.reader(_iter_text_lines(file.chunks()))
+    headers = next(reader, None)
+    if headers is None:
+        raise ValueError("The uploaded file is empty")
+    return _read_rows(((reader.line_num, row) for row in reader), *_column_indices(headers, with_dates), expect_days)
+
+
+def _read_xlsx(file, expect_days, with_dates):
+    from openpyxl import load_workbook  # ~200 ms to import; most uploads are CSV
+
+    wb = load_workbook(filename=file, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        headers = next(rows, None)
+        if headers is None:
+            raise ValueError("The uploaded file is empty")
+        return _read_rows(enumerate(rows, start=2), *_column_indices(headers, with_dates), expect_days)
+    finally:
+        wb.close()
+
+
+# Parse an uploaded CSV or XLSX (GHI + optional Sunshine / Date columns) into
+# (dates, H): daily H in MJ/m²/day and the row dates as datetime64[D], or None
+# when the file has no Date column.  Dates must be ISO (YYYY-MM-DD) and
+# ascending; dated files may span any number of years.  CSV is streamed from file.chunks(); XLSX uses openpyxl's
+# read-only mode.  Raises ValueError on the first bad row or a wrong row count;
+# expect_days=None accepts any number of rows.
+def parse_uploaded_series(file, ghi_unit, expect_days=None, with_dates=True):
+    file_name = file.name.lower()
+
+    if file_name.endswith(".csv"):
+        ghi_vals, sun_vals, dates = _read_csv(file, expect_days, with_dates)
+    elif file_name.endswith(".xlsx"):
+        ghi_vals, sun_vals, dates = _read_xlsx(file, expect_days, with_dates)
+    else:
+        raise ValueError("Unsupported file format. Please upload .csv or .xlsx")
+
+    expected = len(ghi_vals) if expect_days is None else expect_days
+    if ghi_unit == 'W':
+        if len(ghi_vals) != expected or np.isnan(sun_vals).any():
+            raise ValueError(f"Expected {expected} GHI and Sunshine values")
+        return dates, (ghi_vals * sun_vals * 3600) / 1e6
+
+    if len(ghi_vals) != expected:
+        raise ValueError(f"Expected {expected} GHI values")
+    return dates, ghi_vals
+
+
+# Daily H only (see parse_uploaded_series); a Date column is ignored
+def parse_uploaded_file(file, ghi_unit, expect_days=None):
+    return parse_uploaded_series(file, ghi_unit, expect_days, with_dates=False)[1]
@@ -0,0 +1,229 @@
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+
+from .hdkr_calc import RESULT_PRECISION, compute_radiation_arrays, tilt_grid, tilt_sweep
+
+# Below this many sites the pool start-up and IPC cost more than they save
+PARALLEL_MIN_SITES = 256
+
+_executor = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+# Cores this process may run on (respects CPU affinity / container limits)
+def available_workers():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# Shared, lazily created process pool; re-created only when the size changes
+def _get_executor(workers):
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'))
+            _executor_workers = workers
+        return _executor
+
+
+# Stop the shared pool (also run at interpreter exit)
+@atexit.register
+def shutdown_pool():
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+        _executor, _executor_workers = None, 0
+
+
+# Copy an array into a new shared-memory block; returns (block, descriptor)
+def _share(array):
+    array = np.ascontiguousarray(array, dtype=float)
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=float, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape)
+
+
+def _attach(descriptor):
+    name, shape = descriptor
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=float, buffer=block.buf)
+
+
+# --------------------------------------------------------------------------- #
+# Kernels: take per-site input slices (leading axis = sites) plus shared args  #
+# and return per-site outputs with the same leading axis.                      #
+# --------------------------------------------------------------------------- #
+# Per-site albedo as a column, or a (sites × days) block as is
+def _per_day(albedo):
+    return albedo[:, None] if albedo.ndim == 1 else albedo
+
+
+def _radiation_kernel(inputs, shared):
+    columns = compute_radiation_arrays(
+        shared['day_of_year'], inputs['H'], inputs['lat'][:, None],
+        inputs['tilt'][:, None], _per_day(inputs['albedo']), inputs['azimuth'][:, None])
+    return {key: columns[key] for key in RESULT_PRECISION}
+
+
+def _tilt_sweep_kernel(inputs, shared):
+    sweep = tilt_sweep(shared['day_of_year'], inputs['H'], inputs['lat'][:, None],
+                       tilts=shared['tilts'], albedo=_per_day(inputs['albedo']),
+                       surface_azimuth_deg=inputs['azimuth'][:, None])
+    return {
+        'Hd': sweep['Hd'].T,
+        'Hb': sweep['Hb'].T,
+        'It': sweep['It'].T,
+        'optimal_tilt': sweep['optimal_tilt'],
+        'max_It': sweep['max_It'],
+    }
+
+
+_KERNELS = {
+    'radiation': _radiation_kernel,
+    'tilt_sweep': _tilt_sweep_kernel,
+}
+
+
+# Close a worker's view of a shared block; views still held by an in-flight
+# exception traceback keep the mapping alive until they are collected.
+def _close(block):
+    try:
+        block.close()
+    except BufferError:
+        pass
+
+
+# Worker entry point: attach to the shared inputs/outputs and fill one site shard
+def _run_shard(kernel_name, input_descriptors, output_descriptors, shared, start, stop):
+    blocks, views = [], {}
+    try:
+        for name, descriptor in input_descriptors.items():
+            block, views[name] = _attach(descriptor)
+            blocks.append(block)
+        results = _KERNELS[kernel_name](
+            {name: array[start:stop] for name, array in views.items()}, shared)
+        for name, descriptor in output_descriptors.items():
+            block, array = _attach(descriptor)
+            blocks.append(block)
+            array[start:stop] = results[name]
+            del array
+    finally:
+        views.clear()
+        for block in blocks:
+            _close(block)
+    return stop - start
+
+
+def _run_sharded(kernel_name, inputs, shared, output_shapes, workers=None, chunk_sites=None):
+    """Run a kernel over site shards in a process pool and merge outputs in order.
+
+    ``inputs`` maps names to arrays whose first axis is the site axis; they and
+    the outputs (``output_shapes`` gives each per-site shape) live in shared
+    memory, so shards are never pickled.  Small jobs run in-process.
+    """
+    n_sites = len(next(iter(inputs.values())))
+    workers = min(workers or available_workers(), n_sites)
+    if workers <= 1 or n_sites < PARALLEL_MIN_SITES:
+        return _KERNELS[kernel_name](inputs, shared)
+
+    chunk_sites = chunk_sites or -(-n_sites // (workers * 4))
+    blocks = []
+    try:
+        input_descriptors, output_descriptors = {}, {}
+        for name, array in inputs.items():
+            block, input_descriptors[name] = _share(array)
+            blocks.append(block)
+        for name, shape in output_shapes.items():
+            block, output_descriptors[name] = _share(np.empty((n_sites,) + tuple(shape)))
+            blocks.append(block)
+
+        executor = _get_executor(workers)
+        futures = [
+            executor.submit(_run_shard, kernel_name, input_descriptors, output_descriptors,
+                            shared, start, min(start + chunk_sites, n_sites))
+            for start in range(0, n_sites, chunk_sites)
+        ]
+        for future in futures:
+            future.result()
+
+        outputs = {}
+        for name, descriptor in output_descriptors.items():
+            block, array = _attach(descriptor)
+            outputs[name] = array.copy()
+            del array
+            block.close()
+        return outputs
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def _site_inputs(H, lat_deg, albedo, **extra):
+    H = np.atleast_2d(np.asarray(H, dtype=float))
+    n_sites = H.shape[0]
+    inputs = {
+        'H': H,
+        'lat': np.broadcast_to(np.asarray(lat_deg, dtype=float), (n_sites,)),
+    }
+    # Albedo is per site, or per site and day when given as a (sites × days) block
+    albedo = np.asarray(albedo, dtype=float)
+    inputs['albedo'] = np.broadcast_to(albedo, H.shape if albedo.ndim == 2 else (n_sites,))
+    for name, value in extra.items():
+        inputs[name] = np.broadcast_to(np.asarray(value, dtype=float), (n_sites,))
+    return inputs
+
+
+# Surface azimuths as floats for the shared blocks; None (and NaN per site) keeps
+# the noon-ratio model, as in calculate_hdkr
+def _azimuth_input(surface_azimuth_deg):
+    return np.nan if surface_azimuth_deg is None else surface_azimuth_deg
+
+
+# Parallel counterpart of compute_radiation_arrays for a (sites × days) GHI block:
+# lat/tilt/albedo/azimuth are scalars or per-site vectors, and albedo may also be a
+# (sites × days) block.  Returns the RESULT_PRECISION columns, each shaped
+# (sites, days), plus 'day'.
+def compute_radiation_parallel(day_of_year, H, lat_deg, tilt_deg, albedo=0.2, surface_azimuth_deg=None,
+                               workers=None, chunk_sites=None):
+    day_of_year = np.asarray(day_of_year)
+    inputs = _site_inputs(H, lat_deg, albedo, tilt=tilt_deg, azimuth=_azimuth_input(surface_azimuth_deg))
+    n_days = inputs['H'].shape[1]
+    columns = _run_sharded(
+        'radiation', inputs, {'day_of_year': day_of_year},
+        {key: (n_days,) for key in RESULT_PRECISION}, workers, chunk_sites)
+    columns['day'] = np.broadcast_to(day_of_year, inputs['H'].shape)
+    return columns
+
+
+# Parallel tilt sweep over a (sites × days) GHI block, for surfaces facing
+# surface_azimuth_deg (scalar or per site).  Per-tilt means come back shaped
+# (tilts, sites) like tilt_sweep; optimal_tilt / max_It are per site.
+def tilt_sweep_parallel(day_of_year, H, lat_deg, tilts=None, albedo=0.2, surface_azimuth_deg=None,
+                        workers=None, chunk_sites=None):
+    tilts = tilt_grid() if tilts is None else np.asarray(tilts, dtype=float)
+    inputs = _site_inputs(H, lat_deg, albedo, azimuth=_azimuth_input(surface_azimuth_deg))
+    outputs = _run_sharded(
+        'tilt_sweep', inputs, {'day_of_year': np.asarray(day_of_year), 'tilts': tilts},
+        {'Hd': tilts.shape, 'Hb': tilts.shape, 'It': tilts.shape,
+         'optimal_tilt': (), 'max_It': ()},
+        workers, chunk_sites)
+    return {
+        'tilt': tilts,
+        'Hd': outputs['Hd'].T,
+        'Hb': outputs['Hb'].T,
+        'It': outputs['It'].T,
+        'optimal_tilt': outputs['optimal_tilt'],
+        'max_It': outputs['max_It'],
+    }
@@ -2,25 +2,52 @@ import plotly.graph_objs as go
 import plotly.io as pio
 import numpy as np
 
-# ---------- helper for monthly collapsing (365-day → 12-month) ----------
-MONTH_LENGTHS = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
-
-def collapse_to_months(daily_results):
-    """Aggregate daily results into 12 monthly averages."""
-    if len(daily_results) != 365:
+# Figures are rendered without the plotly.js bundle; the page loads it once from
+# the CDN at the version matching the installed plotly package (see
+# chart_data.plotly_js_url).
+from .decimation import BAR_GROUP_BUDGET, LINE_POINT_BUDGET, aggregate_bars, lttb_indices
+from .hdkr_calc import ResultTable, as_result_table, month_of_day
+
+
+# Build and serialize a throwaway scatter + bar figure so plotly's lazily
+# generated validators are ready before the first real request (~100 ms).
+def warm_up():
+    fig = go.Figure([go.Scatter(x=[0], y=[0]), go.Bar(x=[0], y=[0])])
+    pio.to_html(fig, full_html=False, include_plotlyjs=False)
+
+# ---------- helper for monthly collapsing (daily → monthly) ----------
+def collapse_to_months(daily_results, year=None):
+    """Aggregate daily results into monthly averages.
+
+    Accepts a ResultTable or row dicts.  Rows keyed by ISO date ('YYYY-MM-DD',
+    any length) are grouped per year and month; integer day numbers are mapped
+    to months of ``year`` (leap-aware).  Results without a 'day' index are
+    returned unchanged.
+    """
+    if not len(daily_results):
+        return daily_results
+    if not isinstance(daily_results, ResultTable) and 'day' not in daily_results[0]:
         return daily_results  # Already monthly or other format
+    table = as_result_table(daily_results)
+    if table.index_key != 'day':
+        return daily_results
+
+    dated = table.index.dtype.kind == 'U'
+    if dated:
+        keys = table.index.astype('datetime64[D]').astype('datetime64[M]').astype(int)
+    else:
+        keys = month_of_day(table.index, year) - 1
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    counts = np.diff(np.r_[starts, len(keys)])
+    means = {key: np.add.reduceat(table[key], starts) / counts for key in ('Hd', 'Hb', 'It')}
 
     month_results = []
-    idx = 0
-    for month_len in MONTH_LENGTHS:
-        slice_ = daily_results[idx: idx + month_len]
-        idx += month_len
-        month_results.append({
-            'month': len(month_results) + 1,
-            'Hd': np.mean([d['Hd'] for d in slice_]),
-            'Hb': np.mean([d['Hb'] for d in slice_]),
-            'It': np.mean([d['It'] for d in slice_]),
-        })
+    for i, start in enumerate(starts):
+        entry = {'month': int(keys[start] % 12) + 1}
+        if dated:
+            entry['year'] = int(keys[start] // 12) + 1970
+        entry.update({key: float(means[key][i]) for key in means})
+        month_results.append(entry)
     return month_results
 
 def moving_average(values, window_size=15):
@@ -28,27 +55,36 @@ def moving_average(values, window_size=15):
 
 # ------------------------------------------------------------------------
 
-def plot_tilted_radiation(results, label=None):
-    days = [r['day'] for r in results]
-    it_values = [r['It'] for r in results]
+# Row order for the x axis: labels like DD-MM are sorted by their leading number
+def _chart_order(labels):
+    if "-" in str(labels[0]):
+        return np.argsort([int(str(label).split("-")[0]) for label in labels], kind='stable')
+    return np.arange(len(labels))
+
+def plot_tilted_radiation(results, label=None, max_points=LINE_POINT_BUDGET):
+    table = as_result_table(results)
+    order = _chart_order(table.index)
+    days = table.index[order].tolist()
+    it_values = table['It'][order]
+
+    # Max It is taken from the full series; decimation always keeps that point
+    max_idx = int(np.argmax(it_values))
+    max_it = float(it_values[max_idx])
 
-    # Sort if format is DD-MM
-    if "-" in str(days[0]):
-        days, it_values = zip(*sorted(zip(days, it_values), key=lambda x: int(x[0].split("-")[0])))
+    keep = lttb_indices(it_values, max_points)
+    decimated = len(keep) < len(days)
 
     fig = go.Figure()
     fig.add_trace(go.Scatter(
-        x=list(days),
-        y=it_values,
-        mode='lines+markers',
+        x=[days[i] for i in keep],
+        y=it_values[keep],
+        mode='lines' if decimated else 'lines+markers',
         name='Tilted Radiation (It)',
         line=dict(color='green', dash='dash'),
         marker=dict(size=8)
     ))
 
     # Max It annotation
-    max_it = max(it_values)
-    max_idx = it_values.index(max_it)
     fig.add_trace(go.Scatter(
         x=[days[max_idx]],
         y=[max_it],
@@ -67,32 +103,33 @@ def plot_tilted_radiation(results, label=None):
         height=400
     )
 
-    return pio.to_html(fig, full_html=False)
+    return pio.to_html(fig, full_html=False, include_plotlyjs=False)
+
+def plot_hd_hb_it_bars(results, label=None, max_groups=BAR_GROUP_BUDGET):
+    table = as_result_table(results)
+    order = _chart_order(table.index)
+    days = [str(day) for day in table.index[order].tolist()]
+    It = table['It'][order]
 
-def plot_hd_hb_it_bars(results, label=None):
-    days = [str(r['day']) for r in results]
-    Hd = [r['Hd'] for r in results]
-    Hb = [r['Hb'] for r in results]
-    It = [r['It'] for r in results]
+    max_idx = int(np.argmax(It))
+    max_it = float(It[max_idx])
 
-    if "-" in str(days[0]):
-        sorted_data = sorted(zip(days, Hd, Hb, It), key=lambda x: int(x[0].split("-")[0]))
-        days, Hd, Hb, It = zip(*sorted_data)
+    # Long series are averaged into weekly (or wider) groups
+    groups, means, width = aggregate_bars(
+        days, {key: table[key][order] for key in ('Hd', 'Hb', 'It')}, max_groups)
 
     fig = go.Figure(data=[
-        go.Bar(name='Hd (Diffuse)', x=days, y=Hd, marker_color='skyblue'),
-        go.Bar(name='Hb (Beam)', x=days, y=Hb, marker_color='orange'),
-        go.Bar(name='It (Tilted)', x=days, y=It, marker_color='seagreen')
+        go.Bar(name='Hd (Diffuse)', x=groups, y=means['Hd'], marker_color='skyblue'),
+        go.Bar(name='Hb (Beam)', x=groups, y=means['Hb'], marker_color='orange'),
+        go.Bar(name='It (Tilted)', x=groups, y=means['It'], marker_color='seagreen')
     ])
 
-    # Annotate max It
-    max_it = max(It)
-    max_idx = It.index(max_it)
+    # Annotate max It (the daily peak, placed on the group that contains it)
     fig.add_trace(go.Scatter(
-        x=[days[max_idx]],
+        x=[groups[max_idx // width]],
         y=[max_it],
         mode='text',
-        text=[f"{max_it:.2f}"],
+        text=[f"{max_it:.2f}" if width == 1 else f"max {max_it:.2f} ({days[max_idx]})"],
         textposition="top center",
         showlegend=False
     ))
@@ -106,17 +143,21 @@ def plot_hd_hb_it_bars(results, label=None):
         height=450
     )
 
-    return pio.to_html(fig, full_html=False)
+    return pio.to_html(fig, full_html=False, include_plotlyjs=False)
+
+# Tilt-sweep columns from a tilt_sweep() result or legacy tilt_sweep_rows() rows
+def _sweep_columns(tilt_results):
+    if isinstance(tilt_results, dict):
+        return {key: np.asarray(tilt_results[key], dtype=float) for key in ('tilt', 'Hd', 'Hb', 'It')}
+    return {key: np.array([r[key] for r in tilt_results], dtype=float) for key in ('tilt', 'Hd', 'Hb', 'It')}
 
 def plot_radiation_vs_tilt(tilt_results):
-    tilts = [r['tilt'] for r in tilt_results]
-    Hd_vals = [r['Hd'] for r in tilt_results]
-    Hb_vals = [r['Hb'] for r in tilt_results]
-    It_vals = [r['It'] for r in tilt_results]
+    sweep = _sweep_columns(tilt_results)
+    tilts, Hd_vals, Hb_vals, It_vals = sweep['tilt'], sweep['Hd'], sweep['Hb'], sweep['It']
 
-    max_it = max(It_vals)
-    max_idx = It_vals.index(max_it)
-    max_tilt = tilts[max_idx]
+    max_idx = int(np.argmax(It_vals))
+    max_it = float(It_vals[max_idx])
+    max_tilt = float(tilts[max_idx])
 
     fig = go.Figure()
 
@@ -162,12 +203,12 @@ def plot_radiation_vs_tilt(tilt_results):
         legend=dict(title="Components", orientation="h", y=1.1)
     )
 
-    return pio.to_html(fig, full_html=False)
+    return pio.to_html(fig, full_html=False, include_plotlyjs=False)
 
 def plot_optimal_tilt(data, mode='daily'):
     """Plot optimal tilt either for daily tilt analysis or monthly/yearly view."""
     if mode == 'monthly':
-        data = collapse_to_months(data) if len(data) == 365 else data
+        data = collapse_to_months(data)
 
         x_vals = []
         y_vals = []
@@ -215,12 +256,12 @@ def plot_optimal_tilt(data, mode='daily'):
         )
 
     else:
-        x_vals = [d['tilt'] for d in data]
-        y_vals = [d['It'] for d in data]
+        sweep = _sweep_columns(data)
+        x_vals, y_vals = sweep['tilt'], sweep['It']
 
-        max_idx = y_vals.index(max(y_vals))
-        max_tilt = x_vals[max_idx]
-        max_it = y_vals[max_idx]
+        max_idx = int(np.argmax(y_vals))
+        max_tilt = float(x_vals[max_idx])
+        max_it = float(y_vals[max_idx])
 
         fig = go.Figure()
         fig.add_trace(go.Scatter(
@@ -247,4 +288,70 @@ def plot_optimal_tilt(data, mode='daily'):
             height=420
         )
 
-    return pio.to_html(fig, full_html=False)
+    return pio.to_html(fig, full_html=False, include_plotlyjs=False)
+
+# Mean It vs tilt for each albedo of an albedo_tilt_sweep(), optima starred
+def plot_albedo_sensitivity(sensitivity):
+    tilts = np.asarray(sensitivity['tilt'], dtype=float)
+    fig = go.Figure()
+
+    for albedo, It_vals in zip(sensitivity['albedo'], sensitivity['It']):
+        fig.add_trace(go.Scatter(
+            x=tilts, y=It_vals,
+            mode='lines',
+            name=f'Albedo {albedo:g}'
+        ))
+
+    fig.add_trace(go.Scatter(
+        x=sensitivity['optimal_tilt'], y=sensitivity['max_It'],
+        mode='markers',
+        name='Optimal Tilt',
+        marker=dict(color='red', size=10, symbol='star'),
+        text=[f"Albedo {a:g}: {t:.0f}°" for a, t in zip(sensitivity['albedo'], sensitivity['optimal_tilt'])],
+        hovertemplate='%{text}, It %{y:.2f}<extra></extra>'
+    ))
+
+    fig.update_layout(
+        title='❄️ Albedo Sensitivity (It vs Tilt)',
+        xaxis_title='Tilt (°)',
+        yaxis_title='Mean It (MJ/m²/day)',
+        template='plotly_white',
+        height=450,
+        legend=dict(title="Ground Albedo")
+    )
+
+    return pio.to_html(fig, full_html=False, include_plotlyjs=False)
+
+# Mean It over every tilt × surface azimuth of an orientation_grid(), optimum starred
+def plot_orientation_heatmap(grid):
+    optimal_tilt = float(grid['optimal_tilt'])
+    optimal_azimuth = float(grid['optimal_azimuth'])
+    max_it = float(grid['max_It'])
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Heatmap(
+        x=grid['azimuth'], y=grid['tilt'], z=grid['It'],
+        colorscale='Viridis',
+        colorbar=dict(title='Mean It'),
+        hovertemplate='Azimuth %{x}°, tilt %{y}°: %{z:.2f}<extra></extra>'
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=[optimal_azimuth], y=[optimal_tilt],
+        mode='markers+text',
+        name='Optimum',
+        marker=dict(color='red', size=12, symbol='star'),
+        text=[f"{optimal_tilt:.0f}° / {optimal_azimuth:.0f}°: {max_it:.2f}"],
+        textposition="top center"
+    ))
+
+    fig.update_layout(
+        title='🧭 Mean It by Tilt and Surface Azimuth (beam integrated over sunlit hours)',
+        xaxis_title='Surface Azimuth (°, 0 = south, east negative)',
+        yaxis_title='Tilt (°)',
+        template='plotly_white',
+        height=500
+    )
+
+    return pio.to_html(fig, full_html=False, include_plotlyjs=False)
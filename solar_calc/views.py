@@ -1,361 +1,272 @@
-from calendar import monthrange
 from .utils.hdkr_calc import (
-    calculate_io,
-    calculate_hdkr,
-    compute_daily_radiation,
-    compute_monthly_radiation,
-    erbs_diffuse_fraction,
+    ResultTable,
+    albedo_tilt_sweep,
+    as_result_table,
+    decompose,
+    optimal_tilt_rows,
+    orientation_grid,
+    optimal_tilts,
+    tilt_sweep,
+    transpose,
 )
-from .utils.plotting import (
-    plot_tilted_radiation,
-    plot_radiation_vs_tilt,
-    plot_hd_hb_it_bars,
-    plot_optimal_tilt,
+from .utils.decimation import BAR_GROUP_BUDGET, LINE_POINT_BUDGET
+from .utils.chart_data import (
+    albedo_payload,
+    optimal_payload,
+    orientation_payload,
+    plotly_js_url,
+    series_payload,
+    tilt_payload,
 )
+from .cache import (
+    download_token,
+    get_or_compute_result,
+    load_download,
+    result_cache,
+    result_cache_key,
+    store_download,
+)
+from .exports import EXPORT_FORMATS, export_response
+from .timing import span
 from .forms import RadiationForm
+from .inputs import MONTHS, InputError, check_grid_size, read_inputs
+from django.conf import settings
+from django.db import DatabaseError
 from django.shortcuts import render
-from django.http import HttpResponse
-import datetime
-import math
+from django.http import Http404, HttpResponse
 import csv
 import json
 import logging
-from io import BytesIO
-from openpyxl import load_workbook
 from django.contrib import messages
 
 logger = logging.getLogger(__name__)
 
-MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun',
-          'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
-
 # --------------------------------------------------------------------------- #
-# HELPER: Parse uploaded CSV or Excel for full_month or 365_day modes        #
+# HELPER: Compute result rows and the chart output for one input series       #
 # --------------------------------------------------------------------------- #
-def parse_uploaded_file(file, ghi_unit, expect_days):
-    ghi_vals = []
-    sun_vals = []
-    file_name = file.name.lower()
-
-    if file_name.endswith(".csv"):
-        decoded_file = file.read().decode("utf-8").splitlines()
-        reader = csv.DictReader(decoded_file)
-        for row in reader:
-            ghi_vals.append(float(row["GHI"]))
-            if 'Sunshine' in row and row['Sunshine'].strip():
-                sun_vals.append(float(row['Sunshine']))
-
-    elif file_name.endswith(".xlsx"):
-        wb = load_workbook(filename=BytesIO(file.read()), data_only=True)
-        sheet = wb.active
-        headers = [cell.value for cell in sheet[1]]
-        ghi_idx = headers.index('GHI')
-        sun_idx = headers.index('Sunshine') if 'Sunshine' in headers else None
-        for row in sheet.iter_rows(min_row=2, values_only=True):
-            ghi_vals.append(float(row[ghi_idx]))
-            if sun_idx is not None and row[sun_idx] is not None:
-                sun_vals.append(float(row[sun_idx]))
-
-    else:
-        raise ValueError("Unsupported file format. Please upload .csv or .xlsx")
-
-    if ghi_unit == 'W':
-        if len(ghi_vals) != expect_days or len(sun_vals) != expect_days:
-            raise ValueError(f"Expected {expect_days} GHI and Sunshine values")
-        ghi_vals = [(g * s * 3600) / 1e6 for g, s in zip(ghi_vals, sun_vals)]
-    else:
-        if len(ghi_vals) != expect_days:
-            raise ValueError(f"Expected {expect_days} GHI values")
-
-    return ghi_vals
+def chart_rendering():
+    """'client' (compact payload drawn by charts.js) or 'server' (Plotly HTML)."""
+    return getattr(settings, 'SOLAR_CALC_CHART_RENDERING', 'client')
+
+
+# Point budgets for the time-series charts (see utils/decimation.py)
+def chart_budgets():
+    return {
+        'max_points': getattr(settings, 'SOLAR_CALC_CHART_MAX_POINTS', LINE_POINT_BUDGET),
+        'max_groups': getattr(settings, 'SOLAR_CALC_CHART_MAX_BARS', BAR_GROUP_BUDGET),
+    }
+
+
+def render_figures(result, label, bars, sweep, optima_rows, sensitivity=None, orientation=None):
+    # plotly is only imported on the paths that actually render figures
+    from .utils.plotting import (
+        plot_albedo_sensitivity,
+        plot_orientation_heatmap,
+        plot_tilted_radiation,
+        plot_radiation_vs_tilt,
+        plot_hd_hb_it_bars,
+        plot_optimal_tilt,
+    )
+
+    budgets = chart_budgets()
+    figures = {
+        'graph': plot_tilted_radiation(result, label=label, max_points=budgets['max_points']),
+        'bar_graph': (plot_hd_hb_it_bars(result, label=label, max_groups=budgets['max_groups'])
+                      if bars else None),
+        'tilt_graph': None,
+        'optimal_tilt_graph': None,
+        'albedo_graph': plot_albedo_sensitivity(sensitivity) if sensitivity is not None else None,
+        'orientation_graph': plot_orientation_heatmap(orientation) if orientation is not None else None,
+    }
+    if sweep is not None:
+        figures['tilt_graph'] = plot_radiation_vs_tilt(sweep)
+        figures['optimal_tilt_graph'] = plot_optimal_tilt(sweep)
+    if optima_rows is not None:
+        figures['optimal_tilt_graph'] = plot_optimal_tilt(optima_rows, mode='monthly')
+    return figures
+
+
+def chart_payload(result, label, bars, sweep, optima_rows, sensitivity=None, orientation=None):
+    data = {
+        'series': series_payload(result, label=label, bars=bars, **chart_budgets()),
+        'tilt': tilt_payload(sweep) if sweep is not None else None,
+        'optimal': None,
+        'albedo': albedo_payload(sensitivity) if sensitivity is not None else None,
+        'orientation': orientation_payload(orientation) if orientation is not None else None,
+    }
+    if optima_rows is not None:
+        data['optimal'] = optimal_payload(optima_rows)
+    elif sweep is not None:
+        data['optimal'] = {'kind': 'sweep'}
+    return data
+
+
+def compute_outputs(series, lat, tilt, albedo, year, tilt_analysis, yearly_optimal_tilt, decomposition=None,
+                    albedo_sweep=None, azimuth=None, orientation_analysis=False):
+    """Run the HDKR engine over a normalized input series and build the charts.
+
+    ``series`` is the dict built by ``inputs.read_inputs``: ``days``
+    (day-of-year), ``ghi`` (MJ/m²/day), the row ``index_key``/``labels``, the
+    chart ``label`` and the originating ``kind`` (single_day / full_month /
+    12_month / 365_days).  ``albedo`` is a float or one value per row, and
+    ``albedo_sweep`` (a list of albedos) adds the albedo × tilt sensitivity
+    analysis.  ``azimuth`` is the surface azimuth (0 = south; None keeps the
+    south-facing noon-ratio model), and ``orientation_analysis`` adds the
+    tilt × azimuth heat map and its optimum.
+    ``decomposition`` is the series' tilt-independent stage
+    (``decompose``), computed here when not supplied.  Charts come back
+    as a ``chart_data`` payload or as rendered figures depending on
+    ``chart_rendering()``.
+    """
+    kind = series['kind']
+    if decomposition is None:
+        decomposition = decompose(series['days'], series['ghi'], lat)
+    with span('engine'):
+        columns = transpose(decomposition, tilt, albedo, azimuth)
+        result = ResultTable.from_columns(columns, series['index_key'], series['labels'])
+
+    sweep = optima_rows = sensitivity = orientation = None
+    with span('tilt'):
+        if kind == '12_month':
+            optima_rows = optimal_tilt_rows(optimal_tilts(
+                None, None, None, albedo=albedo, decomposition=decomposition, surface_azimuth_deg=azimuth))
+        else:
+            if tilt_analysis:
+                sweep = tilt_sweep(None, None, None, albedo=albedo, decomposition=decomposition,
+                                   surface_azimuth_deg=azimuth)
+            if kind == '365_days' and yearly_optimal_tilt:
+                optima_rows = optimal_tilt_rows(optimal_tilts(
+                    None, None, None, albedo=albedo, year=year, dates=series.get('dates'),
+                    decomposition=decomposition, surface_azimuth_deg=azimuth))
+        if albedo_sweep:
+            sensitivity = albedo_tilt_sweep(None, None, None, albedo_sweep, decomposition=decomposition,
+                                            surface_azimuth_deg=azimuth)
+        if orientation_analysis:
+            orientation = orientation_grid(None, None, None, albedo=albedo, decomposition=decomposition)
+
+    bars = kind != 'single_day'
+    with span('charts'):
+        if chart_rendering() == 'client':
+            return {'result': result,
+                    'chart_data': chart_payload(result, series['label'], bars, sweep, optima_rows,
+                                                sensitivity, orientation)}
+        return {'result': result,
+                **render_figures(result, series['label'], bars, sweep, optima_rows, sensitivity, orientation)}
 
 # --------------------------------------------------------------------------- #
 # MAIN VIEW                                                                   #
 # --------------------------------------------------------------------------- #
 def index(request):
-    result = []
-    graph = bar_graph = tilt_graph = optimal_tilt_graph = None
+    outputs = {}
+    result_token = None
 
     if request.method == 'POST':
-        form = RadiationForm(request.POST, request.FILES)
-        if not form.is_valid():
+        with span('form'):
+            form = RadiationForm(request.POST, request.FILES)
+            valid = form.is_valid()
+        if not valid:
             return render(request, 'solar_calc/index.html', {'form': form})
 
-        lat   = form.cleaned_data['latitude']
-        tilt  = form.cleaned_data['tilt']
-        mode  = form.cleaned_data['mode']          # single_day / full_month / 12_month / 365_days
-        ghi_unit = form.cleaned_data['ghi_unit']   # MJ or W
-        ghi_raw  = form.cleaned_data['ghi']
-        sun_raw  = form.cleaned_data['sunshine_hours']
-        year     = form.cleaned_data['year'] or datetime.datetime.now().year
-        albedo   = 0.2
-        tilt_analysis = request.POST.get('tilt_analysis')
-
-        if mode == '365_days':
-            year_input_mode = 'daily'
-        else:
-            year_input_mode = request.POST.get('year_input_mode') or 'monthly'
-
-        lat_rad  = math.radians(lat)
-        tilt_rad = math.radians(tilt)
-
-        if mode in ['12_month', '365_days']:
-            mode = 'full_year'
-
-        # ================================================================
-        # FULL-YEAR BRANCH  (12-month or 365-day)
-        # ================================================================
-        if mode == 'full_year':
-            try:
-                if year_input_mode == 'monthly':
-                    ghi_vals_mj = []
-                    for m in MONTHS:
-                        g_raw = request.POST.get(f'month_{m}_ghi')
-                        s_raw = request.POST.get(f'month_{m}_sunshine')
-                        if not g_raw:
-                            form.add_error(None, f'Missing GHI for {m.capitalize()}')
-                            return render(request, 'solar_calc/index.html', {'form': form})
-
-                        if ghi_unit == 'W':
-                            if not s_raw:
-                                form.add_error(None, f'Missing sunshine for {m.capitalize()}')
-                                return render(request, 'solar_calc/index.html', {'form': form})
-                            g = float(g_raw)
-                            s = float(s_raw)
-                            ghi_vals_mj.append((g * s * 3600) / 1e6)
-                        else:
-                            ghi_vals_mj.append(float(g_raw))
-
-                    results = compute_monthly_radiation(ghi_vals_mj, lat, tilt, albedo)
-                    label   = '12-Month Average'
-                    optimal_tilt_graph = plot_optimal_tilt(results, mode='monthly')
-
-                elif year_input_mode == 'daily':
-                    try:
-                        csv_file = request.FILES.get('csv_file')
-                        if csv_file:
-                            ghi_vals = parse_uploaded_file(csv_file, ghi_unit, 365)
-                        else:
-                            ghi_vals = [float(x.strip()) for x in ghi_raw.split(',') if x.strip()]
-                            if ghi_unit == 'W':
-                                sun_vals = [float(x.strip()) for x in sun_raw.split(',') if x.strip()]
-                                if len(ghi_vals) != 365 or len(sun_vals) != 365:
-                                    raise ValueError("365 GHI and Sunshine values required")
-                                ghi_vals = [(g * s * 3600) / 1e6 for g, s in zip(ghi_vals, sun_vals)]
-                            elif len(ghi_vals) != 365:
-                                raise ValueError("365 GHI values required")
-
-                        results = compute_daily_radiation(ghi_vals, lat, tilt, albedo, start_day=1)
-                        label   = 'Full Year (365 Days)'
-
-                        if tilt_analysis:
-                            tilt_results = []
-                            for tilt_angle in range(0, 91):
-                                t_rad = math.radians(tilt_angle)
-
-                                # FIXED: separate lists
-                                Hd_list, Hb_list, It_list = [], [], []
-
-                                for day in results:
-                                    Hd_day = day['Hd']
-                                    Hb_day = day['Hb']
-                                    H_day = Hd_day + Hb_day
-                                    delta_rad = math.radians(day['declination'])
-                                    vals = calculate_hdkr(H_day, Hd_day, lat_rad, t_rad, delta_rad, albedo)
-                                    Hd_list.append(vals['Hd_tilted'])
-                                    Hb_list.append(vals['Hb_tilted'])
-                                    It_list.append(vals['It'])
-
-                                n = len(results)
-                                tilt_results.append({
-                                    'tilt': tilt_angle,
-                                    'Hd': sum(Hd_list) / n,
-                                    'Hb': sum(Hb_list) / n,
-                                    'It': sum(It_list) / n
-                                })
-
-                            tilt_graph = plot_radiation_vs_tilt(tilt_results)
-                            optimal_tilt_graph = plot_optimal_tilt(tilt_results)
-
-                    except Exception as e:
-                        form.add_error('csv_file', f"Yearly data error: {e}")
-                        return render(request, 'solar_calc/index.html', {'form': form})
-
-                else:
-                    form.add_error(None, 'Invalid yearly input mode.')
-                    return render(request, 'solar_calc/index.html', {'form': form})
-
-                result = results
-                graph  = plot_tilted_radiation(results, label=label)
-                bar_graph = plot_hd_hb_it_bars(results, label=label)
-
-            except Exception as e:
-                form.add_error(None, f'Yearly processing error: {e}')
-                return render(request, 'solar_calc/index.html', {'form': form})
-
-        # ================================================================
-        # FULL-MONTH
-        # ================================================================
-        elif mode == 'full_month':
-            month = int(form.cleaned_data['month'])
-            num_days = monthrange(year, month)[1]
-            ghi_vals = []
-            sun_vals = []
-
-            csv_file = request.FILES.get('csv_file')
-            if csv_file:
-                try:
-                    ghi_vals = parse_uploaded_file(csv_file, ghi_unit, num_days)
-                    messages.success(request, f"{csv_file.name} uploaded successfully.")
-                except Exception as e:
-                    form.add_error('csv_file', f"Full-month data error: {e}")
-                    return render(request, 'solar_calc/index.html', {'form': form})
-            else:
-                try:
-                    ghi_vals = [float(g.strip()) for g in ghi_raw.split(',') if g.strip()]
-                    if ghi_unit == 'W':
-                        sun_vals = [float(s.strip()) for s in sun_raw.split(',') if s.strip()]
-                        if len(ghi_vals) != len(sun_vals):
-                            form.add_error('ghi', 'GHI and sunshine count must match.')
-                            return render(request, 'solar_calc/index.html', {'form': form})
-                        ghi_vals = [(g * s * 3600) / 1e6 for g, s in zip(ghi_vals, sun_vals)]
-                except ValueError:
-                    form.add_error('ghi', 'Invalid GHI or Sunshine input format.')
-                    return render(request, 'solar_calc/index.html', {'form': form})
-
-            if len(ghi_vals) != num_days:
-                form.add_error('ghi', f'Enter exactly {num_days} GHI values.')
-                return render(request, 'solar_calc/index.html', {'form': form})
-
-            result = []
-            for day in range(1, num_days + 1):
-                H = ghi_vals[day - 1]
-                day_num = datetime.date(year, month, day).timetuple().tm_yday
-                io, delta, delta_rad = calculate_io(day_num, lat)
-                kt = H / io if io else 0
-                Hd_H = erbs_diffuse_fraction(kt)
-                Hd = Hd_H * H
-                values = calculate_hdkr(H, Hd, lat_rad, tilt_rad, delta_rad, albedo)
-
-                result.append({
-                    'day': f"{day:02d}-{month:02d}",
-                    'declination': delta,
-                    'Io': io,
-                    'Kt': kt,
-                    'Hd_H': Hd_H,
-                    'Hd': values['Hd'],
-                    'Hb': values['Hb'],
-                    'rb': values['rb'],
-                    'Hd_tilted': values['Hd_tilted'],
-                    'Hb_tilted': values['Hb_tilted'],
-                    'It': values['It']
-                })
-
-            label = datetime.date(year, month, 1).strftime('%B %Y')
-            graph = plot_tilted_radiation(result, label=label)
-            bar_graph = plot_hd_hb_it_bars(result, label=label)
-
-            if tilt_analysis:
-                tilt_results = []
-                for tilt_angle in range(0, 91):
-                    tilt_rad_tmp = math.radians(tilt_angle)
-
-                    # FIXED: separate lists
-                    Hd_list, Hb_list, It_list = [], [], []
-
-                    for day in range(1, num_days + 1):
-                        H = ghi_vals[day - 1]
-                        day_num = datetime.date(year, month, day).timetuple().tm_yday
-                        io, delta, delta_rad = calculate_io(day_num, lat)
-                        kt = H / io if io else 0
-                        Hd_H = erbs_diffuse_fraction(kt)
-                        Hd = Hd_H * H
-                        vals = calculate_hdkr(H, Hd, lat_rad, tilt_rad_tmp, delta_rad, albedo)
-                        Hd_list.append(vals['Hd_tilted'])
-                        Hb_list.append(vals['Hb_tilted'])
-                        It_list.append(vals['It'])
-
-                    tilt_results.append({
-                        'tilt': tilt_angle,
-                        'Hd': sum(Hd_list) / num_days,
-                        'Hb': sum(Hb_list) / num_days,
-                        'It': sum(It_list) / num_days
-                    })
+        try:
+            with span('inputs'):
+                inputs = read_inputs(form, request.POST, request.FILES)
+                check_grid_size(inputs)
+        except InputError as e:
+            form.add_error(e.field if e.field in form.fields else None, str(e))
+            return render(request, 'solar_calc/index.html', {'form': form})
 
-                tilt_graph = plot_radiation_vs_tilt(tilt_results)
-                optimal_tilt_graph = plot_optimal_tilt(tilt_results)
+        csv_file = request.FILES.get('csv_file')
+        if csv_file and inputs['mode'] == 'full_month':
+            messages.success(request, f"{csv_file.name} uploaded successfully.")
 
         # ================================================================
-        # SINGLE-DAY MODE
+        # COMPUTE + RENDER (memoized on the normalized inputs)
         # ================================================================
-        elif mode == 'single_day':
-            date = form.cleaned_data['date']
-            if not date:
-                form.add_error('date', 'Please select a valid date.')
-                return render(request, 'solar_calc/index.html', {'form': form})
-
-            day_of_year = date.timetuple().tm_yday
-            try:
-                if ghi_unit == 'MJ':
-                    H = float(ghi_raw.strip())
-                else:
-                    g = float(ghi_raw.strip())
-                    s = float(sun_raw.strip())
-                    H = (g * s * 3600) / 1e6
-            except ValueError:
-                form.add_error('ghi', 'Invalid GHI input.')
-                return render(request, 'solar_calc/index.html', {'form': form})
-
-            io, delta, delta_rad = calculate_io(day_of_year, lat)
-            kt = H / io if io else 0
-            Hd_H = erbs_diffuse_fraction(kt)
-            Hd = Hd_H * H
-            values = calculate_hdkr(H, Hd, lat_rad, tilt_rad, delta_rad, albedo)
-
-            result = [{
-                'day': date.strftime('%d-%b'),
-                'declination': delta,
-                'Io': io,
-                'Kt': kt,
-                'Hd_H': Hd_H,
-                'Hd': values['Hd'],
-                'Hb': values['Hb'],
-                'rb': values['rb'],
-                'Hd_tilted': values['Hd_tilted'],
-                'Hb_tilted': values['Hb_tilted'],
-                'It': values['It']
-            }]
-            label = date.strftime('%d %B %Y')
-            graph = plot_tilted_radiation(result, label=label)
-
-            if tilt_analysis:
-                tilt_results = []
-                for tilt_angle in range(0, 91):
-                    t_rad = math.radians(tilt_angle)
-                    vals = calculate_hdkr(H, Hd, lat_rad, t_rad, delta_rad, albedo)
+        series = inputs['series']
+        key = result_cache_key(
+            lat=inputs['lat'], tilt=inputs['tilt'], azimuth=inputs['azimuth'], mode=inputs['mode'],
+            ghi_unit=inputs['ghi_unit'], ghi=series['ghi'], year=inputs['year'],
+            albedo=inputs['albedo'], albedo_sweep=inputs['albedo_sweep'],
+            days=series['days'], labels=series['labels'],
+            tilt_analysis=inputs['tilt_analysis'],
+            yearly_optimal_tilt=inputs['yearly_optimal_tilt'],
+            orientation_analysis=inputs['orientation_analysis'],
+            rendering=chart_rendering(), **chart_budgets(),
+        )
+        # Tilt-independent stage, shared by re-runs that only change the
+        # tilt, azimuth, albedo or analysis options
+        decomposition_key = result_cache_key(
+            stage='decomposition', lat=inputs['lat'], ghi=series['ghi'], days=series['days'])
+        # Spans never nest, so they add up to (at most) the request time:
+        # compute_outputs times its own engine / tilt / charts stages
+        try:
+            with span('cache'):
+                outputs = result_cache().get(key)
+            if outputs is None:
+                with span('decompose'):
+                    decomposition = get_or_compute_result(decomposition_key, lambda: decompose(
+                        series['days'], series['ghi'], inputs['lat']))
+                outputs = compute_outputs(
+                    series, inputs['lat'], inputs['tilt'], inputs['albedo'], inputs['year'],
+                    inputs['tilt_analysis'], inputs['yearly_optimal_tilt'], decomposition=decomposition,
+                    albedo_sweep=inputs['albedo_sweep'], azimuth=inputs['azimuth'],
+                    orientation_analysis=inputs['orientation_analysis'])
+                with span('cache'):
+                    result_cache().set(key, outputs)
+        except Exception as e:
+            form.add_error(None, f'Processing error: {e}')
+            return render(request, 'solar_calc/index.html', {'form': form})
 
-                    # Store individual tilted values
-                    tilt_results.append({
-                        'tilt': tilt_angle,
-                        'Hd': vals['Hd_tilted'],
-                        'Hb': vals['Hb_tilted'],
-                        'It': vals['It']
-                    })
-                tilt_graph = plot_radiation_vs_tilt(tilt_results)
-                optimal_tilt_graph = plot_optimal_tilt(tilt_results)
+        # Keep the table server-side; the download link streams it by token.
+        # Without the ResultDownload table (run `manage.py migrate`) the page
+        # still renders, just without download links.
+        try:
+            token = download_token(key)
+            with span('store'):
+                store_download(token, outputs['result'])
+            result_token = token
+        except DatabaseError:
+            logger.exception('Could not store the result for download')
 
     else:
         form = RadiationForm()
 
-    return render(request, 'solar_calc/index.html', {
-        'form': form,
-        'result': result,
-        'graph': graph,
-        'bar_graph': bar_graph,
-        'tilt_graph': tilt_graph,
-        'optimal_tilt_graph': optimal_tilt_graph,
-        'months': MONTHS,
-    })
+    with span('render'):
+        return render(request, 'solar_calc/index.html', {
+            'form': form,
+            'result': outputs.get('result', []),
+            'graph': outputs.get('graph'),
+            'bar_graph': outputs.get('bar_graph'),
+            'tilt_graph': outputs.get('tilt_graph'),
+            'optimal_tilt_graph': outputs.get('optimal_tilt_graph'),
+            'albedo_graph': outputs.get('albedo_graph'),
+            'orientation_graph': outputs.get('orientation_graph'),
+            'chart_data': outputs.get('chart_data'),
+            'result_token': result_token,
+            'download_formats': [fmt for fmt in EXPORT_FORMATS if fmt != 'csv'],
+            'plotly_js_url': plotly_js_url(),
+            'months': MONTHS,
+        })
+
+# --------------------------------------------------------------------------- #
+# RESULT DOWNLOAD VIEW                                                        #
+# --------------------------------------------------------------------------- #
+def download_result(request, token, fmt):
+    """Stream the result stored by ``index`` under ``token`` as ``fmt``."""
+    if fmt not in EXPORT_FORMATS:
+        raise Http404(f'Unknown download format: {fmt}')
+    try:
+        table = load_download(token)
+    except DatabaseError:
+        logger.exception('Could not load download %s', token)
+        table = None
+    if table is None:
+        return HttpResponse('Results expired; please recalculate.', status=404, content_type='text/plain')
+    return export_response(table, fmt)
+
+
+def download_xlsx(request, token):
+    return download_result(request, token, 'xlsx')
 
 # --------------------------------------------------------------------------- #
 # CSV DOWNLOAD VIEW                                                           #
@@ -371,12 +282,19 @@ def download_csv(request):
         except json.JSONDecodeError:
             return HttpResponse('Invalid JSON data', status=400)
 
+        # Columnar payload from ResultTable.to_dict(); a list of row dicts is
+        # still accepted
+        try:
+            table = as_result_table(results) if isinstance(results, list) else ResultTable.from_dict(results)
+        except (StopIteration, KeyError, IndexError, TypeError, ValueError):
+            return HttpResponse('Invalid JSON data', status=400)
+
         response = HttpResponse(content_type='text/csv')
         response['Content-Disposition'] = 'attachment; filename="solar_radiation_results.csv"'
 
-        writer = csv.DictWriter(response, fieldnames=list(results[0].keys()))
-        writer.writeheader()
-        writer.writerows(results)
+        writer = csv.writer(response)
+        writer.writerow(table.keys())
+        writer.writerows(table.records())
         return response
 
     return HttpResponse('Invalid request', status=405)
@@ -41,6 +41,7 @@ INSTALLED_APPS = [
 
 ]
 MIDDLEWARE = [
+    'solar_calc.timing.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -81,6 +82,52 @@ DATABASES = {
 }
 
 
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# 'results' memoizes computed rows and rendered figures for repeated inputs
+# (see solar_calc/cache.py); swap in FileBasedCache to share it across workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'results': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'solar-calc-results',
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {'MAX_ENTRIES': 500},
+    },
+}
+
+# Worker processes for large multi-site / tilt-grid jobs (None = all available cores)
+SOLAR_CALC_PARALLEL_WORKERS = None
+
+# Multi-site JSON bodies (/api/batch/, /api/jobs/) carry full GHI series
+DATA_UPLOAD_MAX_MEMORY_SIZE = 50 * 1024 * 1024
+
+# Background threads running queued jobs (see solar_calc/jobs.py)
+SOLAR_CALC_JOB_WORKERS = 2
+# Seconds a running job may go without reporting progress before it is marked
+# failed (its worker died), and seconds finished jobs are kept before purging
+SOLAR_CALC_JOB_STALE_AFTER = 15 * 60
+SOLAR_CALC_JOB_RETENTION = 7 * 24 * 60 * 60
+
+# How result charts reach the browser: 'client' ships one compact float32 payload
+# that static/solar_calc/charts.js draws; 'server' embeds Plotly HTML per figure.
+SOLAR_CALC_CHART_RENDERING = 'client'
+
+# Point budgets for the time-series charts: the It line is LTTB-decimated to at
+# most this many points and the component bars averaged into at most this many
+# groups (weekly, fortnightly, ...).  The max-It annotation is always exact.
+SOLAR_CALC_CHART_MAX_POINTS = 1000
+SOLAR_CALC_CHART_MAX_BARS = 120
+
+# Import plotly/openpyxl and warm plotly's figure machinery in AppConfig.ready().
+# Worth enabling for long-lived web workers; leave off so manage.py commands and
+# short-lived processes start quickly.
+SOLAR_CALC_PRELOAD = False
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -124,3 +171,25 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 import os
 STATICFILES_DIRS =[os.path.join (BASE_DIR, 'static') ]
+
+# Seconds a computed result stays downloadable from its /download/<token>.<fmt>
+# link.  Download tables are kept in the database (solar_calc.ResultDownload,
+# created by `manage.py migrate`) so the GET can be served by any worker
+# process; `manage.py purge_jobs` (run it periodically) deletes expired rows.
+SOLAR_CALC_DOWNLOAD_TIMEOUT = 30 * 60
+
+# Request instrumentation (solar_calc/timing.py).  SOLAR_CALC_TIMING adds a
+# Server-Timing header with per-stage spans (form, inputs, cache, decompose,
+# engine, tilt, charts, store, render; they never overlap) and logs one
+# 'request_timing' JSON line per request.
+# SOLAR_CALC_PROFILE: 'off', 'header' (profile requests sending an
+# X-Solar-Profile header) or 'always'; profiles are written to
+# SOLAR_CALC_PROFILE_DIR (default: the temp dir) with pyinstrument when
+# installed, else cProfile.  Only use 'header' where clients are trusted.
+SOLAR_CALC_TIMING = False
+SOLAR_CALC_PROFILE = 'off'
+SOLAR_CALC_PROFILE_DIR = None
+
+# Directory of the memory-mapped gridded GHI archive built by
+# `manage.py import_grid`; batch sites with a 'grid' method read from it.
+SOLAR_CALC_GRID_ARCHIVE = None